@@ -15,26 +15,41 @@ class Agent:
         messages: list[dict] | None = None,
         tools: list[dict] | None = None,
         summary_cycle: int = 2,
+        session_id: str = "default",
+        tools_mgr: ToolsCalling | None = None,
+        summary_model: ModelOpenAI | None = None,
     ):
         self.model = model
+        self.session_id = session_id
         self.messages = messages or []
         self.tools = tools or []
-        self.tools_mgr = ToolsCalling()
+        self.tools_mgr = tools_mgr or ToolsCalling()
         self.memory = BaseMemory()
-        self.summary = BaseSummarizer()
+        self.summary = BaseSummarizer(model=summary_model)
         self.summary_cycle = summary_cycle
 
-    def run(self):
+    def run(self, on_delta=None):
         """
         Jalankan reasoning loop.
         input → pesan awal (default: self.messages)
         tools → daftar tools (default: self.tools)
+        on_delta → callback opsional untuk streaming teks jawaban
         """
         message_input = self.messages
         tools = self.tools
+        iteration = 0
         while True:
             try:
-                response = self.model.call(messages=message_input, tools=tools)
+                # iterasi 0 = jawaban utama, selanjutnya = loop setelah tool call
+                response = self.model.call(
+                    messages=message_input,
+                    tools=tools,
+                    on_delta=on_delta,
+                    session_id=self.session_id,
+                    stage="agent" if iteration == 0 else "tool_loop",
+                    iteration=iteration,
+                )
+                iteration += 1
             except Exception as e:
                 return f"[Agent Error]: {e}"
 
@@ -55,20 +70,27 @@ class Agent:
             ]
 
             if not function_calls:
-                self.memory.save_memory(message_input)
-                count = self.summary.get_counter()
-                if count == self.summary_cycle:
+                # Simpan memory + counter sebagai satu unit di bawah lock tulis
+                with self.memory.write_lock():
+                    self.memory.save_memory(message_input)
+                    count = self.summary.get_counter()
+                    should_summarize = count == self.summary_cycle
+                    if should_summarize:
+                        memory_data = self.memory.load_memory(self.summary_cycle)
+                        self.summary.reset_counter()
+                    else:
+                        self.summary.increment_counter()
+
+                if should_summarize:
                     for item in message_input:
                         if item.get("role") == "user":
                             prompt = item.get("content", "")
                             break
 
-                    memory_data = self.memory.load_memory(self.summary_cycle)
                     memory_str = self.memory.format_str(memory_data)
-                    self.summary.create_summary(prompt, memory_str)
-                    self.summary.reset_counter()
-                else:
-                    self.summary.increment_counter()
+                    self.summary.create_summary(
+                        prompt, memory_str, session_id=self.session_id
+                    )
                 return getattr(response, "output_text", None)
 
             # Eksekusi function call
@@ -80,6 +102,7 @@ class Agent:
                 tool_attr = {
                     "type": "function_call_output",
                     "call_id": item.call_id,
-                    "output": json.dumps(tool_output, ensure_ascii=False),
+                    # Output besar dipangkas; isi lengkap di spill area
+                    "output": self.tools_mgr.fit_output(item.name, tool_output),
                 }
                 message_input.append(tool_attr)
@@ -9,6 +9,28 @@ load_dotenv()
 class BaseConfig:
     # Setting logging
     LOG_ENABLED = True
+    LOG_LEVEL_CONSOLE = os.getenv("NANO_LOG_LEVEL", "INFO")
+    LOG_LEVEL_FILE = os.getenv("NANO_LOG_FILE_LEVEL", "DEBUG")
+    # Fraksi log DEBUG yang ditulis (1.0 = semua, 0.1 = 10%)
+    LOG_DEBUG_SAMPLE_RATE = float(os.getenv("NANO_LOG_DEBUG_SAMPLE_RATE", "1.0"))
+    # Kompresi file log hasil rotasi (mis. "gz", "zip") dan masa simpan
+    LOG_COMPRESSION = os.getenv("NANO_LOG_COMPRESSION") or None
+    LOG_RETENTION = os.getenv("NANO_LOG_RETENTION") or None
+
+    # Metrics per stage (endpoint /metrics)
+    METRICS_ENABLED = os.getenv("NANO_METRICS", "1") == "1"
+
+    # Profiling per request (header X-Nano-Profile / cli.py --profile)
+    PROFILE_SAMPLE_RATE = float(os.getenv("NANO_PROFILE_SAMPLE_RATE", "0"))
+    PROFILE_INTERVAL_MS = 5
+    PROFILE_DIR = "app/logs/profiles"
+
+    # Tracing span per turn → JSONL lokal (format OTLP/JSON)
+    TRACING_ENABLED = os.getenv("NANO_TRACING", "0") == "1"
+    TRACE_SERVICE_NAME = "nano"
+    TRACE_FILE = "app/logs/traces/traces.jsonl"
+    TRACE_MAX_BYTES = 20 * 1024 * 1024
+    TRACE_BACKUPS = 5
 
     # API keys & sensitive data
     OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
@@ -18,6 +40,25 @@ class BaseConfig:
     MODEL_INTENT_CLASSIFIER = "gpt-5-mini"
     MODEL_SUMMARY = "gpt-5-mini"
     MODEL_EMBEDDING = "all-MiniLM-L6-v2"
+    # Ukuran batch encode untuk VectorStore.add_vectors / rebuild_index
+    EMBED_BATCH_SIZE = int(os.getenv("NANO_EMBED_BATCH_SIZE", "64"))
+    # Micro-batching: encode kecil dari request paralel digabung jadi satu batch
+    EMBED_BATCHING = os.getenv("NANO_EMBED_BATCHING", "1") == "1"
+    EMBED_MAX_BATCH = 32
+    EMBED_MAX_WAIT_MS = 5
+    # Thread torch untuk encode (0 = default torch)
+    EMBED_INTRAOP_THREADS = int(os.getenv("NANO_EMBED_THREADS", "0"))
+    EMBED_INTEROP_THREADS = int(os.getenv("NANO_EMBED_INTEROP_THREADS", "0"))
+    # Backend encode: "torch" (sentence-transformers) atau "onnx" (onnxruntime,
+    # hasil python -m app.rag.export_onnx); int8 = model_int8.onnx
+    EMBED_BACKEND = os.getenv("NANO_EMBED_BACKEND", "torch")
+    EMBED_ONNX_QUANTIZED = os.getenv("NANO_EMBED_ONNX_INT8", "0") == "1"
+    EMBED_ONNX_DIR = "app/data/models/onnx"
+    # Embed server bersama (python -m app.rag.embed_server): worker meng-encode
+    # lewat Unix socket + shared memory alih-alih memuat model sendiri
+    EMBED_REMOTE = os.getenv("NANO_EMBED_REMOTE", "0") == "1"
+    EMBED_SERVER_SOCKET = os.getenv("NANO_EMBED_SOCKET", "app/data/embed.sock")
+    EMBED_SERVER_TIMEOUT = float(os.getenv("NANO_EMBED_TIMEOUT", "30"))
     MODEL_ANALYZE_IMAGE = "gpt-5-mini"
     MODEL_GENERATE_IMAGE = "gpt-5-mini"
 
@@ -28,13 +69,107 @@ class BaseConfig:
     MAX_RECALL_HISTORY = 5
     RECALL_HISTORY_TOKEN_LIMIT = 1500
     MIN_SCORE_HISTORY = 0.3
+    # Relevant memory hybrid: BM25 (user/assistant/action) + vektor, digabung RRF
+    MEMORY_HYBRID = os.getenv("NANO_MEMORY_HYBRID", "1") == "1"
+    MEMORY_HYBRID_CANDIDATES = 20  # kedalaman kandidat per ranker sebelum fusi
+    MEMORY_RRF_K = 60
+    # Sebelum fusi: term yang muncul di > MAX_DF dokumen diabaikan, dan hit
+    # BM25 di bawah MIN_SCORE dibuang (supaya token umum tidak mengisi top_k)
+    MEMORY_BM25_MAX_DF = float(os.getenv("NANO_MEMORY_BM25_MAX_DF", "0.5"))
+    MEMORY_BM25_MIN_SCORE = float(os.getenv("NANO_MEMORY_BM25_MIN_SCORE", "0.5"))
+
+    # Context assembler: satu budget token untuk summary + relevant +
+    # documents + recent (menggantikan budget terpisah per source)
+    CONTEXT_MAX_TOKENS = int(os.getenv("NANO_CONTEXT_MAX_TOKENS", "4096"))
+    CONTEXT_MMR_LAMBDA = 0.7  # 1.0 = murni utility, makin kecil makin beragam
+    CONTEXT_DEDUP_THRESHOLD = 0.85  # Jaccard token untuk near-duplicate
+    CONTEXT_MIN_RECENT = 2  # turn terbaru yang selalu ikut
+    CONTEXT_RECENCY_WEIGHT = 0.5
+    CONTEXT_SOURCE_WEIGHTS = {
+        "recent": 1.0,
+        "relevant": 0.9,
+        "summary": 0.8,
+        "documents": 0.8,
+    }
 
     MAX_RECALL_SUMMARY = 5
     RECALL_SUMMARY_TOKEN_LIMIT = 1000
     MIN_SCORE_SUMMARY = 0.3
     SUMMARY_INTERVAL = 2
+    # Summary bertingkat: setiap FANOUT summary level-L digabung jadi satu
+    # summary level-(L+1) (0 = nonaktif). Anak yang sudah digabung dipindah
+    # ke summary_archive.jsonl dan dikeluarkan dari summary.index.
+    SUMMARY_FANOUT = int(os.getenv("NANO_SUMMARY_FANOUT", "4"))
+    SUMMARY_ARCHIVE = os.getenv("NANO_SUMMARY_ARCHIVE", "1") == "1"
+    # Skor retrieval summary dikali (1 + bias × level)
+    SUMMARY_LEVEL_BIAS = 0.1
 
     # Path data
     MEMORY_ROOT = "app/data/memory/"
     VECTOR_ROOT = "app/data/vector_store/"
     FILES_ROOT = "app/data/files/"
+
+    # Batas tool read_file: per panggilan maksimal sekian byte / token,
+    # sisanya dibaca lewat cursor (offset / next_line)
+    READ_MAX_BYTES = 64 * 1024
+    # Di bawah TOOL_OUTPUT_MAX_TOKENS supaya satu potongan read_file muat utuh
+    READ_MAX_TOKENS = 6000
+    # File di atas ukuran ini dibaca lewat mmap, bukan read() penuh
+    READ_MMAP_THRESHOLD = 1024 * 1024
+    # Maksimal entry per halaman list_directory (sisanya lewat cursor)
+    LIST_MAX_ENTRIES = 500
+    # Total ukuran direktori (get_directory_size) di-cache sekian detik;
+    # setelahnya hanya direktori yang mtime-nya berubah dipindai ulang
+    SIZE_INDEX_TTL = float(os.getenv("NANO_SIZE_INDEX_TTL", "2"))
+    # Opt-in: stat ulang setiap file saat revalidasi (menangkap tulis di
+    # tempat dari proses lain, biayanya O(file))
+    SIZE_INDEX_RESTAT_FILES = os.getenv("NANO_SIZE_INDEX_RESTAT_FILES", "0") == "1"
+
+    # Tool search_files (trigram index, di-refresh incremental per query)
+    SEARCH_ROOT = os.getenv("NANO_SEARCH_ROOT", ".")
+    SEARCH_MAX_RESULTS = 50
+    SEARCH_MAX_FILE_BYTES = 1024 * 1024
+    SEARCH_MAX_LINE_CHARS = 300
+
+    # Index semantik dokumen di FILES_ROOT (retrieval source "documents")
+    DOC_EXTENSIONS = (
+        ".md", ".markdown", ".rst", ".txt", ".py", ".js", ".jsx", ".ts", ".tsx",
+        ".json", ".yaml", ".yml", ".toml", ".ini", ".cfg", ".html", ".css",
+        ".go", ".rs", ".java", ".c", ".h", ".cpp", ".sh", ".sql", ".csv",
+    )
+    DOC_MAX_FILE_BYTES = 2 * 1024 * 1024
+    DOC_CHUNK_MAX_CHARS = 1500
+    DOC_CHUNK_MIN_CHARS = 300
+    # Interval sync background index dokumen (detik); <= 0 → hanya lewat CLI
+    # (python -m app.rag.document_index)
+    DOC_SYNC_INTERVAL = float(os.getenv("NANO_DOC_SYNC_INTERVAL", "30"))
+
+    # Budget output tool di conversation; kelebihannya disimpan di spill area
+    # dan bisa dibaca ulang lewat tool read_spill
+    TOOL_OUTPUT_MAX_TOKENS = 8000
+    TOOL_OUTPUT_PREVIEW_TOKENS = 2000
+    SPILL_ROOT = "app/data/spill/"
+    SPILL_TTL_HOURS = 24 * 7
+
+    # Blob store untuk arguments / output action besar di memory.json
+    BLOB_ROOT = "app/data/blobs/"
+    BLOB_MIN_BYTES = 1024
+    BLOB_COMPRESS_LEVEL = 6
+    BLOB_CACHE_SIZE = 256
+    USAGE_LEDGER_FILE = "app/data/usage/usage.jsonl"
+
+    # Harga model (USD per 1M token) untuk estimasi biaya di usage ledger
+    MODEL_PRICING = {
+        "gpt-5-mini": {"input": 0.25, "cached_input": 0.025, "output": 2.00},
+        "gpt-4o-mini": {"input": 0.15, "cached_input": 0.075, "output": 0.60},
+    }
+
+    # Daemon (Orchestrator tetap hangat, CLI hanya jadi client)
+    DAEMON_SOCKET = os.getenv("NANO_DAEMON_SOCKET", "app/data/nano.sock")
+    # Fallback TCP lokal untuk platform tanpa AF_UNIX
+    DAEMON_HOST = "127.0.0.1"
+    DAEMON_PORT = int(os.getenv("NANO_DAEMON_PORT", "8765"))
+
+    # Multi-worker (gunicorn.conf.py): model & index dimuat di master sebelum fork
+    PRELOAD_MODELS = os.getenv("NANO_PRELOAD", "0") == "1"
+    WORKER_TORCH_THREADS = int(os.getenv("NANO_WORKER_TORCH_THREADS", "1"))
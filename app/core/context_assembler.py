@@ -0,0 +1,246 @@
+# app/core/context_assembler.py
+
+from app.config import config
+from app.rag.lexical_index import tokenize
+from app.utils import metrics, token_count
+
+# Urutan section di prompt (sama seperti sebelum ada assembler)
+SECTIONS = [
+    ("summary", "Summary context"),
+    ("relevant", "Relevant context"),
+    ("documents", "Document context"),
+    ("recent", "Recent context"),
+]
+
+# Relevansi dasar turn di recent window (naik jika turn yang sama juga
+# ditemukan oleh relevant memory)
+RECENT_BASE_SCORE = 0.5
+
+
+def context_item(source: str, key: str, text: str, score: float = 0.0, recency: float = 0.0, order=0) -> dict:
+    """
+    Kandidat konteks dari satu source.
+    key    : identitas untuk dedup lintas source (mis. "turn:<chat_id>")
+    score  : relevansi 0..1 pada skala tetap source-nya (relevance_scale)
+    recency: 0..1, 1 = paling baru
+    order  : urutan tampil di dalam section
+    """
+    return {
+        "source": source,
+        "key": key,
+        "text": text,
+        "score": score,
+        "recency": recency,
+        "order": order,
+    }
+
+
+def relevance_scale(source: str) -> float:
+    """
+    Skor maksimum per source, supaya skor absolut tetap sebanding lintas
+    source: cosine (summary, documents, relevant tanpa hybrid) sudah 0..1,
+    sedangkan RRF dua ranker (dense + BM25) maksimal 2 / (k + 1) — hanya
+    hit peringkat 1 di kedua ranking yang mendapat 1.0.
+    """
+    if source == "relevant" and config.MEMORY_HYBRID:
+        return 2.0 / (config.MEMORY_RRF_K + 1)
+    return 1.0
+
+
+def _scaled(records: list[dict], source: str) -> list[float]:
+    scale = relevance_scale(source)
+    return [max(r.get("score", 0), 0) / scale for r in records]
+
+
+def summary_items(memory, records: list[dict]) -> list[dict]:
+    return [
+        context_item(
+            "summary",
+            f"summary:{record.get('summary_id')}",
+            memory.summary_str([record]),
+            score=score,
+            order=-score,
+        )
+        for record, score in zip(records, _scaled(records, "summary"))
+    ]
+
+
+def relevant_items(memory, records: list[dict]) -> list[dict]:
+    return [
+        context_item(
+            "relevant",
+            f"turn:{record.get('chat_id')}",
+            memory.format_str([record]),
+            score=score,
+            order=-score,
+        )
+        for record, score in zip(records, _scaled(records, "relevant"))
+    ]
+
+
+def document_items(memory, chunks: list[dict]) -> list[dict]:
+    return [
+        context_item(
+            "documents",
+            f"chunk:{chunk.get('chunk_id') or (chunk.get('path'), chunk.get('start_line'))}",
+            memory.format_str([chunk]),
+            score=score,
+            order=-score,
+        )
+        for chunk, score in zip(chunks, _scaled(chunks, "documents"))
+    ]
+
+
+def recent_items(memory, records: list[dict]) -> list[dict]:
+    """records kronologis (lama → baru)."""
+    total = len(records)
+    return [
+        context_item(
+            "recent",
+            f"turn:{record.get('chat_id')}",
+            memory.format_str([record]),
+            score=RECENT_BASE_SCORE,
+            recency=(i + 1) / total,
+            order=i,
+        )
+        for i, record in enumerate(records)
+    ]
+
+
+def _similarity(a: set, b: set) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class ContextAssembler:
+    """
+    Menyusun konteks dari semua source (summary, relevant, documents, recent)
+    dalam satu budget token global, menggantikan budget terpisah per source.
+
+    1. Item dengan key sama (turn yang muncul di relevant & recent) digabung;
+       item yang isinya hampir sama (Jaccard token ≥ dedup_threshold,
+       mis. summary berulang) hanya disimpan yang utility-nya tertinggi.
+    2. `min_recent` turn terbaru selalu diambil dulu (kontinuitas percakapan).
+    3. Sisa budget diisi greedy dengan MMR:
+       λ · utility − (1 − λ) · max similarity ke item yang sudah dipilih,
+       utility = bobot source · score + recency_weight · recency.
+    """
+
+    def __init__(
+        self,
+        max_tokens: int | None = None,
+        mmr_lambda: float | None = None,
+        dedup_threshold: float | None = None,
+        min_recent: int | None = None,
+    ):
+        self.max_tokens = max_tokens or config.CONTEXT_MAX_TOKENS
+        self.mmr_lambda = config.CONTEXT_MMR_LAMBDA if mmr_lambda is None else mmr_lambda
+        self.dedup_threshold = (
+            config.CONTEXT_DEDUP_THRESHOLD if dedup_threshold is None else dedup_threshold
+        )
+        self.min_recent = config.CONTEXT_MIN_RECENT if min_recent is None else min_recent
+        self.header_tokens = {
+            source: token_count(f"{title}:\n") for source, title in SECTIONS
+        }
+
+    def utility(self, item: dict) -> float:
+        weight = config.CONTEXT_SOURCE_WEIGHTS.get(item["source"], 1.0)
+        return weight * item["score"] + config.CONTEXT_RECENCY_WEIGHT * item["recency"]
+
+    def _merge(self, items: list[dict]) -> list[dict]:
+        merged: dict = {}
+        for item in items:
+            existing = merged.get(item["key"])
+            if existing is None:
+                merged[item["key"]] = dict(item)
+                continue
+            # Turn yang sama: tampil di recent (kronologis), skor relevansi terbaik dipakai
+            if item["source"] == "recent":
+                item = dict(item, score=max(item["score"], existing["score"]))
+                merged[item["key"]] = item
+            else:
+                existing["score"] = max(existing["score"], item["score"])
+        return list(merged.values())
+
+    def _drop_near_duplicates(self, items: list[dict]) -> tuple[list[dict], int]:
+        kept = []
+        for item in sorted(items, key=lambda i: i["utility"], reverse=True):
+            if any(
+                _similarity(item["terms"], other["terms"]) >= self.dedup_threshold
+                for other in kept
+            ):
+                continue
+            kept.append(item)
+        return kept, len(items) - len(kept)
+
+    @metrics.timed("context_assemble")
+    def assemble(self, items: list[dict]) -> dict:
+        """
+        Pilih item dalam budget. Hasil:
+        {"messages": [system message per section], "tokens": int,
+         "candidates": int, "selected": int, "duplicates": int}
+        """
+        candidates = self._merge(items)
+        for item in candidates:
+            item["tokens"] = token_count(item["text"])
+            item["terms"] = set(tokenize(item["text"]))
+            item["utility"] = self.utility(item)
+        total = len(candidates)
+        candidates, duplicates = self._drop_near_duplicates(candidates)
+
+        selected: list[dict] = []
+        used = 0
+
+        def cost(item):
+            sections = {s["source"] for s in selected}
+            header = 0 if item["source"] in sections else self.header_tokens[item["source"]]
+            return item["tokens"] + header
+
+        def take(item):
+            nonlocal used
+            used += cost(item)
+            selected.append(item)
+            candidates.remove(item)
+
+        # Turn terbaru selalu masuk; turn terbaru pertama bahkan jika melebihi budget
+        recent = sorted(
+            (i for i in candidates if i["source"] == "recent"),
+            key=lambda i: i["recency"],
+            reverse=True,
+        )
+        for rank, item in enumerate(recent[: self.min_recent]):
+            if rank == 0 or used + cost(item) <= self.max_tokens:
+                take(item)
+
+        while candidates:
+            best, best_value = None, None
+            for item in candidates:
+                if used + cost(item) > self.max_tokens:
+                    continue
+                redundancy = max(
+                    (_similarity(item["terms"], s["terms"]) for s in selected), default=0.0
+                )
+                value = self.mmr_lambda * item["utility"] - (1 - self.mmr_lambda) * redundancy
+                if best_value is None or value > best_value:
+                    best, best_value = item, value
+            if best is None:
+                break
+            take(best)
+
+        messages = []
+        for source, title in SECTIONS:
+            blocks = sorted(
+                (i for i in selected if i["source"] == source), key=lambda i: i["order"]
+            )
+            if blocks:
+                text = "\n\n".join(i["text"] for i in blocks)
+                messages.append({"role": "system", "content": f"{title}:\n{text}"})
+
+        return {
+            "messages": messages,
+            "tokens": used,
+            "candidates": total,
+            "selected": len(selected),
+            "duplicates": duplicates,
+        }
@@ -1,59 +1,142 @@
 # # app/core/orchestrator.py
 
-from app.utils import log, token_count
+from app.utils import log, metrics, token_count, tracer
 from app.agent import Agent
 from app.services.model_openai import ModelOpenAI
 from app.tools.tools_calling import ToolsCalling
 from app.memory.recent_memory import RecentMemory
 from app.memory.relevant_memory import RelevantMemory
 from app.memory.summary_memory import SummaryMemory
+from app.memory.document_memory import DocumentMemory
+from app.config import config
+from app.rag.lexical_index import get_lexical_index
+from .context_assembler import (
+    ContextAssembler,
+    document_items,
+    recent_items,
+    relevant_items,
+    summary_items,
+)
 
 
 class Orchestrator:
-    def __init__(self):
-        self.tools_mgr = ToolsCalling()
+    def __init__(self, model=None, tools_mgr=None, summary_model=None):
+        """
+        model / tools_mgr / summary_model opsional untuk injeksi
+        (mis. model replay & tool sandbox di benchmarks/replay.py).
+        """
+        self.tools_mgr = tools_mgr or ToolsCalling()
+        self.summary_model = summary_model
 
         # Init memory sekali saja
-        self.summary = SummaryMemory(top_k=3, max_tokens=1024, min_score=0.3)
-        self.relevant = RelevantMemory(
-            top_k=5, last_n=10, min_score=0.3, max_tokens=1024
-        )
-        self.recent = RecentMemory(last_n=10, max_tokens=2048)
+        # Budget token global dipegang ContextAssembler (CONTEXT_MAX_TOKENS),
+        # source hanya menentukan jumlah kandidat
+        self.summary = SummaryMemory(top_k=3, min_score=0.3)
+        self.relevant = RelevantMemory(top_k=5, last_n=10, min_score=0.3)
+        self.recent = RecentMemory(last_n=10)
+        self.documents = DocumentMemory(top_k=5, min_score=0.3)
+        self.assembler = ContextAssembler()
 
         # Model cukup init sekali
-        self.model = ModelOpenAI("gpt-5-mini")
+        self.model = model or ModelOpenAI("gpt-5-mini")
 
-    def process_message(self, prompt, session_id="default"):
-        messages = []
+    def warmup(self):
+        """
+        Muat bobot embedder dan encoding tiktoken lebih awal.
+        Konstruktor sengaja tidak memuat apa pun; panggil ini di background
+        thread supaya request pertama tidak menanggung biaya load model.
+        """
+        # Hanya load bobot, tanpa encode: thread pool torch/OpenMP belum
+        # dibuat sehingga aman di-fork (lihat gunicorn.conf.py)
+        self.relevant.vm.embedder.model
+        token_count("warmup")
 
-        personality = "Your name is Nano. You are an advanced AI assistant designed to assist users."
-        messages.append({"role": "system", "content": personality})
+        memory_total = self.relevant.vm.preload(self.relevant.memory_vector_file)
+        if config.MEMORY_HYBRID:
+            get_lexical_index(self.relevant.memory_vector_file).sync(self.relevant.vm.metadata)
+        summary_total = self.summary.vm.preload(self.summary.summary_vector_file)
+        document_total = self.documents.index.vm.preload(self.documents.index.index_path)
+        log.info(
+            f"Orchestrator warmup selesai (memory: {memory_total}, summary: {summary_total}, documents: {document_total} vectors)."
+        )
 
-        # Use existing instances
-        summary_data = self.summary.get_summary_memory(prompt)
-        if summary_data:
-            log.info(f"Summary Memory Token Count: {token_count(summary_data)}")
-            messages.append(
-                {"role": "system", "content": f"Summary context:\n{summary_data}"}
-            )
+    def start_background_tasks(self):
+        """
+        Mulai pekerjaan berkala di luar jalur request (sync index dokumen).
+        Panggil per proses setelah fork: thread tidak ikut ter-fork, dan
+        encode di master sebelum fork membuat thread pool torch.
+        """
+        self.documents.index.start_background_sync()
 
-        relevant_data = self.relevant.get_relevant_memory(prompt)
-        if relevant_data:
-            log.info(f"Relevant Memory Token Count: {token_count(relevant_data)}")
-            messages.append(
-                {"role": "system", "content": f"Relevant context:\n{relevant_data}"}
-            )
+    @metrics.timed("turn")
+    def process_message(self, prompt, session_id="default", on_delta=None):
+        with tracer.span(
+            "orchestrator.process_message",
+            **{"session.id": session_id, "prompt.chars": len(prompt)},
+        ):
+            messages = []
+
+            personality = "Your name is Nano. You are an advanced AI assistant designed to assist users."
+            messages.append({"role": "system", "content": personality})
+
+            # Kandidat dari semua source; pemilihan dalam satu budget token
+            # global dilakukan ContextAssembler (dedup lintas source + MMR)
+            items = []
+            with metrics.timer("retrieval", source="summary"), tracer.span(
+                "retrieval.summary", **{"retrieval.source": "summary"}
+            ) as span:
+                summaries = self.summary.search_summaries(prompt)
+                span.set_attribute("retrieval.candidates", len(summaries))
+            items += summary_items(self.summary, summaries)
 
-        recent_data = self.recent.get_recent_memory()
-        log.info(f"Recent Memory Token Count: {token_count(recent_data)}")
-        if recent_data:
-            messages.append(
-                {"role": "system", "content": f"Recent context:\n{recent_data}"}
+            with metrics.timer("retrieval", source="relevant"), tracer.span(
+                "retrieval.relevant", **{"retrieval.source": "relevant"}
+            ) as span:
+                relevant = self.relevant.search_relevant(prompt, exclude_recent=False)
+                span.set_attribute("retrieval.candidates", len(relevant))
+            items += relevant_items(self.relevant, relevant)
+
+            with metrics.timer("retrieval", source="documents"), tracer.span(
+                "retrieval.documents", **{"retrieval.source": "documents"}
+            ) as span:
+                chunks = self.documents.search_chunks(prompt)
+                span.set_attribute("retrieval.candidates", len(chunks))
+            items += document_items(self.documents, chunks)
+
+            with metrics.timer("retrieval", source="recent"), tracer.span(
+                "retrieval.recent", **{"retrieval.source": "recent"}
+            ) as span:
+                recent = self.recent.load_recent()
+                span.set_attribute("retrieval.candidates", len(recent))
+            items += recent_items(self.recent, recent)
+
+            with tracer.span("context.assemble") as span:
+                context = self.assembler.assemble(items)
+                span.set_attributes(
+                    {
+                        "context.candidates": context["candidates"],
+                        "context.selected": context["selected"],
+                        "context.duplicates": context["duplicates"],
+                        "context.tokens": context["tokens"],
+                    }
+                )
+            log.info(
+                "Context: {} / {} kandidat, {} duplikat, {} token",
+                context["selected"],
+                context["candidates"],
+                context["duplicates"],
+                context["tokens"],
             )
+            messages.extend(context["messages"])
 
-        messages.append({"role": "user", "content": prompt})
+            messages.append({"role": "user", "content": prompt})
 
-        agent = Agent(
-            model=self.model, messages=messages, tools=self.tools_mgr.tools_schema()
-        )
-        return agent.run()
+            agent = Agent(
+                model=self.model,
+                messages=messages,
+                tools=self.tools_mgr.tools_schema(),
+                session_id=session_id,
+                tools_mgr=self.tools_mgr,
+                summary_model=self.summary_model,
+            )
+            return agent.run(on_delta=on_delta)
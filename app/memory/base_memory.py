@@ -1,21 +1,44 @@
 # app/memory/memory_manager.py
 
 import os
-from app.utils import FileManager, generate_id, get_current_time, log, token_count
+from app.config import config
+from app.utils import (
+    FileManager,
+    FileLock,
+    generate_id,
+    get_current_time,
+    log,
+    metrics,
+    token_count,
+    tracer,
+)
+from app.rag.lexical_index import get_lexical_index
 from app.rag.vector_store import VectorStore
+from .blob_store import get_blob_store
+from .conversation_store import get_conversation_store
 
 
 class BaseMemory:
     def __init__(self):
         self.fm = FileManager()
         self.vm = VectorStore()
-        self.root_memory = "app/data/memory/default/"
-        self.root_vector = "app/data/vector_store/memory/default/"
+        self.root_memory = os.path.join(config.MEMORY_ROOT, "default")
+        self.root_vector = os.path.join(config.VECTOR_ROOT, "memory", "default")
 
         self.memory_file = os.path.join(self.root_memory, "memory.json")
         self.summary_file = os.path.join(self.root_memory, "summary.json")
         self.count_summary_file = os.path.join(self.root_memory, "count_summary.json")
         self.memory_vector_file = os.path.join(self.root_vector, "memory.index")
+        self.write_lock_file = os.path.join(self.root_memory, ".write.lock")
+        self.store = get_conversation_store(self.memory_file)
+        self.blobs = get_blob_store()
+
+    def write_lock(self) -> FileLock:
+        """
+        Lock tulis lintas proses untuk file memory (json + index).
+        Hanya pemegang lock yang boleh menulis; worker lain menunggu.
+        """
+        return FileLock(self.write_lock_file)
 
     def _ensure_memory_files(self):
         if not os.path.exists(self.memory_file):
@@ -39,10 +62,11 @@ class BaseMemory:
 
             if record.get("actions"):
                 for actions in record.get("actions", []):
-                    parts.append(
-                        f"Action Call: {actions['name']}({actions['arguments']})"
-                    )
-                    parts.append(f"Action Out: {actions['output']}")
+                    # Ref blob baru dibaca di sini (di-cache per blob)
+                    arguments = self.blobs.hydrate(actions["arguments"])
+                    output = self.blobs.hydrate(actions.get("output"))
+                    parts.append(f"Action Call: {actions['name']}({arguments})")
+                    parts.append(f"Action Out: {output}")
 
             parts.append(f"Assistant: {record.get('assistant')}")
             block = "\n".join(parts)
@@ -50,6 +74,7 @@ class BaseMemory:
 
         return "\n\n".join(conversation_blocks)
 
+    @metrics.timed("memory_persist")
     def save_memory(self, messages: list[dict]):
         self._ensure_memory_files()
 
@@ -97,29 +122,46 @@ class BaseMemory:
         if current["user"] or current["assistant"] or current["actions"]:
             conversations.append(current)
 
-        self.memory_file = os.path.join(self.root_memory, "memory.json")
-        self.fm.append_json(self.memory_file, conversations)
+        # Arguments / output besar → blob store, record cukup menyimpan ref
+        for record in conversations:
+            self.blobs.offload_record(record)
 
-        if current["user"] and current.get("chat_id"):
-            self.memory_vector_file = os.path.join(self.root_vector, "memory.index")
-            self.vm.add_vector(current["user"], current, self.memory_vector_file)
+        self.memory_file = os.path.join(self.root_memory, "memory.json")
+        with tracer.span(
+            "memory.save", **{"memory.records": len(conversations)}
+        ) as span:
+            self.fm.append_json(self.memory_file, conversations)
+
+            if current["user"] and current.get("chat_id"):
+                self.memory_vector_file = os.path.join(self.root_vector, "memory.index")
+                self.vm.add_vector(current["user"], current, self.memory_vector_file)
+                span.set_attribute("memory.vectorized", True)
+
+                # Index BM25 mengikuti urutan metadata FAISS (dipegang lock tulis)
+                if config.MEMORY_HYBRID:
+                    get_lexical_index(self.memory_vector_file).sync(
+                        self.vm.metadata, persist=True
+                    )
 
+    @metrics.timed("memory_load")
     def load_memory(self, last_n: int = None) -> list:
         if not os.path.exists(self.memory_file):
             log.warning(f"Memory file '{self.memory_file}' does not exist.")
             return []
 
+        # N record terakhir dibaca lewat offset index, tanpa parse seluruh file
+        if isinstance(last_n, int):
+            return self.store.tail(last_n)
+
         data = self.fm.read_json(self.memory_file)
 
         if not isinstance(data, list):
             log.error("Memory file content is invalid (expected list).")
             return []
 
-        if isinstance(last_n, int):
-            return data[-last_n:]
-
         return data
 
+    @metrics.timed("token_trim")
     def filter_memory(
         self, data: list[dict], max_tokens: int = 1000, sort_by_score=False
     ):
@@ -143,6 +185,7 @@ class BaseMemory:
 
         return records
 
+    @metrics.timed("memory_load")
     def load_all_memory(self) -> list:
         """Memuat seluruh riwayat chat yang tersimpan (TANPA filter)"""
         if not os.path.exists(self.memory_file):
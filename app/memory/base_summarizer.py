@@ -1,23 +1,39 @@
 # app/utils/summary_file_manager.py
 
+import json
 import os
+from app.config import config
 from app.rag.vector_store import VectorStore
-from app.utils import FileManager, token_count, log, generate_id, get_current_time
+from app.utils import (
+    FileManager,
+    FileLock,
+    token_count,
+    log,
+    metrics,
+    generate_id,
+    get_current_time,
+    tracer,
+)
+from app.utils.files_manager.size_index import size_index
 from app.services.model_openai import ModelOpenAI
 
 
 class BaseSummarizer:
-    def __init__(self):
-        self.memory_root = "app/data/memory/default/"
-        self.vector_root = "app/data/vector_store/memory/default/"
+    def __init__(self, model: ModelOpenAI | None = None):
+        self.memory_root = os.path.join(config.MEMORY_ROOT, "default")
+        self.vector_root = os.path.join(config.VECTOR_ROOT, "memory", "default")
 
         self.summary_file = os.path.join(self.memory_root, "summary.json")
         self.count_summary_file = os.path.join(self.memory_root, "count_summary.json")
         self.summary_vector_file = os.path.join(self.vector_root, "summary.index")
+        # Summary yang sudah digabung ke level atas (cold, append-only)
+        self.archive_file = os.path.join(self.memory_root, "summary_archive.jsonl")
+        # Lock yang sama dengan BaseMemory (satu penulis untuk seluruh memory)
+        self.write_lock_file = os.path.join(self.memory_root, ".write.lock")
 
         self.vector = VectorStore()
         self.fm = FileManager()
-        self.model = ModelOpenAI("gpt-4o-mini")
+        self.model = model or ModelOpenAI("gpt-4o-mini")
 
     def load_summary(self, last_n: int = None) -> list[dict]:
         if not os.path.exists(self.summary_file):
@@ -31,6 +47,7 @@ class BaseSummarizer:
 
         if isinstance(last_n, int):
             return data[-last_n:]
+        return data
 
     def save_summary(self, summary_data=[]):
         self.summary_file = os.path.join(self.memory_root, "summary.json")
@@ -46,9 +63,14 @@ class BaseSummarizer:
             return ""
         blocks = []
         for s in data:
-            blocks.append(f"Date: {s.get('date')}\nSummary: {s.get('summary')}")
+            # Summary level atas mencakup rentang waktu anak-anaknya
+            date = s.get("date")
+            if s.get("level") and s.get("date_start"):
+                date = f"{s.get('date_start')} – {date}"
+            blocks.append(f"Date: {date}\nSummary: {s.get('summary')}")
         return "\n\n".join(blocks)
 
+    @metrics.timed("token_trim")
     def filter_summary(
         self, data: list[dict], max_tokens: int = 1000, sort_by_score=True
     ):
@@ -89,32 +111,174 @@ class BaseSummarizer:
         self.fm.write_json(self.count_summary_file, counter_data)
         return True
 
-    def create_summary(self, prompt: str, text: str):
-        prompt_system = (
-            "You are a summarization assistant.\n"
-            "Your task is to read a conversation between a user and an AI, then produce a concise factual summary in plain paragraph form.\n"
-            "Guidelines:\n"
-            "- Focus only on the main questions, answers, and key facts.\n"
-            "- Keep the tone neutral and objective.\n"
-            "- Do not include greetings or small talk unless critical for context.\n"
-            "- Output must be a single short paragraph (3–5 sentences).\n"
-            "- The goal is to make the summary usable as memory recall that can be provided back to the AI model.\n"
-        )
-
-        messages = [
-            {"role": "system", "content": prompt_system},
-            {"role": "user", "content": text},
+    @metrics.timed("summarization")
+    def create_summary(self, prompt: str, text: str, session_id: str = "default"):
+        with tracer.span(
+            "summary.create",
+            **{"session.id": session_id, "summary.input_chars": len(text)},
+        ) as span:
+            prompt_system = (
+                "You are a summarization assistant.\n"
+                "Your task is to read a conversation between a user and an AI, then produce a concise factual summary in plain paragraph form.\n"
+                "Guidelines:\n"
+                "- Focus only on the main questions, answers, and key facts.\n"
+                "- Keep the tone neutral and objective.\n"
+                "- Do not include greetings or small talk unless critical for context.\n"
+                "- Output must be a single short paragraph (3–5 sentences).\n"
+                "- The goal is to make the summary usable as memory recall that can be provided back to the AI model.\n"
+            )
+
+            messages = [
+                {"role": "system", "content": prompt_system},
+                {"role": "user", "content": text},
+            ]
+
+            response = self.model.call(
+                messages=messages, session_id=session_id, stage="summary"
+            )
+
+            span.set_attribute("summary.chars", len(response.output_text or ""))
+
+            summary_data = {
+                "summary_id": generate_id("smr"),
+                "summary": response.output_text,
+                "date": get_current_time(),
+                # Teks yang di-embed; disimpan supaya index bisa dibangun ulang
+                "prompt": prompt,
+            }
+
+            # Panggilan model di atas sengaja di luar lock
+            with FileLock(self.write_lock_file):
+                self.save_summary(summary_data)
+
+                vector_summary_file = os.path.join(self.vector_root, "summary.index")
+                self.vector.add_vector(prompt, summary_data, vector_summary_file)
+
+        if config.SUMMARY_FANOUT > 1:
+            try:
+                self.roll_up(session_id=session_id)
+            except Exception as e:
+                # Summary level 0 sudah tersimpan; grup dicoba lagi di summary berikutnya
+                log.error(f"Roll-up summary gagal: {e}")
+
+    def _pending(self, summaries: list[dict], level: int) -> list[dict]:
+        """Summary level `level` yang belum digabung ke level atas (lama → baru)."""
+        return [
+            s
+            for s in summaries
+            if s.get("level", 0) == level and not s.get("parent_id")
         ]
 
-        response = self.model.call(messages=messages)
+    def roll_up(self, session_id: str = "default", drain: bool = False) -> int:
+        """
+        Gabungkan FANOUT summary tertua yang belum digabung di setiap level
+        menjadi satu summary level berikutnya, mulai dari level 0 ke atas.
+
+        Default satu grup per level per panggilan (dipanggil setelah setiap
+        summary baru), jadi backlog lama terkuras bertahap; drain=True
+        menggabung semua grup yang sudah penuh. Return: jumlah summary baru.
+        """
+        fanout = config.SUMMARY_FANOUT
+        created = 0
+        level = 0
+        while True:
+            summaries = self.load_summary()
+            if level > max((s.get("level", 0) for s in summaries), default=0):
+                break
+
+            group = self._pending(summaries, level)[:fanout]
+            if len(group) == fanout and self._condense(group, level + 1, session_id):
+                created += 1
+                if drain:
+                    continue  # level yang sama, grup berikutnya
+            level += 1
+        return created
+
+    def _condense(self, group: list[dict], level: int, session_id: str) -> dict | None:
+        with tracer.span(
+            "summary.rollup",
+            **{"session.id": session_id, "summary.level": level, "summary.children": len(group)},
+        ) as span:
+            prompt_system = (
+                "You are a summarization assistant.\n"
+                "You will receive several chronological summaries of earlier conversations between a user and an AI.\n"
+                "Merge them into one condensed factual summary in plain paragraph form.\n"
+                "Guidelines:\n"
+                "- Keep key facts, decisions, names, file paths, and open tasks; drop repetition.\n"
+                "- Preserve the chronological order of events when it matters.\n"
+                "- Output must be a single paragraph (4–6 sentences).\n"
+            )
+            messages = [
+                {"role": "system", "content": prompt_system},
+                {"role": "user", "content": self.summary_str(group)},
+            ]
+
+            # Panggilan model di luar lock, sama seperti create_summary
+            response = self.model.call(
+                messages=messages, session_id=session_id, stage="summary_rollup"
+            )
+
+            child_ids = [s["summary_id"] for s in group]
+            parent = {
+                "summary_id": generate_id("smr"),
+                "summary": response.output_text,
+                "date": get_current_time(),
+                "date_start": group[0].get("date_start") or group[0].get("date"),
+                "level": level,
+                "children": child_ids,
+            }
+
+            with FileLock(self.write_lock_file):
+                summaries = self.load_summary()
+                pending_ids = {s["summary_id"] for s in self._pending(summaries, level - 1)}
+                if not set(child_ids) <= pending_ids:
+                    # Proses lain sudah menggabung grup yang sama
+                    span.set_attribute("summary.skipped", True)
+                    return None
+
+                children = set(child_ids)
+                if config.SUMMARY_ARCHIVE:
+                    archived = [s for s in summaries if s.get("summary_id") in children]
+                    with open(self.archive_file, "a", encoding="utf-8") as f:
+                        for record in archived:
+                            record["parent_id"] = parent["summary_id"]
+                            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+                    size_index.touch([self.archive_file])
+                    summaries = [s for s in summaries if s.get("summary_id") not in children]
+                    removed = self.vector.remove_vectors(
+                        self.summary_vector_file, "summary_id", children
+                    )
+                    span.set_attribute("summary.archived", removed)
+                else:
+                    for record in summaries:
+                        if record.get("summary_id") in children:
+                            record["parent_id"] = parent["summary_id"]
+
+                summaries.append(parent)
+                self.fm.write_json(self.summary_file, summaries)
+                # Summary level atas di-embed dari teks summary-nya sendiri
+                self.vector.add_vector(parent["summary"], parent, self.summary_vector_file)
+
+            log.info(
+                "Summary level {} dibuat dari {} summary level {}", level, len(group), level - 1
+            )
+            return parent
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Gabungkan backlog summary.json menjadi summary bertingkat."
+    )
+    parser.parse_args(argv)
 
-        summary_data = {
-            "summary_id": generate_id("smr"),
-            "summary": response.output_text,
-            "date": get_current_time(),
-        }
+    if config.SUMMARY_FANOUT < 2:
+        print("SUMMARY_FANOUT < 2: roll-up nonaktif.")
+        return
+    created = BaseSummarizer().roll_up(drain=True)
+    print(f"{created} summary level atas dibuat.")
 
-        self.save_summary(summary_data)
 
-        vector_summary_file = os.path.join(self.vector_root, "summary.index")
-        self.vector.add_vector(prompt, summary_data, vector_summary_file)
+if __name__ == "__main__":
+    main()
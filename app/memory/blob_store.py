@@ -0,0 +1,221 @@
+# app/memory/blob_store.py
+
+import argparse
+import contextlib
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+import zlib
+from functools import lru_cache
+from app.config import config
+from app.utils import FileLock, log
+from app.utils.files_manager.size_index import size_index
+
+BLOB_KEY = "$blob"
+
+
+class BlobStore:
+    """
+    Penyimpanan blob content-addressed untuk arguments / output action
+    yang besar di memory.json.
+
+    - Alamat = sha256 isi → output identik (mis. file yang sama dibaca
+      berulang) hanya disimpan sekali.
+    - Isi dikompres zlib di `<root>/<2 hex>/<sha256>.z`.
+    - Tidak ada refcount yang disimpan: `gc(records)` menghitung ulang
+      ref dari semua store record (lihat `iter_store_records`) lalu
+      menghapus blob yang tidak lagi ditunjuk.
+    - Record hanya menyimpan `{"$blob": sha256, "bytes": n}`; isi dibaca
+      (dan di-cache) saat record diformat ke konteks.
+    """
+
+    def __init__(self, root: str | None = None):
+        self.root = root = root or config.BLOB_ROOT
+        self.lock_file = os.path.join(root, ".lock")
+        self.get = lru_cache(maxsize=config.BLOB_CACHE_SIZE)(self._read)
+
+    def _path(self, digest: str) -> str:
+        return os.path.join(self.root, digest[:2], f"{digest}.z")
+
+    # =====================================
+    # READ / WRITE
+    # =====================================
+    def put(self, text: str) -> dict:
+        """Simpan teks (jika belum ada) dan kembalikan ref-nya."""
+        data = text.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._path(digest)
+
+        if os.path.exists(path):
+            # Sentuh mtime: blob yang dipakai ulang masuk masa tenggang gc()
+            os.utime(path)
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(zlib.compress(data, config.BLOB_COMPRESS_LEVEL))
+            os.replace(tmp, path)
+            size_index.touch([path])
+
+        return {BLOB_KEY: digest, "bytes": len(data)}
+
+    def _read(self, digest: str) -> str | None:
+        try:
+            with open(self._path(digest), "rb") as f:
+                return zlib.decompress(f.read()).decode("utf-8")
+        except (OSError, zlib.error) as e:
+            log.error(f"Blob '{digest}' tidak bisa dibaca: {e}")
+            return None
+
+    def hydrate(self, value):
+        """Ref → isi blob; nilai biasa dikembalikan apa adanya."""
+        if isinstance(value, dict) and BLOB_KEY in value:
+            text = self.get(value[BLOB_KEY])
+            return text if text is not None else f"[missing blob {value[BLOB_KEY]}]"
+        return value
+
+    # =====================================
+    # RECORDS
+    # =====================================
+    def offload_record(self, record: dict) -> dict:
+        """
+        Pindahkan arguments / output action di atas BLOB_MIN_BYTES ke blob.
+        Record diubah di tempat.
+        """
+        for action in record.get("actions") or []:
+            for field in ("arguments", "output"):
+                value = action.get(field)
+                if isinstance(value, str) and len(value) >= config.BLOB_MIN_BYTES:
+                    action[field] = self.put(value)
+        return record
+
+    @staticmethod
+    def record_refs(record) -> list[str]:
+        """Semua digest `{"$blob": ...}` di mana pun di dalam record (rekursif)."""
+        refs, stack = [], [record]
+        while stack:
+            value = stack.pop()
+            if isinstance(value, dict):
+                if isinstance(value.get(BLOB_KEY), str):
+                    refs.append(value[BLOB_KEY])
+                else:
+                    stack.extend(value.values())
+            elif isinstance(value, list):
+                stack.extend(value)
+        return refs
+
+    # =====================================
+    # GC
+    # =====================================
+    def live_refs(self, records) -> set[str]:
+        """Digest yang masih ditunjuk oleh `records`."""
+        return {digest for record in records for digest in self.record_refs(record)}
+
+    def gc(self, records, grace_seconds: int = 3600) -> int:
+        """
+        Hapus blob yang tidak ditunjuk oleh satu pun record.
+
+        Tidak ada refcount inkremental: himpunan ref dihitung ulang dari
+        `records` setiap kali gc jalan, jadi record yang dihapus / ditulis
+        ulang tidak perlu memberi tahu blob store. Blob yang baru ditulis /
+        disentuh (< grace_seconds) dilewati karena record-nya mungkin belum
+        ter-append.
+        """
+        live = self.live_refs(records)
+        removed = 0
+        cutoff = time.time() - grace_seconds
+        with FileLock(self.lock_file):
+            for dirpath, _, filenames in os.walk(self.root):
+                for name in filenames:
+                    if not name.endswith(".z") or name[:-2] in live:
+                        continue
+                    path = os.path.join(dirpath, name)
+                    if os.path.getmtime(path) < cutoff:
+                        os.remove(path)
+                        size_index.touch([path])
+                        removed += 1
+        if removed:
+            self.get.cache_clear()
+
+        log.info("Blob GC: {} blob dihapus, {} masih dipakai", removed, len(live))
+        return removed
+
+
+_stores: dict[str, BlobStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_blob_store(root: str | None = None) -> BlobStore:
+    """Satu BlobStore (beserta cache isinya) per root dalam satu proses."""
+    root = root or config.BLOB_ROOT
+    key = os.path.abspath(root)
+    with _stores_lock:
+        if key not in _stores:
+            _stores[key] = BlobStore(root)
+        return _stores[key]
+
+
+def iter_store_records(memory_root: str | None = None, vector_root: str | None = None):
+    """
+    Semua record yang bisa memegang ref blob, dari setiap store di disk:
+    memory.json setiap sesi, file JSON / JSONL lain di MEMORY_ROOT
+    (summary, arsip summary), dan metadata index di VECTOR_ROOT (salinan
+    record memory). Asumsi GC: ref blob hanya hidup di store-store ini;
+    export (/api/history/export) menulis isi yang sudah di-hydrate, dan
+    record yang sedang ditulis dilindungi masa tenggang gc().
+    """
+    from .conversation_store import get_conversation_store
+
+    roots = [
+        (memory_root or config.MEMORY_ROOT, (".json", ".jsonl")),
+        (vector_root or config.VECTOR_ROOT, (".meta.json",)),
+    ]
+    for root, suffixes in roots:
+        for dirpath, _, filenames in os.walk(root):
+            for name in sorted(filenames):
+                if not name.endswith(suffixes):
+                    continue
+                path = os.path.join(dirpath, name)
+                try:
+                    if name == "memory.json":
+                        yield from get_conversation_store(path).iter_records()
+                    elif name.endswith(".jsonl"):
+                        with open(path, "r", encoding="utf-8") as f:
+                            for line in f:
+                                if line.strip():
+                                    yield json.loads(line)
+                    else:
+                        with open(path, "r", encoding="utf-8") as f:
+                            data = json.load(f)
+                        yield from data if isinstance(data, list) else [data]
+                except (OSError, ValueError) as e:
+                    # Store yang tidak terbaca bisa menyembunyikan ref: jangan GC
+                    raise RuntimeError(f"Tidak bisa membaca '{path}' untuk GC blob: {e}") from e
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Hitung ulang ref blob dari semua store record lalu hapus blob yatim."
+    )
+    parser.add_argument("--memory-root", default=config.MEMORY_ROOT)
+    parser.add_argument("--vector-root", default=config.VECTOR_ROOT)
+    parser.add_argument("--grace-seconds", type=int, default=3600)
+    args = parser.parse_args(argv)
+
+    store = get_blob_store()
+    # Lock tulis setiap sesi memory: tidak ada record baru selama ref dihitung ulang
+    with contextlib.ExitStack() as stack:
+        for dirpath, _, filenames in os.walk(args.memory_root):
+            if "memory.json" in filenames:
+                stack.enter_context(FileLock(os.path.join(dirpath, ".write.lock")))
+        removed = store.gc(
+            iter_store_records(args.memory_root, args.vector_root), args.grace_seconds
+        )
+    print(f"removed: {removed}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+# app/memory/conversation_store.py
+
+import json
+import os
+import threading
+from array import array
+from app.utils import FileLock, log
+from app.utils.files_manager.size_index import size_index
+
+_WHITESPACE_AND_SEPARATORS = " \t\r\n,["
+
+
+class ConversationStore:
+    """
+    Index offset byte untuk memory.json.
+
+    memory.json hanya pernah ditambah di akhir (append_json menulis ulang
+    list yang sama + record baru), sehingga offset record lama tetap valid.
+    Store ini menyimpan pasangan (start, end) byte setiap record di file
+    sidecar `memory.json.idx` dan hanya memindai bagian yang baru.
+    Membaca N record terakhir / satu halaman tidak lagi mem-parse seluruh file.
+    """
+
+    def __init__(self, memory_file: str):
+        self.memory_file = memory_file
+        self.index_file = memory_file + ".idx"
+        self._offsets = array("Q")
+        self._stamp = None
+        self._lock = threading.Lock()
+        self._loaded = False
+
+    # =====================================
+    # INDEX
+    # =====================================
+    def _file_stamp(self):
+        try:
+            stat = os.stat(self.memory_file)
+            return (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            return None
+
+    def _load_index_file(self):
+        self._loaded = True
+        if not os.path.exists(self.index_file):
+            return
+        offsets = array("Q")
+        try:
+            with open(self.index_file, "rb") as f:
+                offsets.frombytes(f.read())
+        except (OSError, ValueError):
+            return
+        if len(offsets) % 2 == 0:
+            self._offsets = offsets
+
+    def _read_range(self, start: int, end: int) -> bytes:
+        with open(self.memory_file, "rb") as f:
+            f.seek(start)
+            return f.read(end - start)
+
+    def _record_ok(self, i: int, size: int) -> bool:
+        start, end = self._offsets[2 * i], self._offsets[2 * i + 1]
+        if end > size or start >= end:
+            return False
+        try:
+            return isinstance(json.loads(self._read_range(start, end)), dict)
+        except ValueError:
+            return False
+
+    def _is_valid(self, size: int) -> bool:
+        """
+        Offset harus naik ketat (record tidak tumpang tindih / terduplikasi)
+        dan record pertama & terakhir masih berada di offset yang sama.
+        """
+        offsets = self._offsets
+        if any(offsets[i] >= offsets[i + 1] for i in range(len(offsets) - 1)):
+            return False
+        count = len(offsets) // 2
+        return count == 0 or (self._record_ok(0, size) and self._record_ok(count - 1, size))
+
+    def _scan(self, start_byte: int) -> array:
+        """Pindai record baru mulai dari `start_byte` sampai akhir list."""
+        with open(self.memory_file, "rb") as f:
+            f.seek(start_byte)
+            text = f.read().decode("utf-8")
+
+        decoder = json.JSONDecoder()
+        found = array("Q")
+        pos, char_cursor, byte_cursor = 0, 0, start_byte
+        length = len(text)
+
+        while True:
+            while pos < length and text[pos] in _WHITESPACE_AND_SEPARATORS:
+                pos += 1
+            if pos >= length or text[pos] == "]":
+                break
+
+            _, end = decoder.raw_decode(text, pos)
+            record_start = byte_cursor + len(text[char_cursor:pos].encode("utf-8"))
+            record_end = record_start + len(text[pos:end].encode("utf-8"))
+            found.extend((record_start, record_end))
+
+            pos = char_cursor = end
+            byte_cursor = record_end
+
+        return found
+
+    def _write_index(self, rewrite: bool):
+        """
+        Persist offset ke `.idx`. Beberapa worker bisa memindai record baru
+        yang sama, jadi di bawah lock hanya entry setelah entry terakhir di
+        file yang ditambahkan; file rusak / rebuild ditulis ulang atomik.
+        """
+        try:
+            with FileLock(self.index_file + ".lock"):
+                size = os.path.getsize(self.index_file) if os.path.exists(self.index_file) else 0
+                entry_bytes = 2 * self._offsets.itemsize
+                if rewrite or size % entry_bytes:
+                    tmp_path = self.index_file + ".tmp"
+                    with open(tmp_path, "wb") as f:
+                        f.write(self._offsets.tobytes())
+                    os.replace(tmp_path, self.index_file)
+                    size_index.touch([self.index_file])
+                    return
+
+                on_disk = size // self._offsets.itemsize
+                if on_disk < len(self._offsets):
+                    with open(self.index_file, "ab") as f:
+                        f.write(self._offsets[on_disk:].tobytes())
+                    size_index.touch([self.index_file])
+        except OSError as e:
+            log.warning(f"Gagal menulis index '{self.index_file}': {e}")
+
+    def refresh(self):
+        """Sinkronkan index dengan memory.json (incremental jika memungkinkan)."""
+        stamp = self._file_stamp()
+        if stamp == self._stamp:
+            return
+
+        with self._lock:
+            stamp = self._file_stamp()
+            if stamp == self._stamp:
+                return
+
+            if stamp is None:
+                self._offsets = array("Q")
+                self._stamp = None
+                return
+
+            if not self._loaded:
+                self._load_index_file()
+
+            size = stamp[1]
+            rewrite = False
+            if not self._is_valid(size):
+                log.warning(f"Index '{self.index_file}' tidak valid, dibangun ulang.")
+                self._offsets = array("Q")
+                rewrite = True
+
+            last_end = self._offsets[-1] if self._offsets else 0
+            try:
+                new_offsets = self._scan(last_end)
+            except ValueError as e:
+                log.error(f"Gagal memindai '{self.memory_file}': {e}")
+                return
+
+            self._offsets.extend(new_offsets)
+            if new_offsets or rewrite:
+                self._write_index(rewrite)
+            self._stamp = stamp
+
+    # =====================================
+    # READ
+    # =====================================
+    def count(self) -> int:
+        self.refresh()
+        return len(self._offsets) // 2
+
+    def span(self, start: int, end: int) -> tuple[int, int]:
+        """Rentang byte untuk record [start, end)."""
+        return self._offsets[2 * start], self._offsets[2 * (end - 1) + 1]
+
+    def slice(self, start: int, end: int) -> list[dict]:
+        """Record [start, end) urut kronologis, dibaca dengan satu read()."""
+        self.refresh()
+        end = min(end, len(self._offsets) // 2)
+        start = max(start, 0)
+        if start >= end:
+            return []
+
+        base, stop = self.span(start, end)
+        raw = self._read_range(base, stop)
+        records = []
+        for i in range(start, end):
+            s, e = self._offsets[2 * i] - base, self._offsets[2 * i + 1] - base
+            records.append(json.loads(raw[s:e]))
+        return records
+
+    def tail(self, n: int) -> list[dict]:
+        total = self.count()
+        return self.slice(total - n, total)
+
+    def page(self, before: int | None = None, limit: int = 20) -> dict:
+        """
+        Satu halaman riwayat, terbaru dulu.
+
+        Returns:
+            dict: {records, start, end, next_before, total}
+                  next_before=None jika sudah halaman paling lama.
+        """
+        total = self.count()
+        end = total if before is None else max(min(before, total), 0)
+        start = max(end - limit, 0)
+        records = self.slice(start, end)
+        records.reverse()
+        return {
+            "records": records,
+            "start": start,
+            "end": end,
+            "next_before": start if start > 0 else None,
+            "total": total,
+        }
+
+    def iter_records(self, batch: int = 500):
+        """Iterasi semua record (kronologis) per batch, untuk export."""
+        total = self.count()
+        for start in range(0, total, batch):
+            yield from self.slice(start, start + batch)
+
+
+_stores: dict[str, ConversationStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_conversation_store(memory_file: str) -> ConversationStore:
+    """Satu ConversationStore per file memory dalam satu proses."""
+    key = os.path.abspath(memory_file)
+    with _stores_lock:
+        if key not in _stores:
+            _stores[key] = ConversationStore(memory_file)
+        return _stores[key]
@@ -0,0 +1,40 @@
+# app/memory/document_memory.py
+
+from app.rag.document_index import DocumentIndex
+from app.utils import metrics, token_count
+
+
+class DocumentMemory:
+    def __init__(self, top_k: int = 5, max_tokens: int = 1024, min_score: float = 0.3):
+        self.index = DocumentIndex()
+        self.top_k = top_k
+        self.max_tokens = max_tokens
+        self.min_score = min_score
+
+    def format_str(self, chunks: list[dict]) -> str:
+        return "\n\n".join(
+            f"File: {chunk.get('path')} (lines {chunk.get('start_line')}-{chunk.get('end_line')})\n"
+            f"{chunk.get('text')}"
+            for chunk in chunks
+        )
+
+    @metrics.timed("token_trim")
+    def filter_chunks(self, chunks: list[dict]) -> list[dict]:
+        """Ambil chunk skor tertinggi selama total token masih dalam budget."""
+        selected, used = [], 0
+        for chunk in sorted(chunks, key=lambda c: c.get("score", 0), reverse=True):
+            tokens = token_count(self.format_str([chunk]))
+            if selected and used + tokens > self.max_tokens:
+                continue
+            selected.append(chunk)
+            used += tokens
+        return selected
+
+    def search_chunks(self, prompt: str) -> list[dict]:
+        # Hanya membaca index di disk; sync berjalan di background thread
+        # (DocumentIndex.start_background_sync) atau lewat CLI
+        return self.index.search(prompt, top_k=self.top_k, min_score=self.min_score)
+
+    def get_document_memory(self, prompt: str) -> str:
+        chunks = self.search_chunks(prompt)
+        return self.format_str(self.filter_chunks(chunks))
@@ -9,8 +9,11 @@ class RecentMemory(BaseMemory):
         self.last_n = last_n
         self.max_tokens = max_tokens
 
+    def load_recent(self) -> list[dict]:
+        return self.load_memory(last_n=self.last_n)
+
     def get_recent_memory(self) -> str:
-        records = self.load_memory(last_n=self.last_n)
+        records = self.load_recent()
 
         # Selalu pertahankan dict terbaru
         records = self.filter_memory(
@@ -2,8 +2,10 @@
 
 import os
 from .base_memory import BaseMemory
+from app.config import config
+from app.rag.lexical_index import get_lexical_index, reciprocal_rank_fusion
 from app.rag.vector_store import VectorStore
-from app.utils import log
+from app.utils import log, metrics
 
 
 class RelevantMemory(BaseMemory):
@@ -21,19 +23,40 @@ class RelevantMemory(BaseMemory):
         self.max_tokens = max_tokens
         self.min_score = min_score
 
-    def get_relevant_memory(self, prompt) -> str:
-        recent = self.load_memory(last_n=self.last_n)
-        recent_ids = {item["chat_id"] for item in recent}
+    def search_relevant(self, prompt, exclude_recent: bool = True) -> list[dict]:
+        """
+        Record paling relevan (maks top_k). exclude_recent=False dipakai
+        ContextAssembler, yang men-dedup sendiri terhadap recent window.
+        """
+        recent_ids = set()
+        if exclude_recent:
+            recent_ids = {item["chat_id"] for item in self.load_memory(last_n=self.last_n)}
+
+        hybrid = config.MEMORY_HYBRID
+        depth = max(self.top_k, config.MEMORY_HYBRID_CANDIDATES) if hybrid else self.top_k
 
         relevant = self.vm.search(
             prompt,
             index_path=self.memory_vector_file,
-            top_k=self.top_k,
+            top_k=depth,
             min_score=self.min_score,
         )
 
+        # Identifier persis (nama file, error, nama fungsi) sering lolos dari
+        # similarity vektor → gabungkan dengan ranking BM25 lewat RRF
+        if hybrid:
+            relevant = reciprocal_rank_fusion(
+                [relevant, self.lexical_search(prompt, depth)],
+                key="chat_id",
+                k=config.MEMORY_RRF_K,
+            )
+
         # 1️⃣ Filter duplikat ID
         filtered = [item for item in relevant if item.get("chat_id") not in recent_ids]
+        return filtered[: self.top_k]
+
+    def get_relevant_memory(self, prompt) -> str:
+        filtered = self.search_relevant(prompt)
 
         # 2️⃣ Token filtering
         filtered = self.filter_memory(
@@ -43,3 +66,25 @@ class RelevantMemory(BaseMemory):
         )
 
         return self.format_str(filtered)
+
+    def lexical_search(self, prompt: str, top_k: int) -> list[dict]:
+        # Metadata sudah dimuat (dari cache) oleh vm.search
+        metadata = self.vm.metadata
+        index = get_lexical_index(self.memory_vector_file)
+        index.sync(metadata)
+
+        with metrics.timer("bm25_search"):
+            hits = index.search(
+                prompt,
+                top_k=top_k,
+                min_score=config.MEMORY_BM25_MIN_SCORE,
+                max_df=config.MEMORY_BM25_MAX_DF,
+            )
+
+        results = []
+        for position, score in hits:
+            if position < len(metadata) and isinstance(metadata[position], dict):
+                record = metadata[position].copy()
+                record["score"] = score
+                results.append(record)
+        return results
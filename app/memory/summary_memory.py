@@ -1,5 +1,6 @@
 # app/memory/summary_memory.py
 
+from app.config import config
 from app.utils import log
 from .base_summarizer import BaseSummarizer
 from app.rag.vector_store import VectorStore
@@ -19,14 +20,27 @@ class SummaryMemory(BaseSummarizer):
 
         self.vm = VectorStore()
 
-    def get_summary_memory(self, prompt: str) -> str:
-        relevant = self.vm.search(
+    def search_summaries(self, prompt: str) -> list[dict]:
+        results = self.vm.search(
             prompt,
             index_path=self.summary_vector_file,
-            top_k=self.top_k,
+            top_k=self.top_k * 2,
             min_score=self.min_score,
         )
 
+        # Anak yang induknya ikut terambil sudah tercakup oleh induknya
+        covered = {cid for r in results for cid in r.get("children") or []}
+        results = [r for r in results if r.get("summary_id") not in covered]
+
+        # Bias ke summary level atas (lebih ringkas, rentang waktu lebih luas)
+        for r in results:
+            r["score"] = r.get("score", 0) * (1 + config.SUMMARY_LEVEL_BIAS * r.get("level", 0))
+        results.sort(key=lambda r: r["score"], reverse=True)
+        return results[: self.top_k]
+
+    def get_summary_memory(self, prompt: str) -> str:
+        relevant = self.search_summaries(prompt)
+
         filtered = self.filter_summary(
             data=relevant,
             max_tokens=self.max_tokens,
@@ -0,0 +1,90 @@
+# app/rag/chunker.py
+
+import os
+import re
+
+CODE_EXTENSIONS = {
+    ".py", ".js", ".jsx", ".ts", ".tsx", ".go", ".rs", ".java", ".kt",
+    ".c", ".h", ".cpp", ".hpp", ".cs", ".rb", ".php", ".swift", ".sh",
+}
+MARKDOWN_EXTENSIONS = {".md", ".markdown", ".rst"}
+
+# Awal definisi top-level (tanpa indentasi) → batas chunk kode
+_CODE_BOUNDARY = re.compile(
+    r"^(?:async\s+def|def|class|function|export|const|let|var|func|fn|pub|impl|"
+    r"struct|enum|interface|type|public|private|protected|static|module)\b"
+    r"|^@"
+    # method / fungsi bertingkat (mis. di dalam class)
+    r"|^\s{1,8}(?:async\s+def|def|function|func|fn)\s"
+    r"|^\s{1,8}(?:public|private|protected|static)\s.*\("
+    r"|^\s{1,8}@"
+)
+_MD_HEADING = re.compile(r"^#{1,6}\s")
+
+
+def file_kind(path: str) -> str:
+    ext = os.path.splitext(path)[1].lower()
+    if ext in CODE_EXTENSIONS:
+        return "code"
+    if ext in MARKDOWN_EXTENSIONS:
+        return "markdown"
+    return "text"
+
+
+def _is_boundary(kind: str, line: str, previous_blank: bool) -> bool:
+    if kind == "code":
+        return bool(_CODE_BOUNDARY.match(line))
+    if kind == "markdown":
+        return bool(_MD_HEADING.match(line))
+    # Teks biasa: paragraf baru setelah baris kosong
+    return previous_blank and bool(line.strip())
+
+
+def iter_chunks(lines, kind: str, max_chars: int, min_chars: int):
+    """
+    Potong aliran baris menjadi chunk mengikuti struktur file:
+    definisi top-level (kode), heading (markdown), paragraf (teks).
+    Section kecil digabung sampai `min_chars`; section besar dipecah di
+    batas baris sebelum `max_chars`. `lines` bisa berupa file object,
+    sehingga file tidak perlu dibaca utuh ke memori.
+
+    Menghasilkan dict {text, start_line, end_line, kind}.
+    """
+    buf, size, start = [], 0, 1
+    line_no = 0
+    previous_blank = False
+
+    def flush(end_line):
+        text = "".join(buf).strip("\n")
+        if text.strip():
+            return {"text": text, "start_line": start, "end_line": end_line, "kind": kind}
+        return None
+
+    for line_no, line in enumerate(lines, start=1):
+        boundary = _is_boundary(kind, line, previous_blank)
+        previous_blank = not line.strip()
+
+        if buf and (
+            (boundary and size >= min_chars) or size + len(line) > max_chars
+        ):
+            chunk = flush(line_no - 1)
+            if chunk:
+                yield chunk
+            buf, size, start = [], 0, line_no
+
+        # Baris tunggal yang sangat panjang dipotong paksa
+        while len(line) > max_chars:
+            buf.append(line[:max_chars])
+            chunk = flush(line_no)
+            if chunk:
+                yield chunk
+            buf, size, start = [], 0, line_no
+            line = line[max_chars:]
+
+        buf.append(line)
+        size += len(line)
+
+    if buf:
+        chunk = flush(line_no)
+        if chunk:
+            yield chunk
@@ -0,0 +1,215 @@
+# app/rag/document_index.py
+
+import argparse
+import hashlib
+import os
+import threading
+import numpy as np
+from app.config import config
+from app.utils import FileManager, FileLock, log, metrics
+from app.utils.files_manager.dir_walker import IgnoreRules, walk_entries
+from .chunker import file_kind, iter_chunks
+from .vector_store import VectorStore
+
+
+class DocumentIndex:
+    """
+    Index semantik untuk file di FILES_ROOT.
+
+    File di-stream per baris ke chunker struktural (kode / markdown / teks),
+    lalu chunk di-embed per batch ke index FAISS tersendiri. Setiap chunk
+    diberi hash isi (path + teks): saat sync, file yang mtime/size-nya tidak
+    berubah dilewati, dan chunk yang hash-nya sudah ada memakai ulang
+    vektornya, sehingga hanya chunk yang benar-benar berubah yang di-encode.
+    """
+
+    def __init__(self, root: str | None = None, index_path: str | None = None):
+        self.root = root or config.FILES_ROOT
+        self.index_path = index_path or os.path.join(
+            config.VECTOR_ROOT, "documents", "documents.index"
+        )
+        self.manifest_path = self.index_path + ".manifest.json"
+        self.lock_file = self.index_path + ".lock"
+        self.fm = FileManager()
+        self.vm = VectorStore()
+        self._sync_lock = threading.Lock()
+        self._sync_thread = None
+        self._stop = threading.Event()
+
+    def _scan(self):
+        """(relpath, path, [mtime_ns, size]) untuk setiap file yang layak diindeks."""
+        if not os.path.isdir(self.root):
+            return
+        extensions = tuple(config.DOC_EXTENSIONS)
+        for rel, entry, is_dir, _ in walk_entries(
+            self.root, ignore=IgnoreRules(self.root)
+        ):
+            if is_dir or not entry.name.lower().endswith(extensions):
+                continue
+            try:
+                st = entry.stat()
+            except OSError:
+                continue
+            if st.st_size <= config.DOC_MAX_FILE_BYTES:
+                yield rel, entry.path, [st.st_mtime_ns, st.st_size]
+
+    @staticmethod
+    def _chunk_file(rel: str, path: str) -> list[dict]:
+        with open(path, "rb") as f:
+            if b"\0" in f.read(8192):
+                return []  # binary
+        kind = file_kind(path)
+        chunks = []
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            for chunk in iter_chunks(
+                f, kind, config.DOC_CHUNK_MAX_CHARS, config.DOC_CHUNK_MIN_CHARS
+            ):
+                chunk["path"] = rel
+                chunk["chunk_id"] = hashlib.sha1(
+                    f"{rel}\n{chunk['text']}".encode("utf-8")
+                ).hexdigest()
+                chunks.append(chunk)
+        return chunks
+
+    def _load_manifest(self) -> dict | None:
+        """Manifest tersimpan; None jika belum ada / rusak (berarti index ulang semua)."""
+        if not os.path.exists(self.manifest_path):
+            return None
+        data = self.fm.read_json(self.manifest_path)
+        if isinstance(data, dict) and data.get("status") in ("error", "warning"):
+            return None
+        return data if isinstance(data, dict) else None
+
+    @metrics.timed("document_sync")
+    def sync(self) -> dict:
+        """Sinkronkan index dengan isi FILES_ROOT (incremental)."""
+        with self._sync_lock, FileLock(self.lock_file):
+            # Tanpa file index, manifest tidak bisa dipercaya → index ulang semua
+            manifest = (
+                self._load_manifest() if os.path.exists(self.index_path) else None
+            )
+            files = list(self._scan())
+            new_manifest = {rel: stamp for rel, _, stamp in files}
+
+            # Cek stamp dulu: tanpa perubahan (termasuk FILES_ROOT kosong yang
+            # sudah ter-index) vektor tidak perlu direkonstruksi sama sekali
+            if manifest is not None and manifest == new_manifest:
+                return {
+                    "files": len(new_manifest),
+                    "chunks": self.vm.preload(self.index_path),
+                    "changed_files": 0,
+                    "removed_files": 0,
+                    "embedded_chunks": 0,
+                }
+
+            manifest = manifest or {}
+            old_vectors, old_meta = self.vm.load_vectors(self.index_path)
+
+            by_file: dict[str, list[int]] = {}
+            by_hash: dict[str, int] = {}
+            for i, meta in enumerate(old_meta):
+                by_file.setdefault(meta.get("path"), []).append(i)
+                by_hash[meta.get("chunk_id")] = i
+
+            metas, sources = [], []  # sources: index vektor lama atau None (perlu encode)
+            changed_files = 0
+            for rel, path, stamp in files:
+                if manifest.get(rel) == stamp:
+                    for i in by_file.get(rel, []):
+                        metas.append(old_meta[i])
+                        sources.append(i)
+                    continue
+
+                changed_files += 1
+                try:
+                    chunks = self._chunk_file(rel, path)
+                except OSError as e:
+                    log.warning(f"Document index: gagal membaca '{path}': {e}")
+                    new_manifest.pop(rel, None)
+                    continue
+                for chunk in chunks:
+                    metas.append(chunk)
+                    sources.append(by_hash.get(chunk["chunk_id"]))
+
+            removed_files = len(set(manifest) - set(new_manifest))
+            pending = [i for i, src in enumerate(sources) if src is None]
+            stats = {
+                "files": len(new_manifest),
+                "chunks": len(metas),
+                "changed_files": changed_files,
+                "removed_files": removed_files,
+                "embedded_chunks": len(pending),
+            }
+
+            vectors = np.zeros((len(metas), self.vm.dim), dtype="float32")
+            reused = [(i, src) for i, src in enumerate(sources) if src is not None]
+            if reused:
+                dst, src = zip(*reused)
+                vectors[list(dst)] = old_vectors[list(src)]
+
+            # Encode hanya chunk baru / berubah, per batch
+            batch = config.EMBED_BATCH_SIZE
+            for start in range(0, len(pending), batch):
+                ids = pending[start : start + batch]
+                texts = [f"{metas[i]['path']}\n{metas[i]['text']}" for i in ids]
+                vectors[ids] = self.vm.embedder.encode_text(texts, batch_size=batch)
+
+            self.vm.write_index(vectors, metas, self.index_path)
+            self.fm.write_json(self.manifest_path, new_manifest)
+
+            log.info(
+                "Document index: {} file ({} berubah, {} dihapus), {} chunk, {} di-encode",
+                stats["files"],
+                changed_files,
+                removed_files,
+                stats["chunks"],
+                stats["embedded_chunks"],
+            )
+            return stats
+
+    def start_background_sync(self, interval: float | None = None):
+        """
+        Sync berkala di daemon thread, di luar jalur request: retrieval
+        selalu memakai index yang sudah ada di disk. Dipanggil sekali per
+        proses (setelah fork); panggilan berikutnya tidak membuat thread baru.
+        """
+        interval = config.DOC_SYNC_INTERVAL if interval is None else interval
+        if interval <= 0:
+            return None
+        if self._sync_thread is None or not self._sync_thread.is_alive():
+            self._stop.clear()
+            self._sync_thread = threading.Thread(
+                target=self._sync_loop,
+                args=(interval,),
+                name="document-sync",
+                daemon=True,
+            )
+            self._sync_thread.start()
+        return self._sync_thread
+
+    def stop_background_sync(self):
+        self._stop.set()
+
+    def _sync_loop(self, interval: float):
+        while not self._stop.is_set():
+            try:
+                self.sync()
+            except Exception as e:
+                log.error(f"Document index sync gagal: {e}")
+            self._stop.wait(interval)
+
+    def search(self, query: str, top_k: int = 5, min_score: float = 0.3) -> list[dict]:
+        return self.vm.search(query, self.index_path, top_k=top_k, min_score=min_score)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Index / sync dokumen di FILES_ROOT.")
+    parser.add_argument("--root", default=None, help="Default: config.FILES_ROOT")
+    args = parser.parse_args(argv)
+
+    stats = DocumentIndex(root=args.root).sync()
+    print(stats)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+# app/rag/embed_client.py
+
+import atexit
+import json
+import os
+import socket
+import threading
+import weakref
+import numpy as np
+from multiprocessing import shared_memory
+from app.config import config
+from app.utils import log
+
+# Buffer hasil minimum (≈ 64 vektor MiniLM float32); tumbuh 2x saat kurang
+MIN_BUFFER_BYTES = 64 * 384 * 4
+
+# Client per thread hidup di threading.local; buffer shared memory-nya
+# di-unlink saat proses keluar
+_open_clients: "weakref.WeakSet[EmbedClient]" = weakref.WeakSet()
+
+
+@atexit.register
+def _close_clients():
+    for client in list(_open_clients):
+        if client.pid == os.getpid():
+            client.close()
+
+
+class EmbedClient:
+    """
+    Satu koneksi persisten ke embed server (python -m app.rag.embed_server).
+
+    Protokol: request JSON per baris di koneksi yang sama, satu balasan per request:
+        {"type": "encode", "texts": [...], "batch_size": n, "shm": "<nama>"}
+        → {"type": "done", "rows": n, "dim": d} | {"type": "error", "message": "..."}
+    Vektor float32 ditulis server ke buffer shared memory milik client ini.
+    Tidak thread-safe: RemoteEmbedder memberi satu EmbedClient per thread.
+    """
+
+    def __init__(self, address: str | None = None, timeout: float | None = None):
+        self.address = address or config.EMBED_SERVER_SOCKET
+        self.timeout = timeout
+        self.pid = os.getpid()
+        self._sock = None
+        self._stream = None
+        self._shm = None
+        _open_clients.add(self)
+
+    def is_available(self) -> bool:
+        if not os.path.exists(self.address):
+            return False
+        try:
+            return self.request({"type": "ping"}).get("type") == "pong"
+        except OSError:
+            return False
+        finally:
+            self.close()
+
+    def request(self, payload: dict) -> dict:
+        if self._sock is None:
+            self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._sock.settimeout(self.timeout)
+            self._sock.connect(self.address)
+            self._stream = self._sock.makefile("rb")
+
+        self._sock.sendall(json.dumps(payload, ensure_ascii=False).encode() + b"\n")
+        line = self._stream.readline()
+        if not line:
+            self.close()
+            raise ConnectionError("Embed server closed the connection.")
+        return json.loads(line)
+
+    def _buffer(self, nbytes: int) -> shared_memory.SharedMemory:
+        if self._shm is None or self._shm.size < nbytes:
+            size = max(nbytes, MIN_BUFFER_BYTES, 2 * (self._shm.size if self._shm else 0))
+            self._release_buffer()
+            self._shm = shared_memory.SharedMemory(create=True, size=size)
+        return self._shm
+
+    def encode(self, texts: list[str], dim: int, batch_size: int | None = None) -> np.ndarray:
+        shm = self._buffer(len(texts) * dim * 4)
+        reply = self.request(
+            {"type": "encode", "texts": texts, "batch_size": batch_size, "shm": shm.name}
+        )
+        if reply.get("type") != "done":
+            raise RuntimeError(reply.get("message", "Embed server error."))
+        shape = (reply["rows"], reply["dim"])
+        return np.ndarray(shape, dtype=np.float32, buffer=shm.buf).copy()
+
+    def _release_buffer(self):
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+    def close(self):
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = None
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+        self._release_buffer()
+
+    def __del__(self):
+        # Objek warisan fork: socket & buffer milik proses induk
+        if self.pid == os.getpid():
+            try:
+                self.close()
+            except OSError:
+                pass
+
+
+class RemoteEmbedder:
+    """
+    Pengganti Embedder yang meng-encode lewat embed server bersama
+    (NANO_EMBED_REMOTE=1), sehingga worker tidak memuat bobot model.
+
+    Jika server tidak bisa dihubungi, encode jatuh ke Embedder lokal
+    supaya chat tetap jalan.
+    """
+
+    def __init__(self, model_name=config.MODEL_EMBEDDING, address: str | None = None):
+        self.model_name = model_name
+        self.address = address or config.EMBED_SERVER_SOCKET
+        self.backend = "remote"
+        self.dim = None
+        self._local = threading.local()
+        self._fallback = None
+        self._lock = threading.Lock()
+
+    def _client(self) -> EmbedClient:
+        client = getattr(self._local, "client", None)
+        if client is None or client.pid != os.getpid():
+            client = EmbedClient(self.address, timeout=config.EMBED_SERVER_TIMEOUT)
+            self._local.client = client
+        return client
+
+    @property
+    def model(self):
+        # Dipakai warmup: cukup pastikan server terjangkau dan tahu dimensinya
+        if self.dim is None:
+            self._info()
+        return self
+
+    def _info(self):
+        try:
+            info = self._client().request({"type": "info"})
+            if info.get("model") != self.model_name:
+                log.warning(
+                    f"Embed server memakai model '{info.get('model')}', bukan '{self.model_name}'."
+                )
+            self.dim = info["dim"]
+        except OSError as e:
+            self._use_fallback(e)
+
+    def _use_fallback(self, error: Exception):
+        with self._lock:
+            if self._fallback is None:
+                from .embedder import Embedder
+
+                log.error(
+                    f"Embed server '{self.address}' tidak tersedia, encode lokal: {error}"
+                )
+                self._fallback = Embedder(self.model_name)
+                self.backend = self._fallback.backend
+
+    def encode_text(
+        self, text: str | list[str], batch_size: int | None = None
+    ) -> np.ndarray:
+        if isinstance(text, str):
+            text = [text]
+
+        if self._fallback is None and self.dim is None:
+            self._info()
+        if self._fallback is not None:
+            return self._fallback.encode_text(text, batch_size=batch_size)
+
+        client = self._client()
+        try:
+            return client.encode(text, self.dim, batch_size=batch_size)
+        except OSError as e:
+            # Server restart: coba sekali lagi dengan koneksi baru
+            client.close()
+            log.warning(f"Koneksi embed server terputus, menyambung ulang: {e}")
+            return self._client().encode(text, self.dim, batch_size=batch_size)
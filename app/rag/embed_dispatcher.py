@@ -0,0 +1,125 @@
+# app/rag/embed_dispatcher.py
+
+import os
+import queue
+import threading
+import time
+import numpy as np
+from app.config import config
+from app.utils import log
+from app.utils.metrics import metrics
+
+
+class _Request:
+    __slots__ = ("texts", "event", "result", "error", "enqueued")
+
+    def __init__(self, texts: list[str]):
+        self.texts = texts
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+        self.enqueued = time.perf_counter()
+
+
+class EmbeddingDispatcher:
+    """
+    Micro-batching untuk encode embedding dari banyak thread sekaligus.
+
+    Caller memasukkan request ke antrean lalu menunggu; satu worker thread
+    mengambil request pertama, menunggu request lain paling lama
+    `max_wait_ms` atau sampai `max_batch` teks, menjalankan satu
+    `encode_fn(texts)`, lalu membagikan hasil ke setiap caller.
+
+    Jendela tunggu hanya dipakai saat traffic sedang paralel (batch
+    sebelumnya berisi lebih dari satu request). Request tunggal langsung
+    dijalankan tanpa jeda tambahan; request yang datang selama batch
+    berjalan otomatis terkumpul untuk batch berikutnya.
+    """
+
+    def __init__(self, encode_fn, max_batch: int = None, max_wait_ms: float = None):
+        self.encode_fn = encode_fn
+        self.max_batch = max_batch or config.EMBED_MAX_BATCH
+        self.max_wait = (max_wait_ms if max_wait_ms is not None else config.EMBED_MAX_WAIT_MS) / 1000
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._queue = queue.Queue()
+        self._in_flight = 0
+        self._last_batch_requests = 0
+        self._thread = None
+
+    def _ensure_worker(self):
+        # Thread tidak ikut ter-fork → buat ulang di proses anak
+        if self._pid != os.getpid():
+            self._reset()
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name="nano-embed-dispatcher", daemon=True
+            )
+            self._thread.start()
+
+    def encode(self, texts: list[str]) -> np.ndarray:
+        request = _Request(texts)
+        with self._lock:
+            self._ensure_worker()
+            self._in_flight += 1
+            self._queue.put(request)
+            metrics.set_gauge("nano_embed_queue_depth", self._queue.qsize())
+
+        request.event.wait()
+        if request.error is not None:
+            raise request.error
+        return request.result
+
+    def _collect(self) -> list[_Request]:
+        batch = [self._queue.get()]
+        size = len(batch[0].texts)
+        deadline = time.perf_counter() + self.max_wait
+
+        while size < self.max_batch:
+            with self._lock:
+                waiting = self._in_flight
+            if len(batch) >= waiting and self._last_batch_requests <= 1:
+                break  # tidak ada traffic paralel → jangan menunggu
+            timeout = deadline - time.perf_counter()
+            if timeout <= 0:
+                break
+            try:
+                request = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            batch.append(request)
+            size += len(request.texts)
+        self._last_batch_requests = len(batch)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            started = time.perf_counter()
+            texts = [text for request in batch for text in request.texts]
+
+            metrics.set_gauge("nano_embed_queue_depth", self._queue.qsize())
+            metrics.inc("nano_embed_batches_total")
+            metrics.inc("nano_embed_texts_total", len(texts))
+            for request in batch:
+                metrics.observe("nano_embed_queue_wait_seconds", started - request.enqueued)
+
+            try:
+                vectors = self.encode_fn(texts)
+                offset = 0
+                for request in batch:
+                    n = len(request.texts)
+                    request.result = vectors[offset : offset + n]
+                    offset += n
+            except Exception as e:
+                log.error(f"Embedding batch gagal ({len(texts)} teks): {e}")
+                for request in batch:
+                    request.error = e
+            finally:
+                with self._lock:
+                    self._in_flight -= len(batch)
+                for request in batch:
+                    request.event.set()
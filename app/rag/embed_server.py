@@ -0,0 +1,154 @@
+# app/rag/embed_server.py
+
+import json
+import os
+import socketserver
+import numpy as np
+from multiprocessing import resource_tracker, shared_memory
+from app.config import config
+from app.utils import log
+from .embed_client import EmbedClient
+from .embedder import Embedder
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """
+    Buka buffer shared memory milik client tanpa mendaftarkannya ke
+    resource tracker proses ini (pemilik buffer = client, bukan server).
+    """
+    shm = shared_memory.SharedMemory(name=name)
+    resource_tracker.unregister(shm._name, "shared_memory")
+    return shm
+
+
+class _EmbedRequestHandler(socketserver.StreamRequestHandler):
+    """Satu koneksi per thread client; request JSON per baris sampai EOF."""
+
+    def handle(self):
+        buffers: dict[str, shared_memory.SharedMemory] = {}
+        try:
+            for line in self.rfile:
+                if not line.strip():
+                    continue
+                try:
+                    payload = json.loads(line)
+                except json.JSONDecodeError:
+                    self._send({"type": "error", "message": "Invalid JSON request."})
+                    continue
+                self._send(self.server.embed_server.handle(payload, buffers))
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            for shm in buffers.values():
+                shm.close()
+
+    def _send(self, event: dict):
+        self.wfile.write(json.dumps(event).encode("utf-8") + b"\n")
+        self.wfile.flush()
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+    # Tiap thread di tiap worker membuka koneksi sendiri; backlog default (5)
+    # membuat connect AF_UNIX gagal EAGAIN saat banyak worker start bersamaan
+    request_queue_size = 128
+
+
+class EmbedServer:
+    """
+    Proses embedding bersama untuk semua worker uvicorn/gunicorn.
+
+    Satu proses memegang bobot model dan thread pool torch/onnxruntime;
+    worker mengirim teks lewat Unix socket dan menerima vektor di buffer
+    shared memory miliknya sendiri (tanpa serialisasi float lewat socket).
+    Request dari banyak koneksi digabung oleh EmbeddingDispatcher milik
+    Embedder, jadi encode tetap ter-batch lintas worker.
+    """
+
+    def __init__(self, address: str | None = None):
+        self.address = address or config.EMBED_SERVER_SOCKET
+        self.embedder = Embedder()
+        self.dim = None
+        self.server = None
+
+    def handle(self, payload: dict, buffers: dict) -> dict:
+        request_type = payload.get("type")
+        if request_type == "ping":
+            return {"type": "pong"}
+        if request_type == "info":
+            return {
+                "type": "info",
+                "model": self.embedder.model_name,
+                "backend": self.embedder.backend,
+                "dim": self.dim,
+            }
+        if request_type != "encode":
+            return {"type": "error", "message": f"Unknown request '{request_type}'."}
+
+        try:
+            vectors = self.embedder.encode_text(
+                payload["texts"], batch_size=payload.get("batch_size")
+            ).astype(np.float32, copy=False)
+
+            # Client hanya memakai satu buffer aktif; buffer lama ditutup saat diganti
+            name = payload["shm"]
+            if name not in buffers:
+                for old in buffers.values():
+                    old.close()
+                buffers.clear()
+                buffers[name] = _attach(name)
+            shm = buffers[name]
+
+            if vectors.nbytes > shm.size:
+                return {
+                    "type": "error",
+                    "message": f"Buffer too small: {shm.size} < {vectors.nbytes} bytes.",
+                }
+            np.ndarray(vectors.shape, dtype=np.float32, buffer=shm.buf)[:] = vectors
+            return {"type": "done", "rows": vectors.shape[0], "dim": vectors.shape[1]}
+        except Exception as e:
+            log.error(f"Embed server gagal meng-encode: {e}")
+            return {"type": "error", "message": str(e)}
+
+    def _prepare_socket_path(self):
+        if EmbedClient(self.address).is_available():
+            raise RuntimeError(f"Embed server sudah berjalan di '{self.address}'.")
+
+        # Socket basi dari proses sebelumnya
+        if os.path.exists(self.address):
+            os.unlink(self.address)
+
+        path_dir = os.path.dirname(self.address)
+        if path_dir:
+            os.makedirs(path_dir, exist_ok=True)
+
+    def serve_forever(self):
+        self._prepare_socket_path()
+
+        # Muat model (dan ukur dimensi) sebelum socket di-bind: selama warmup
+        # client melihat server belum tersedia dan langsung encode lokal,
+        # bukan tertahan di backlog sampai timeout
+        self.dim = int(self.embedder.encode_text("warmup").shape[1])
+
+        self.server = _UnixServer(self.address, _EmbedRequestHandler)
+        self.server.embed_server = self
+        log.info(
+            f"Embed server ({self.embedder.backend}, dim={self.dim}) listening on {self.address}"
+        )
+
+        try:
+            self.server.serve_forever()
+        finally:
+            self.shutdown()
+
+    def shutdown(self):
+        if self.server:
+            self.server.server_close()
+            self.server = None
+        if os.path.exists(self.address):
+            os.unlink(self.address)
+        log.info("Embed server stopped.")
+
+
+if __name__ == "__main__":
+    EmbedServer().serve_forever()
@@ -1,20 +1,109 @@
 # app/rag/embedding_manager.py
 
+import threading
 import numpy as np
-from sentence_transformers import SentenceTransformer
+from app.config import config
+from app.utils.logger import log
+from app.utils.metrics import metrics
+from .embed_dispatcher import EmbeddingDispatcher
+
+
+def _limit_torch_threads():
+    """Terapkan batas thread intra-op / inter-op torch dari config (jika diset)."""
+    if not (config.EMBED_INTRAOP_THREADS or config.EMBED_INTEROP_THREADS):
+        return
+    import torch
+
+    if config.EMBED_INTRAOP_THREADS:
+        torch.set_num_threads(config.EMBED_INTRAOP_THREADS)
+    if config.EMBED_INTEROP_THREADS:
+        try:
+            torch.set_num_interop_threads(config.EMBED_INTEROP_THREADS)
+        except RuntimeError:
+            # Hanya bisa diset sebelum ada kerja paralel inter-op pertama
+            pass
 
 
 class Embedder:
-    def __init__(self, model_name="all-MiniLM-L6-v2"):
-        self.model = SentenceTransformer(model_name)
+    def __init__(self, model_name=config.MODEL_EMBEDDING):
+        self.model_name = model_name
+        self.backend = config.EMBED_BACKEND
+        self._model = None
+        self._lock = threading.Lock()
+        # Encode kecil dari thread berbeda digabung lewat dispatcher
+        self.dispatcher = (
+            EmbeddingDispatcher(self._encode) if config.EMBED_BATCHING else None
+        )
+
+    @property
+    def model(self):
+        # Backend (SentenceTransformer/torch atau ONNX Runtime) baru di-import saat dipakai
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    self._model = self._load_model()
+        return self._model
+
+    def _load_model(self):
+        if self.backend == "onnx":
+            from .onnx_encoder import OnnxEncoder, onnx_model_dir
+
+            try:
+                return OnnxEncoder(
+                    onnx_model_dir(self.model_name),
+                    quantized=config.EMBED_ONNX_QUANTIZED,
+                )
+            except (FileNotFoundError, ImportError) as e:
+                log.error(f"Backend ONNX tidak tersedia, kembali ke torch: {e}")
+                self.backend = "torch"
+
+        _limit_torch_threads()
+        from sentence_transformers import SentenceTransformer
+
+        return SentenceTransformer(self.model_name)
 
-    def encode_text(self, text: str | list[str]) -> np.ndarray:
+    def encode_text(
+        self, text: str | list[str], batch_size: int | None = None
+    ) -> np.ndarray:
         if isinstance(text, str):
             text = [text]
 
-        embeddings = self.model.encode(text)
-        return self._normalize(embeddings)
+        # Bulk encode (add_vectors, rebuild) langsung; query kecil lewat dispatcher
+        if self.dispatcher and not batch_size and len(text) < self.dispatcher.max_batch:
+            return self.dispatcher.encode(text)
+        return self._encode(text, batch_size)
+
+    def _encode(self, text: list[str], batch_size: int | None = None) -> np.ndarray:
+        with metrics.timer("embedding_encode"):
+            if batch_size:
+                embeddings = self.model.encode(text, batch_size=batch_size)
+            else:
+                embeddings = self.model.encode(text)
+            return self._normalize(embeddings)
 
     def _normalize(self, embeddings: np.ndarray) -> np.ndarray:
         norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
         return embeddings / norms
+
+
+_embedders: dict[str, Embedder] = {}
+_embedders_lock = threading.Lock()
+
+
+def get_embedder(model_name: str = config.MODEL_EMBEDDING) -> Embedder:
+    """
+    Ambil instance Embedder bersama per nama model.
+
+    Semua VectorStore memakai instance yang sama, jadi bobot model
+    hanya dimuat sekali per proses. Dengan EMBED_REMOTE, instance-nya
+    RemoteEmbedder yang meng-encode lewat embed server bersama.
+    """
+    with _embedders_lock:
+        if model_name not in _embedders:
+            if config.EMBED_REMOTE:
+                from .embed_client import RemoteEmbedder
+
+                _embedders[model_name] = RemoteEmbedder(model_name)
+            else:
+                _embedders[model_name] = Embedder(model_name)
+        return _embedders[model_name]
@@ -0,0 +1,146 @@
+# app/rag/export_onnx.py
+"""
+Ekspor model embedding (sentence-transformers) ke ONNX untuk backend
+`EMBED_BACKEND=onnx`, opsional dengan kuantisasi dinamis int8.
+
+Setelah ekspor, vektor ONNX dibandingkan dengan vektor torch pada kalimat
+contoh; ekspor gagal (exit 1) jika cosine minimum di bawah toleransi,
+supaya index lama tetap bisa dipakai tanpa rebuild.
+
+Contoh:
+    python -m app.rag.export_onnx
+    python -m app.rag.export_onnx --quantize
+"""
+
+import argparse
+import json
+import os
+import sys
+from app.config import config
+from .onnx_encoder import OnnxEncoder, onnx_model_dir
+
+# Cosine minimum terhadap vektor torch per varian
+MIN_COSINE = {"fp32": 0.9999, "int8": 0.98}
+
+SAMPLE_SENTENCES = [
+    "Nano, cek lagi bug di orchestrator kemarin",
+    "apa isi file config.py sekarang?",
+    "How do I rebuild the memory index after changing the embedding model?",
+    "Ringkas percakapan kita tentang FAISS dan cache metadata.",
+    "def process_message(self, prompt, session_id='default'):",
+    "The quick brown fox jumps over the lazy dog.",
+    "Tolong buatkan file notes.md berisi daftar tugas minggu ini",
+    "x" * 2000,  # lebih panjang dari max_seq_length → uji truncation
+]
+
+
+def _normalize(vectors):
+    import numpy as np
+
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def min_cosine(reference, candidate) -> float:
+    return float((_normalize(reference) * _normalize(candidate)).sum(axis=1).min())
+
+
+def export(model_name: str, out_dir: str, quantize: bool, opset: int = 17) -> str:
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    st = SentenceTransformer(model_name, device="cpu")
+    transformer = st[0].auto_model.eval()
+    tokenizer = st.tokenizer
+
+    os.makedirs(out_dir, exist_ok=True)
+    tokenizer.save_pretrained(out_dir)  # menulis tokenizer.json (fast tokenizer)
+
+    dummy = tokenizer(["hello world"], return_tensors="pt")
+    input_names = [
+        name
+        for name in ("input_ids", "attention_mask", "token_type_ids")
+        if name in dummy
+    ]
+
+    class _LastHiddenState(torch.nn.Module):
+        def __init__(self, model):
+            super().__init__()
+            self.model = model
+
+        def forward(self, *inputs):
+            return self.model(**dict(zip(input_names, inputs))).last_hidden_state
+
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+
+    model_path = os.path.join(out_dir, "model.onnx")
+    with torch.no_grad():
+        torch.onnx.export(
+            _LastHiddenState(transformer),
+            tuple(dummy[name] for name in input_names),
+            model_path,
+            input_names=input_names,
+            output_names=["last_hidden_state"],
+            dynamic_axes=dynamic_axes,
+            opset_version=opset,
+        )
+
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        quantize_dynamic(
+            model_path,
+            os.path.join(out_dir, "model_int8.onnx"),
+            weight_type=QuantType.QInt8,
+        )
+
+    with open(os.path.join(out_dir, "nano_onnx.json"), "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "model_name": model_name,
+                "max_seq_length": st.max_seq_length,
+                "dim": st.get_sentence_embedding_dimension(),
+                "pad_token": tokenizer.pad_token,
+                "opset": opset,
+            },
+            f,
+            indent=2,
+        )
+    return out_dir
+
+
+def verify(model_name: str, out_dir: str, quantize: bool) -> dict:
+    """Cosine minimum vektor ONNX vs torch untuk setiap varian yang diekspor."""
+    from sentence_transformers import SentenceTransformer
+
+    reference = SentenceTransformer(model_name, device="cpu").encode(SAMPLE_SENTENCES)
+    variants = {"fp32": False, **({"int8": True} if quantize else {})}
+    return {
+        name: min_cosine(reference, OnnxEncoder(out_dir, quantized=q).encode(SAMPLE_SENTENCES))
+        for name, q in variants.items()
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export embedding model ke ONNX.")
+    parser.add_argument("--model", default=config.MODEL_EMBEDDING)
+    parser.add_argument("--out-dir", default=None)
+    parser.add_argument("--quantize", action="store_true", help="Juga buat model_int8.onnx")
+    parser.add_argument("--opset", type=int, default=17)
+    args = parser.parse_args(argv)
+
+    out_dir = args.out_dir or onnx_model_dir(args.model)
+    export(args.model, out_dir, args.quantize, args.opset)
+
+    ok = True
+    for name, cosine in verify(args.model, out_dir, args.quantize).items():
+        passed = cosine >= MIN_COSINE[name]
+        ok &= passed
+        print(f"{name}: min cosine vs torch = {cosine:.6f} (min {MIN_COSINE[name]}) {'OK' if passed else 'FAIL'}")
+
+    print(f"exported → {out_dir}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
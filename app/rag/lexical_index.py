@@ -0,0 +1,260 @@
+# app/rag/lexical_index.py
+
+import heapq
+import json
+import math
+import os
+import re
+import threading
+from collections import Counter
+from app.config import config
+from app.utils import log
+from app.utils.files_manager.size_index import size_index
+
+_TOKEN_RE = re.compile(r"\w+")
+
+# Kata fungsi (Inggris / Indonesia) yang diabaikan di query: cocok dengan
+# hampir semua record sehingga hanya mengisi ranking BM25 dengan noise
+STOPWORDS = frozenset(
+    """
+    an and are as at be but by can do does for from how if in into is it
+    its me my no not of on or please so that the then there this to was
+    we what when where which who why will with you your
+    ada adalah aku akan apa atau bagaimana bisa dan dari dengan di dia
+    ini itu jadi juga kamu ke kenapa mau pada saja saya sudah tidak tolong
+    untuk yang
+    """.split()
+)
+
+
+def tokenize(text: str) -> list[str]:
+    """
+    Token leksikal: kata/identifier huruf kecil. Identifier snake_case juga
+    dipecah (process_message → process_message, process, message) supaya
+    query sebagian tetap cocok. Nama file terpecah di titik (config.py → config, py).
+    """
+    tokens = []
+    for token in _TOKEN_RE.findall(text.lower()):
+        if len(token) < 2:
+            continue
+        tokens.append(token)
+        if "_" in token:
+            tokens.extend(part for part in token.split("_") if len(part) > 1)
+    return tokens
+
+
+def record_text(record: dict) -> str:
+    """Teks record memory yang di-index: user, assistant, nama + argumen action."""
+    parts = [record.get("user") or "", record.get("assistant") or ""]
+    for action in record.get("actions") or []:
+        parts.append(action.get("name") or "")
+        # Argumen besar sudah jadi ref blob ({"$blob": ...}); hanya string yang di-index
+        if isinstance(action.get("arguments"), str):
+            parts.append(action["arguments"])
+    return "\n".join(part for part in parts if part)
+
+
+def _stamp(path: str):
+    try:
+        stat = os.stat(path)
+        return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+    except OSError:
+        return None
+
+
+def lexical_index_path(index_path: str) -> str:
+    return index_path + ".bm25.jsonl"
+
+
+class BM25Index:
+    """
+    Index BM25 in-memory pendamping index FAISS.
+
+    Dokumen ke-i = metadata ke-i di index FAISS, jadi hasil search cukup
+    berupa posisi. Term frequency per dokumen disimpan append-only di
+    `<index>.bm25.jsonl` (satu baris per dokumen) dan dibaca incremental
+    oleh setiap proses; dokumen yang belum ter-persist di-index langsung
+    dari metadata sehingga index lama tanpa file BM25 tetap bisa dipakai.
+    """
+
+    def __init__(self, path: str, k1: float = 1.5, b: float = 0.75):
+        self.path = path
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.postings: dict[str, list[tuple[int, int]]] = {}
+        self.doc_len: list[int] = []
+        self.total_len = 0
+        self._persisted = 0  # dokumen [0, _persisted) berasal dari file
+        self._offset = 0
+        self._inode = None
+        self._stale = None  # stamp file yang tidak cocok dengan metadata → diabaikan
+
+    def _add(self, tf: dict, length: int):
+        doc = len(self.doc_len)
+        for term, count in tf.items():
+            self.postings.setdefault(term, []).append((doc, count))
+        self.doc_len.append(length)
+        self.total_len += length
+
+    def _refresh(self):
+        """Baca baris baru di file; file diganti (rebuild) → muat ulang penuh."""
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            if self._persisted or self._stale:
+                self._reset()  # file dihapus
+            return
+
+        if self._stale:
+            if self._stale == (stat.st_ino, stat.st_size, stat.st_mtime_ns):
+                return
+            self._reset()
+        replaced = stat.st_ino != self._inode or stat.st_size < self._offset
+        # Dokumen in-memory (belum ter-persist) diganti versi file begitu file bertambah
+        grew = stat.st_size > self._offset and len(self.doc_len) > self._persisted
+        if replaced or grew:
+            self._reset()
+            self._inode = stat.st_ino
+
+        with open(self.path, "rb") as f:
+            f.seek(self._offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # baris yang sedang ditulis proses lain
+                entry = json.loads(line)
+                if entry["i"] != len(self.doc_len):
+                    log.warning(f"Index BM25 '{self.path}' tidak sinkron, di-index ulang dari metadata.")
+                    self._reset()
+                    self._stale = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+                    return
+                self._offset += len(line)
+                self._add(entry["tf"], entry["n"])
+                self._persisted = len(self.doc_len)
+
+    def sync(self, metadata: list, persist: bool = False):
+        """
+        Samakan index dengan `metadata` (urutan FAISS).
+        persist=True (pemegang lock tulis memory) → dokumen baru ditulis ke file.
+        """
+        with self._lock:
+            self._refresh()
+            rewrite = False
+            if len(self.doc_len) > len(metadata) or (persist and self._stale):
+                # Index FAISS diganti tanpa file BM25 baru
+                self._reset()
+                rewrite = persist
+                if not persist:
+                    self._stale = _stamp(self.path)
+            elif persist and len(self.doc_len) > self._persisted:
+                # Dokumen in-memory ditulis ulang dari posisi terakhir di file
+                self._reset()
+                self._refresh()
+
+            lines = []
+            for i in range(len(self.doc_len), len(metadata)):
+                record = metadata[i] if isinstance(metadata[i], dict) else {}
+                tokens = tokenize(record_text(record))
+                tf = dict(Counter(tokens))
+                self._add(tf, len(tokens))
+                if persist:
+                    lines.append(json.dumps({"i": i, "tf": tf, "n": len(tokens)}, ensure_ascii=False))
+
+            if rewrite:
+                # File baru lewat rename supaya pembaca lain melihat inode berbeda
+                tmp_path = self.path + ".tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    f.write("".join(line + "\n" for line in lines))
+                os.replace(tmp_path, self.path)
+            elif lines:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write("\n".join(lines) + "\n")
+            if rewrite or lines:
+                size_index.touch([self.path])
+                stat = os.stat(self.path)
+                self._inode, self._offset = stat.st_ino, stat.st_size
+                self._persisted = len(self.doc_len)
+
+    def search(
+        self,
+        query: str,
+        top_k: int = 20,
+        min_score: float = 0.0,
+        max_df: float = 1.0,
+    ) -> list[tuple[int, float]]:
+        """
+        (posisi dokumen, skor BM25) terurut menurun.
+
+        Stopword dan term yang muncul di lebih dari `max_df` (rasio) dokumen
+        tidak ikut dinilai; dokumen dengan skor di bawah `min_score` dibuang.
+        Query yang hanya berisi token umum menghasilkan list kosong.
+        """
+        with self._lock:
+            total_docs = len(self.doc_len)
+            if not total_docs:
+                return []
+            avg_len = self.total_len / total_docs or 1.0
+
+            scores: dict[int, float] = {}
+            for term in set(tokenize(query)) - STOPWORDS:
+                postings = self.postings.get(term)
+                if not postings:
+                    continue
+                df = len(postings)
+                if df > max_df * total_docs:
+                    continue
+                idf = math.log(1 + (total_docs - df + 0.5) / (df + 0.5))
+                for doc, tf in postings:
+                    norm = self.k1 * (1 - self.b + self.b * self.doc_len[doc] / avg_len)
+                    scores[doc] = scores.get(doc, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+
+        hits = [item for item in scores.items() if item[1] >= min_score]
+        return heapq.nlargest(top_k, hits, key=lambda item: item[1])
+
+
+def write_lexical_index(path: str, metadata: list):
+    """Tulis file BM25 baru untuk `metadata` (dipakai rebuild_index)."""
+    if os.path.exists(path):
+        os.remove(path)
+    BM25Index(path).sync(metadata, persist=True)
+
+
+def reciprocal_rank_fusion(rankings: list[list[dict]], key: str, k: int = 60) -> list[dict]:
+    """
+    Gabungkan beberapa ranking (masing-masing terurut) dengan RRF:
+    skor = Σ 1 / (k + rank). Record pertama per key yang dipertahankan;
+    field "score" diganti skor fusi.
+    """
+    fused: dict = {}
+    for ranking in rankings:
+        for rank, record in enumerate(ranking, start=1):
+            record_key = record.get(key)
+            if record_key is None:
+                continue
+            if record_key not in fused:
+                fused[record_key] = [record, 0.0]
+            fused[record_key][1] += 1.0 / (k + rank)
+
+    results = []
+    for record, score in fused.values():
+        record = dict(record)
+        record["score"] = score
+        results.append(record)
+    results.sort(key=lambda item: item["score"], reverse=True)
+    return results
+
+
+_indexes: dict[str, BM25Index] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_lexical_index(index_path: str) -> BM25Index:
+    """BM25Index bersama per index FAISS (satu salinan postings per proses)."""
+    path = lexical_index_path(index_path)
+    with _indexes_lock:
+        if path not in _indexes:
+            _indexes[path] = BM25Index(path)
+        return _indexes[path]
@@ -0,0 +1,79 @@
+# app/rag/onnx_encoder.py
+
+import json
+import os
+import numpy as np
+from app.config import config
+
+
+def onnx_model_dir(model_name: str) -> str:
+    return os.path.join(config.EMBED_ONNX_DIR, model_name.replace("/", "__"))
+
+
+class OnnxEncoder:
+    """
+    Pengganti `SentenceTransformer.encode` berbasis ONNX Runtime.
+
+    Model hasil `python -m app.rag.export_onnx` (transformer → last_hidden_state)
+    dijalankan di CPU, lalu di-mean-pool dengan attention mask seperti
+    modul Pooling sentence-transformers, sehingga vektornya kompatibel
+    dengan index yang dibangun oleh backend torch.
+    """
+
+    def __init__(self, model_dir: str, quantized: bool = False):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        model_file = os.path.join(
+            model_dir, "model_int8.onnx" if quantized else "model.onnx"
+        )
+        if not os.path.exists(model_file):
+            raise FileNotFoundError(
+                f"ONNX model '{model_file}' not found; run: python -m app.rag.export_onnx"
+                + (" --quantize" if quantized else "")
+            )
+
+        with open(os.path.join(model_dir, "nano_onnx.json"), encoding="utf-8") as f:
+            self.info = json.load(f)
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if config.EMBED_INTRAOP_THREADS:
+            options.intra_op_num_threads = config.EMBED_INTRAOP_THREADS
+        if config.EMBED_INTEROP_THREADS:
+            options.inter_op_num_threads = config.EMBED_INTEROP_THREADS
+        self.session = ort.InferenceSession(
+            model_file, options, providers=["CPUExecutionProvider"]
+        )
+        self.input_names = {i.name for i in self.session.get_inputs()}
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=self.info["max_seq_length"])
+        pad_token = self.info.get("pad_token", "[PAD]")
+        self.tokenizer.enable_padding(
+            pad_id=self.tokenizer.token_to_id(pad_token) or 0, pad_token=pad_token
+        )
+
+    def encode(self, texts: list[str], batch_size: int = 32) -> np.ndarray:
+        outputs = []
+        for start in range(0, len(texts), batch_size):
+            encodings = self.tokenizer.encode_batch(texts[start : start + batch_size])
+            input_ids = np.array([e.ids for e in encodings], dtype=np.int64)
+            mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+
+            feeds = {"input_ids": input_ids, "attention_mask": mask}
+            if "token_type_ids" in self.input_names:
+                feeds["token_type_ids"] = np.array(
+                    [e.type_ids for e in encodings], dtype=np.int64
+                )
+
+            hidden = self.session.run(None, feeds)[0]
+            weights = mask[..., None].astype(np.float32)
+            pooled = (hidden * weights).sum(axis=1) / np.clip(
+                weights.sum(axis=1), 1e-9, None
+            )
+            outputs.append(pooled.astype(np.float32))
+
+        if not outputs:
+            return np.zeros((0, self.info["dim"]), dtype=np.float32)
+        return np.concatenate(outputs)
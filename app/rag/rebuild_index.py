@@ -0,0 +1,116 @@
+# app/rag/rebuild_index.py
+"""
+Bangun ulang memory.index / summary.index dari file JSON sumber kebenaran.
+
+Teks di-encode per batch (EMBED_BATCH_SIZE atau --batch-size) dan index
+baru ditulis ke file sementara lalu di-rename, sehingga pembaca tidak
+pernah melihat index setengah jadi. Selama rebuild, lock tulis memory
+dipegang supaya tidak ada record baru yang terlewat.
+
+Contoh:
+    python -m app.rag.rebuild_index
+    python -m app.rag.rebuild_index --target summary --batch-size 128
+"""
+
+import argparse
+import os
+import time
+from app.config import config
+from app.utils import FileLock, log
+
+
+def memory_sources(memory_file: str):
+    """(teks, metadata) per record memory — sama seperti save_memory."""
+    from app.memory.conversation_store import get_conversation_store
+
+    for record in get_conversation_store(memory_file).iter_records():
+        if record.get("user") and record.get("chat_id"):
+            yield record["user"], record
+
+
+def summary_sources(summary_file: str):
+    """
+    (teks, metadata) per summary. Summary lama belum menyimpan prompt
+    pemicunya, jadi teks summary-nya sendiri yang di-embed.
+    """
+    from app.utils import FileManager
+
+    data = FileManager().read_json(summary_file) if os.path.exists(summary_file) else []
+    for record in data if isinstance(data, list) else []:
+        text = record.get("prompt") or record.get("summary")
+        if text:
+            yield text, record
+
+
+def rebuild(
+    sources, index_path: str, batch_size: int | None = None, lexical: bool = False
+) -> int:
+    from .lexical_index import lexical_index_path, write_lexical_index
+    from .vector_store import VectorStore
+
+    texts, metas = [], []
+    for text, meta in sources:
+        texts.append(text)
+        metas.append(meta)
+
+    tmp_path = index_path + ".rebuild"
+    for path in (tmp_path, tmp_path + ".meta.json"):
+        if os.path.exists(path):
+            os.remove(path)
+
+    vm = VectorStore()
+    vm.add_vectors(texts, metas, tmp_path, batch_size=batch_size)
+    if not texts:
+        vm.write_index([], [], tmp_path)
+
+    # Posisi dokumen BM25 = posisi FAISS, jadi ditulis ulang bersamaan
+    if lexical:
+        write_lexical_index(lexical_index_path(tmp_path), metas)
+        os.replace(lexical_index_path(tmp_path), lexical_index_path(index_path))
+    os.replace(tmp_path + ".meta.json", index_path + ".meta.json")
+    os.replace(tmp_path, index_path)
+    return len(texts)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--target", choices=["memory", "summary", "all"], default="all"
+    )
+    parser.add_argument("--batch-size", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    memory_root = os.path.join(config.MEMORY_ROOT, "default")
+    vector_root = os.path.join(config.VECTOR_ROOT, "memory", "default")
+    targets = {
+        "memory": (
+            memory_sources(os.path.join(memory_root, "memory.json")),
+            os.path.join(vector_root, "memory.index"),
+        ),
+        "summary": (
+            summary_sources(os.path.join(memory_root, "summary.json")),
+            os.path.join(vector_root, "summary.index"),
+        ),
+    }
+    names = list(targets) if args.target == "all" else [args.target]
+
+    with FileLock(os.path.join(memory_root, ".write.lock")):
+        for name in names:
+            sources, index_path = targets[name]
+            start = time.perf_counter()
+            total = rebuild(
+                sources,
+                index_path,
+                batch_size=args.batch_size,
+                lexical=name == "memory" and config.MEMORY_HYBRID,
+            )
+            elapsed = time.perf_counter() - start
+            rate = total / elapsed if elapsed else 0.0
+            log.info(
+                "Rebuild {}: {} vectors dalam {:.1f}s ({:.0f}/s)", name, total, elapsed, rate
+            )
+            print(f"{name}: {total} vectors in {elapsed:.1f}s ({rate:.0f}/s) → {index_path}")
+
+
+if __name__ == "__main__":
+    main()
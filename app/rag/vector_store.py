@@ -1,16 +1,33 @@
 # app/rag/vector_store.py
 
 import os
-import faiss
+import threading
 import numpy as np
-from app.utils import FileManager
-from .embedder import Embedder
+from app.config import config
+from app.utils import FileManager, metrics
+from app.utils.files_manager.size_index import size_index
+from .embedder import get_embedder
+
+# Cache index & metadata per path: {path: (stamp, obj)}.
+# Dibagi oleh semua VectorStore dalam proses; ketika di-preload di master
+# sebelum fork, halaman memorinya dipakai bersama (copy-on-write) oleh worker.
+_index_cache: dict[str, tuple] = {}
+_metadata_cache: dict[str, tuple] = {}
+_cache_lock = threading.Lock()
+
+
+def _file_stamp(path: str):
+    try:
+        stat = os.stat(path)
+        return (stat.st_mtime_ns, stat.st_size)
+    except OSError:
+        return None
 
 
 class VectorStore:
     def __init__(self, dim=384):
         self.dim = dim
-        self.embedder = Embedder()
+        self.embedder = get_embedder()
         self.fm = FileManager()
 
         self.index = None
@@ -26,7 +43,20 @@ class VectorStore:
         if path_dir and not os.path.exists(path_dir):
             os.makedirs(path_dir, exist_ok=True)
 
-    def _load_index(self):
+    def _load_index(self, fresh: bool = False):
+        """
+        Load index dari cache jika file belum berubah.
+        fresh=True → selalu baca dari disk (dipakai sebelum menulis, supaya
+        objek cache yang sedang dibaca thread lain tidak dimutasi).
+        """
+        import faiss
+
+        stamp = _file_stamp(self.index_path) if self.index_path else None
+        cached = _index_cache.get(self.index_path)
+        if not fresh and stamp and cached and cached[0] == stamp:
+            self.index = cached[1]
+            return
+
         # Load existing index if present, otherwise create a new IndexFlatIP
         if self.index_path and os.path.exists(self.index_path):
             try:
@@ -37,7 +67,17 @@ class VectorStore:
         else:
             self.index = faiss.IndexFlatIP(self.dim)
 
-    def _load_metadata(self):
+        if stamp:
+            with _cache_lock:
+                _index_cache[self.index_path] = (stamp, self.index)
+
+    def _load_metadata(self, fresh: bool = False):
+        stamp = _file_stamp(self.metadata_path) if self.metadata_path else None
+        cached = _metadata_cache.get(self.metadata_path)
+        if not fresh and stamp and cached and cached[0] == stamp:
+            self.metadata = cached[1]
+            return
+
         # Load metadata from JSON file and normalize to a list
         if self.metadata_path and os.path.exists(self.metadata_path):
             data = self.fm.read_json(self.metadata_path)
@@ -54,9 +94,21 @@ class VectorStore:
         else:
             self.metadata = []
 
+        if stamp:
+            with _cache_lock:
+                _metadata_cache[self.metadata_path] = (stamp, self.metadata)
+
     def _save_index(self):
+        import faiss
+
         if self.index is not None and self.index_path:
             faiss.write_index(self.index, self.index_path)
+            size_index.touch([self.index_path])
+            with _cache_lock:
+                _index_cache[self.index_path] = (
+                    _file_stamp(self.index_path),
+                    self.index,
+                )
 
     def _save_metadata(self):
         # Always write the current metadata list (overwrite) to keep it consistent
@@ -69,37 +121,131 @@ class VectorStore:
                     self.fm.create_json(self.metadata_path, self.metadata, overwrite=True)
                 except Exception:
                     pass
+            with _cache_lock:
+                _metadata_cache[self.metadata_path] = (
+                    _file_stamp(self.metadata_path),
+                    self.metadata,
+                )
 
-    def add_vector(self, text: str, metadata: dict, index_path: str):
+    def preload(self, index_path: str):
+        """
+        Muat index & metadata ke cache proses tanpa melakukan search.
+        Dipakai saat warmup / sebelum fork worker.
+        """
         self._setup_paths(index_path)
         self._load_index()
         self._load_metadata()
+        return getattr(self.index, "ntotal", 0)
 
-        embedding = self.embedder.encode_text(text)
+    def load_vectors(self, index_path: str):
+        """
+        Baca seluruh vektor + metadata dari index (segar dari disk).
+        Dipakai untuk menyusun ulang index tanpa meng-encode ulang teks.
+        """
+        self._setup_paths(index_path)
+        self._load_index(fresh=True)
+        self._load_metadata(fresh=True)
 
-        # Ensure embeddings shape is (n, dim) and dtype float32
-        if isinstance(embedding, np.ndarray):
-            vec = embedding.astype("float32")
-            if vec.ndim == 1:
-                vec = np.expand_dims(vec, axis=0)
-        else:
-            # convert to numpy array
-            vec = np.array(embedding, dtype="float32")
-            if vec.ndim == 1:
-                vec = np.expand_dims(vec, axis=0)
+        total = getattr(self.index, "ntotal", 0)
+        if total == 0:
+            return np.zeros((0, self.dim), dtype="float32"), []
+        vectors = self.index.reconstruct_n(0, total)
+        return np.asarray(vectors, dtype="float32"), self.metadata[:total]
+
+    def write_index(self, vectors: np.ndarray, metadata: list, index_path: str):
+        """Ganti seluruh isi index dengan `vectors` + `metadata` (urutan sama)."""
+        import faiss
+
+        if len(vectors) != len(metadata):
+            raise ValueError(
+                f"Vectors/metadata length mismatch: {len(vectors)} vs {len(metadata)}"
+            )
+        self._setup_paths(index_path)
+
+        self.index = faiss.IndexFlatIP(self.dim)
+        if len(vectors):
+            self.index.add(np.ascontiguousarray(vectors, dtype="float32"))
+        self.metadata = list(metadata)
+
+        self._save_index()
+        self._save_metadata()
+        return self.index.ntotal
+
+    def remove_vectors(self, index_path: str, key: str, values) -> int:
+        """
+        Hapus vektor yang metadata[key]-nya ada di `values`.
+        Index ditulis ulang dari vektor tersimpan (tanpa encode ulang);
+        dipakai untuk index kecil seperti summary.index.
+        """
+        values = set(values)
+        vectors, metadata = self.load_vectors(index_path)
+        keep = [
+            i
+            for i, meta in enumerate(metadata)
+            if not (isinstance(meta, dict) and meta.get(key) in values)
+        ]
+        removed = len(metadata) - len(keep)
+        if removed:
+            self.write_index(vectors[keep], [metadata[i] for i in keep], index_path)
+        return removed
+
+    def _as_matrix(self, embedding) -> np.ndarray:
+        """Pastikan embedding berbentuk (n, dim) float32 untuk FAISS."""
+        vec = np.asarray(embedding, dtype="float32")
+        if vec.ndim == 1:
+            vec = np.expand_dims(vec, axis=0)
 
         # Validate dimension
         if vec.shape[1] != self.dim:
             raise ValueError(f"Embedding dimension mismatch: expected {self.dim}, got {vec.shape[1]}")
+        return vec
+
+    def add_vector(self, text: str, metadata: dict, index_path: str):
+        self.add_vectors([text], [metadata], index_path)
+        return {"status": "success", "added": metadata}
+
+    def add_vectors(
+        self,
+        texts: list[str],
+        metas: list[dict],
+        index_path: str,
+        batch_size: int | None = None,
+    ):
+        """
+        Tambah banyak teks sekaligus: encode per batch (EMBED_BATCH_SIZE),
+        satu panggilan index.add, dan satu kali persist index + metadata.
+        """
+        if len(texts) != len(metas):
+            raise ValueError(
+                f"Texts/metas length mismatch: {len(texts)} vs {len(metas)}"
+            )
+        if not texts:
+            return {"status": "success", "added": 0}
+
+        self._setup_paths(index_path)
+        self._load_index(fresh=True)
+        self._load_metadata(fresh=True)
+
+        batch_size = batch_size or config.EMBED_BATCH_SIZE
+        vectors = np.concatenate(
+            [
+                self._as_matrix(
+                    self.embedder.encode_text(
+                        texts[start : start + batch_size], batch_size=batch_size
+                    )
+                )
+                for start in range(0, len(texts), batch_size)
+            ]
+        )
 
         # Add to index and metadata
-        self.index.add(vec)
-        self.metadata.append(metadata)
+        self.index.add(vectors)
+        self.metadata.extend(metas)
 
         self._save_index()
         self._save_metadata()
 
-        return {"status": "success", "added": metadata}
+        return {"status": "success", "added": len(metas)}
 
     def search(
         self, query_text: str, index_path: str, top_k: int = 5, min_score: float = 0.1
@@ -114,16 +260,10 @@ class VectorStore:
         query_embedding = self.embedder.encode_text(query_text)
 
         # Ensure shape and dtype for FAISS search
-        if isinstance(query_embedding, np.ndarray):
-            q = query_embedding.astype("float32")
-            if q.ndim == 1:
-                q = np.expand_dims(q, axis=0)
-        else:
-            q = np.array(query_embedding, dtype="float32")
-            if q.ndim == 1:
-                q = np.expand_dims(q, axis=0)
+        q = self._as_matrix(query_embedding)
 
-        D, I = self.index.search(q, top_k)
+        with metrics.timer("faiss_search"):
+            D, I = self.index.search(q, top_k)
 
         results = []
         for score, idx in zip(D[0], I[0]):
@@ -0,0 +1,129 @@
+# app/services/daemon.py
+
+import json
+import os
+import socketserver
+from app.core.orchestrator import Orchestrator
+from app.utils import generate_id, log
+from app.utils.profiler import profile_request
+from .daemon_client import DaemonClient, daemon_address
+
+
+class _NanoRequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        line = self.rfile.readline()
+        if not line.strip():
+            return
+
+        try:
+            payload = json.loads(line)
+        except json.JSONDecodeError:
+            self._send({"type": "error", "message": "Invalid JSON request."})
+            return
+
+        request_type = payload.get("type")
+        if request_type == "ping":
+            self._send({"type": "pong"})
+        elif request_type == "chat":
+            self.server.nano_daemon.handle_chat(payload, self._send)
+        else:
+            self._send(
+                {"type": "error", "message": f"Unknown request '{request_type}'."}
+            )
+
+    def _send(self, event: dict):
+        data = json.dumps(event, ensure_ascii=False).encode("utf-8") + b"\n"
+        self.wfile.write(data)
+        self.wfile.flush()
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class _TCPServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class NanoDaemon:
+    """
+    Proses long-lived yang menyimpan Orchestrator (embedder, index FAISS,
+    client OpenAI) tetap hangat dan melayani CLI lewat Unix domain socket.
+    """
+
+    def __init__(self, address=None):
+        self.address = address or daemon_address()
+        self.orchestrator = Orchestrator()
+        # Tidak ada lock per giliran: retrieval & encode query berjalan
+        # bersamaan antar client (di-batch EmbeddingDispatcher). Yang perlu
+        # berurutan hanya penulisan memory, dan itu sudah dipegang lock
+        # tulis memory (BaseMemory.write_lock) di Agent.run.
+        self.server = None
+
+    def handle_chat(self, payload: dict, send):
+        message = payload.get("message", "")
+        session_id = payload.get("session_id", "default")
+        request_id = generate_id("req")
+
+        try:
+            with profile_request(request_id, force=payload.get("profile", False)) as profile:
+                response = self.orchestrator.process_message(
+                    prompt=message,
+                    session_id=session_id,
+                    on_delta=lambda text: send({"type": "delta", "text": text}),
+                )
+            done = {"type": "done", "response": response, "request_id": request_id}
+            if profile and profile.path:
+                done["profile"] = profile.path
+            send(done)
+        except (BrokenPipeError, ConnectionResetError):
+            log.warning("Client daemon terputus sebelum respons selesai.")
+        except Exception as e:
+            log.error(f"Kesalahan daemon saat memproses chat: {e}")
+            send({"type": "error", "message": str(e)})
+
+    def _prepare_socket_path(self):
+        if DaemonClient(self.address).is_available():
+            raise RuntimeError(f"Nano daemon sudah berjalan di '{self.address}'.")
+
+        # Socket basi dari proses sebelumnya
+        if os.path.exists(self.address):
+            os.unlink(self.address)
+
+        path_dir = os.path.dirname(self.address)
+        if path_dir:
+            os.makedirs(path_dir, exist_ok=True)
+
+    def serve_forever(self):
+        if isinstance(self.address, str):
+            self._prepare_socket_path()
+
+        # Muat model sebelum socket di-bind, supaya client pertama tidak
+        # tertahan di backlog selama warmup
+        self.orchestrator.warmup()
+        self.orchestrator.start_background_tasks()
+
+        if isinstance(self.address, str):
+            self.server = _UnixServer(self.address, _NanoRequestHandler)
+        else:
+            self.server = _TCPServer(self.address, _NanoRequestHandler)
+        self.server.nano_daemon = self
+        log.info(f"Nano daemon listening on {self.address}")
+
+        try:
+            self.server.serve_forever()
+        finally:
+            self.shutdown()
+
+    def shutdown(self):
+        if self.server:
+            self.server.server_close()
+            self.server = None
+        if isinstance(self.address, str) and os.path.exists(self.address):
+            os.unlink(self.address)
+        log.info("Nano daemon stopped.")
+
+
+if __name__ == "__main__":
+    NanoDaemon().serve_forever()
@@ -0,0 +1,71 @@
+# app/services/daemon_client.py
+
+import json
+import os
+import socket
+from app.config import config
+
+
+def daemon_address():
+    """
+    Alamat daemon: path Unix socket jika AF_UNIX tersedia,
+    selain itu (host, port) TCP lokal.
+    """
+    if hasattr(socket, "AF_UNIX"):
+        return config.DAEMON_SOCKET
+    return (config.DAEMON_HOST, config.DAEMON_PORT)
+
+
+class DaemonClient:
+    """
+    Client ringan untuk Nano daemon.
+    Sengaja tidak meng-import apa pun dari app.core / app.rag supaya
+    CLI bisa langsung tampil tanpa memuat model.
+
+    Protokol: satu request JSON per baris, balasan berupa NDJSON event:
+        {"type": "delta", "text": "..."}
+        {"type": "done", "response": "..."}
+        {"type": "error", "message": "..."}
+    """
+
+    def __init__(self, address=None, timeout: float | None = None):
+        self.address = address or daemon_address()
+        self.timeout = timeout
+
+    def _connect(self) -> socket.socket:
+        if isinstance(self.address, str):
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        else:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.connect(self.address)
+        return sock
+
+    def is_available(self) -> bool:
+        if isinstance(self.address, str) and not os.path.exists(self.address):
+            return False
+        try:
+            for event in self._request({"type": "ping"}):
+                return event.get("type") == "pong"
+        except OSError:
+            return False
+        return False
+
+    def chat(self, message: str, session_id: str = "default", profile: bool = False):
+        """Generator event streaming untuk satu giliran chat."""
+        yield from self._request(
+            {
+                "type": "chat",
+                "message": message,
+                "session_id": session_id,
+                "profile": profile,
+            }
+        )
+
+    def _request(self, payload: dict):
+        with self._connect() as sock:
+            sock.sendall(json.dumps(payload, ensure_ascii=False).encode() + b"\n")
+            with sock.makefile("r", encoding="utf-8") as stream:
+                for line in stream:
+                    if line.strip():
+                        yield json.loads(line)
@@ -1,9 +1,11 @@
 # app/services/openai_service.py
 
 import os
+import threading
+import time
 from dotenv import load_dotenv
-from openai import OpenAI
-from app.utils import log
+from app.utils import log, metrics, tracer
+from .usage_ledger import usage_ledger
 
 
 class ModelOpenAI:
@@ -21,7 +23,9 @@ class ModelOpenAI:
             log.error("OPENAI_API_KEY tidak ditemukan di environment variables.")
             raise ValueError("OPENAI_API_KEY tidak ditemukan di environment variables.")
 
-        self.client = OpenAI(api_key=api_key)
+        self.api_key = api_key
+        self._client = None
+        self._client_lock = threading.Lock()
         self.model = model.lower()
         self.instructions = None
         self.reasoning = {"effort": "medium", "summary": "auto"}
@@ -33,6 +37,20 @@ class ModelOpenAI:
         self.metadata = {}
         self.parallel_tool_calls = True
 
+    @property
+    def client(self):
+        """
+        Client OpenAI dibuat saat panggilan pertama, sehingga import SDK
+        openai (dan httpx) tidak ikut memperlambat startup.
+        """
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    from openai import OpenAI
+
+                    self._client = OpenAI(api_key=self.api_key)
+        return self._client
+
     def update_config(self, **kwargs):
         """
         Update konfigurasi model secara dinamis.
@@ -42,47 +60,138 @@ class ModelOpenAI:
         for key, value in kwargs.items():
             if hasattr(self, key):
                 setattr(self, key, value)
-                log.debug(f"Config updated: {key}={value}")
+                log.debug("Config updated: {}={}", key, value)
             else:
                 log.warning(f"Config '{key}' tidak dikenal dan diabaikan.")
 
         log.info("Konfigurasi model diperbarui.")
 
-    def call(self, messages: list[dict], tools: list[dict] = None):
+    def call(
+        self,
+        messages: list[dict],
+        tools: list[dict] = None,
+        on_delta=None,
+        session_id: str = "default",
+        stage: str = "agent",
+        iteration: int | None = None,
+    ):
         """
         Panggil model sesuai konfigurasi yang aktif.
+        Jika `on_delta` diberikan, respons di-stream dan setiap potongan
+        teks dikirim ke callback tersebut sebelum respons final dikembalikan.
+        `session_id`, `stage`, dan `iteration` dicatat ke usage ledger.
         """
-        try:
-            params = {
-                "model": self.model,
-                "input": messages,
-                "instructions": self.instructions,
-                "tools": tools or [],
-                "tool_choice": "auto",
-                "max_output_tokens": self.max_tokens,
-                "top_p": self.top_p,
-                "metadata": self.metadata,
-                "parallel_tool_calls": self.parallel_tool_calls,
-            }
-
-            if self.stop:
-                params["stop"] = self.stop
-
-            if any(
-                tag in self.model
-                for tag in ["gpt-5", "gpt-5-mini", "gpt-5-nano", "gtp-5.1"]
-            ):
-                params["reasoning"] = self.reasoning
-                params["text"] = self.text
-            elif any(tag in self.model for tag in ["gpt-4o", "gpt-4o-mini"]):
-                params["temperature"] = self.temperature
-
-            response = self.client.responses.create(**params)
-            log.info(
-                f"model: {self.model}, length messages: {len(messages)}, tools: {len(tools) if tools else 0}"
-            )
-            return response
-
-        except Exception as e:
-            log.error(f"Error panggil {self.model}: {str(e)}")
-            return {"status": "error", "message": str(e)}
+        attributes = {
+            "llm.model": self.model,
+            "llm.stage": stage,
+            "llm.iteration": iteration,
+            "llm.messages": len(messages),
+            "llm.tools": len(tools) if tools else 0,
+            "llm.stream": bool(on_delta),
+        }
+        with tracer.span("llm.call", **attributes) as span:
+            try:
+                params = {
+                    "model": self.model,
+                    "input": messages,
+                    "instructions": self.instructions,
+                    "tools": tools or [],
+                    "tool_choice": "auto",
+                    "max_output_tokens": self.max_tokens,
+                    "top_p": self.top_p,
+                    "metadata": self.metadata,
+                    "parallel_tool_calls": self.parallel_tool_calls,
+                }
+
+                if self.stop:
+                    params["stop"] = self.stop
+
+                if any(
+                    tag in self.model
+                    for tag in ["gpt-5", "gpt-5-mini", "gpt-5-nano", "gtp-5.1"]
+                ):
+                    params["reasoning"] = self.reasoning
+                    params["text"] = self.text
+                elif any(tag in self.model for tag in ["gpt-4o", "gpt-4o-mini"]):
+                    params["temperature"] = self.temperature
+
+                with metrics.timer("llm_call", model=self.model):
+                    if on_delta:
+                        response = self._stream(params, on_delta)
+                    else:
+                        start = time.perf_counter()
+                        response = self.client.responses.create(**params)
+                        # Tanpa streaming token pertama datang bersama respons
+                        # penuh: TTFT = latensi total (label stream="false")
+                        metrics.observe(
+                            "nano_llm_ttft_seconds",
+                            time.perf_counter() - start,
+                            model=self.model,
+                            stream="false",
+                        )
+                usage = usage_ledger.record(
+                    self.model,
+                    getattr(response, "usage", None),
+                    session_id=session_id,
+                    stage=stage,
+                    iteration=iteration,
+                )
+                log.info(
+                    "model: {}, length messages: {}, tools: {}, stage: {}, tokens in/out: {}/{}",
+                    self.model,
+                    len(messages),
+                    len(tools) if tools else 0,
+                    stage,
+                    usage["input_tokens"] if usage else "-",
+                    usage["output_tokens"] if usage else "-",
+                )
+                if usage:
+                    span.set_attributes(
+                        {
+                            f"llm.usage.{key}": usage[key]
+                            for key in (
+                                "input_tokens",
+                                "cached_tokens",
+                                "output_tokens",
+                                "reasoning_tokens",
+                                "total_tokens",
+                            )
+                        }
+                    )
+                return response
+
+            except Exception as e:
+                span.record_error(e)
+                log.error(f"Error panggil {self.model}: {str(e)}")
+                return {"status": "error", "message": str(e)}
+
+    def _stream(self, params: dict, on_delta):
+        """
+        Jalankan request dalam mode streaming dan kembalikan objek respons
+        final (sama seperti hasil non-streaming).
+        """
+        response = None
+        start = time.perf_counter()
+        first_token = True
+        for event in self.client.responses.create(**params, stream=True):
+            event_type = getattr(event, "type", "")
+
+            if event_type == "response.output_text.delta":
+                if first_token:
+                    first_token = False
+                    metrics.observe(
+                        "nano_llm_ttft_seconds",
+                        time.perf_counter() - start,
+                        model=self.model,
+                        stream="true",
+                    )
+                on_delta(event.delta)
+            elif event_type in ("response.completed", "response.incomplete"):
+                response = event.response
+            elif event_type in ("response.failed", "error"):
+                error = getattr(getattr(event, "response", None), "error", None)
+                raise RuntimeError(str(error or getattr(event, "message", event)))
+
+        if response is None:
+            raise RuntimeError("Stream selesai tanpa respons final.")
+        return response
@@ -0,0 +1,144 @@
+# app/services/usage_ledger.py
+
+import json
+import os
+import threading
+from collections import defaultdict
+from datetime import datetime, timezone
+from app.config import config
+from app.utils import log
+
+GROUP_FIELDS = ("day", "session_id", "model", "stage")
+TOKEN_FIELDS = (
+    "input_tokens",
+    "cached_tokens",
+    "output_tokens",
+    "reasoning_tokens",
+    "total_tokens",
+)
+
+
+def _get(obj, *attrs, default=0):
+    """Ambil atribut bertingkat dari objek SDK maupun dict."""
+    for attr in attrs:
+        if obj is None:
+            return default
+        obj = obj.get(attr) if isinstance(obj, dict) else getattr(obj, attr, None)
+    return obj if obj is not None else default
+
+
+class UsageLedger:
+    """
+    Ledger append-only (JSONL) untuk pemakaian token setiap panggilan model.
+    Satu baris per panggilan, lengkap dengan session, stage, dan model,
+    sehingga bisa di-rollup per hari / session / model / stage.
+    """
+
+    def __init__(self, ledger_file: str = config.USAGE_LEDGER_FILE):
+        self.ledger_file = ledger_file
+        self._lock = threading.Lock()
+
+    def estimate_cost(self, model: str, input_tokens, cached_tokens, output_tokens):
+        """Estimasi biaya USD dari tabel harga per 1M token di BaseConfig."""
+        pricing = config.MODEL_PRICING.get(model)
+        if not pricing:
+            return None
+
+        uncached = max(input_tokens - cached_tokens, 0)
+        cost = (
+            uncached * pricing["input"]
+            + cached_tokens * pricing.get("cached_input", pricing["input"])
+            + output_tokens * pricing["output"]
+        )
+        return round(cost / 1_000_000, 8)
+
+    def record(
+        self,
+        model: str,
+        usage,
+        session_id: str = "default",
+        stage: str = "agent",
+        iteration: int | None = None,
+    ) -> dict | None:
+        """Catat `response.usage` dari Responses API ke ledger."""
+        if usage is None:
+            return None
+
+        input_tokens = _get(usage, "input_tokens")
+        cached_tokens = _get(usage, "input_tokens_details", "cached_tokens")
+        output_tokens = _get(usage, "output_tokens")
+        reasoning_tokens = _get(usage, "output_tokens_details", "reasoning_tokens")
+
+        now = datetime.now(timezone.utc)
+        entry = {
+            "timestamp": now.isoformat(timespec="milliseconds"),
+            "day": now.strftime("%Y-%m-%d"),
+            "session_id": session_id,
+            "stage": stage,
+            "iteration": iteration,
+            "model": model,
+            "input_tokens": input_tokens,
+            "cached_tokens": cached_tokens,
+            "output_tokens": output_tokens,
+            "reasoning_tokens": reasoning_tokens,
+            "total_tokens": _get(usage, "total_tokens")
+            or input_tokens + output_tokens,
+            "cost_usd": self.estimate_cost(
+                model, input_tokens, cached_tokens, output_tokens
+            ),
+        }
+
+        line = (json.dumps(entry, ensure_ascii=False) + "\n").encode("utf-8")
+        try:
+            os.makedirs(os.path.dirname(self.ledger_file), exist_ok=True)
+            # O_APPEND: satu write() per baris, aman dipakai beberapa worker
+            with self._lock:
+                fd = os.open(self.ledger_file, os.O_WRONLY | os.O_CREAT | os.O_APPEND)
+                try:
+                    os.write(fd, line)
+                finally:
+                    os.close(fd)
+        except OSError as e:
+            log.error(f"Gagal menulis usage ledger '{self.ledger_file}': {e}")
+
+        return entry
+
+    def iter_entries(self):
+        if not os.path.exists(self.ledger_file):
+            return
+        with open(self.ledger_file, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    # Baris terpotong (mis. proses mati saat menulis)
+                    continue
+
+    def rollup(self, group_by: str = "day", **filters) -> dict:
+        """
+        Agregasi token & biaya.
+
+        Args:
+            group_by: salah satu dari day, session_id, model, stage
+            filters: filter kesamaan, mis. session_id="default", day="2025-11-29"
+        """
+        if group_by not in GROUP_FIELDS:
+            raise ValueError(f"group_by must be one of {GROUP_FIELDS}")
+
+        groups = defaultdict(lambda: {**{f: 0 for f in TOKEN_FIELDS}, "calls": 0, "cost_usd": 0.0})
+        for entry in self.iter_entries():
+            if any(v is not None and entry.get(k) != v for k, v in filters.items()):
+                continue
+
+            group = groups[entry.get(group_by)]
+            group["calls"] += 1
+            for field in TOKEN_FIELDS:
+                group[field] += entry.get(field) or 0
+            group["cost_usd"] = round(group["cost_usd"] + (entry.get("cost_usd") or 0), 8)
+
+        return dict(groups)
+
+
+usage_ledger = UsageLedger()
@@ -0,0 +1,70 @@
+# app/tools/spill_store.py
+
+import hashlib
+import os
+import re
+import tempfile
+import time
+from app.config import config
+from app.utils import log
+from app.utils.files_manager.size_index import size_index
+
+_HANDLE_RE = re.compile(r"^[0-9a-f]{16}$")
+
+
+class SpillStore:
+    """
+    Area spill content-addressed untuk output tool yang melebihi budget.
+    Payload lengkap disimpan sebagai `<handle>.txt` (handle = 16 hex sha256
+    isi), sehingga output identik hanya ditulis sekali. Model membacanya
+    kembali per potongan lewat tool `read_spill`.
+    """
+
+    def __init__(self, root: str | None = None):
+        self.root = root or config.SPILL_ROOT
+        self._last_prune = 0.0
+
+    def path_for(self, handle: str) -> str | None:
+        if not isinstance(handle, str) or not _HANDLE_RE.match(handle):
+            return None
+        return os.path.join(self.root, f"{handle}.txt")
+
+    def put(self, text: str) -> str:
+        data = text.encode("utf-8")
+        handle = hashlib.sha256(data).hexdigest()[:16]
+        path = self.path_for(handle)
+
+        if os.path.exists(path):
+            # Sentuh mtime supaya payload yang dipakai ulang tidak ikut di-prune
+            os.utime(path)
+        else:
+            os.makedirs(self.root, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+            size_index.touch([path])
+
+        self._maybe_prune()
+        return handle
+
+    def _maybe_prune(self):
+        """Hapus spill yang lebih tua dari SPILL_TTL_HOURS, paling sering sekali per jam."""
+        now = time.time()
+        if now - self._last_prune < 3600:
+            return
+        self._last_prune = now
+
+        cutoff = now - config.SPILL_TTL_HOURS * 3600
+        removed = 0
+        with os.scandir(self.root) as entries:
+            for entry in entries:
+                if entry.name.endswith(".txt") and entry.stat().st_mtime < cutoff:
+                    try:
+                        os.remove(entry.path)
+                        removed += 1
+                    except OSError:
+                        pass
+        if removed:
+            size_index.touch([self.root])
+            log.info("Spill prune: {} payload dihapus", removed)
@@ -1,12 +1,17 @@
 # app/tools/tools_calling_manager.py
 
-from app.utils import FileManager
+import json
+from app.config import config
+from app.utils import FileManager, metrics, tracer
+from app.utils.token_count import token_count, truncate_to_tokens
+from .spill_store import SpillStore
 
 
 class ToolsCalling:
     def __init__(self):
         self.path_schema = "app/data/tools_schema/schema.json"
         self.fm = FileManager()
+        self.spill = SpillStore()
 
         # Mapping tool_name -> handler function
         self.tools_map = {
@@ -17,6 +22,8 @@ class ToolsCalling:
             "delete_file": self._handle_delete_file,
             "list_directory": self._handle_list_directory,
             "move_file": self._handle_move_file,
+            "read_spill": self._handle_read_spill,
+            "search_files": self._handle_search_files,
         }
 
     # =====================================
@@ -35,17 +42,73 @@ class ToolsCalling:
                 "message": f"Tool '{tool_name}' not found or not implemented.",
             }
 
-        try:
-            handler = self.tools_map[tool_name]
-            raw_output = handler(arg)
-            return self.format_tools_response(raw_output)
-
-        except Exception as e:
-            return {
-                "status": "error",
-                "message": str(e),
-                "content": {"tool": tool_name, "args": arg},
-            }
+        with tracer.span(f"tool.{tool_name}", **{"tool.name": tool_name}) as span:
+            try:
+                handler = self.tools_map[tool_name]
+                with metrics.timer("tool", tool=tool_name):
+                    raw_output = handler(arg)
+                output = self.format_tools_response(raw_output)
+                if span.is_recording:
+                    span.set_attributes(
+                        {
+                            "tool.status": output.get("status"),
+                            "tool.output_bytes": len(
+                                json.dumps(output, ensure_ascii=False, default=str)
+                            ),
+                        }
+                    )
+                return output
+
+            except Exception as e:
+                span.record_error(e)
+                return {
+                    "status": "error",
+                    "message": str(e),
+                    "content": {"tool": tool_name, "args": arg},
+                }
+
+    def fit_output(self, tool_name, output) -> str:
+        """
+        Serialisasi output tool untuk `function_call_output`.
+        Output di atas TOOL_OUTPUT_MAX_TOKENS diganti preview + handle spill;
+        payload lengkap disimpan di SpillStore dan dibaca lewat read_spill.
+        """
+        text = json.dumps(output, ensure_ascii=False)
+        # 1 token >= 1 karakter, jadi string pendek pasti muat tanpa tokenisasi
+        if len(text) <= config.TOOL_OUTPUT_MAX_TOKENS or tool_name == "read_spill":
+            return text
+        if token_count(text) <= config.TOOL_OUTPUT_MAX_TOKENS:
+            return text
+
+        data = output.get("data") if isinstance(output, dict) else None
+        payload = (
+            data
+            if isinstance(data, str)
+            else json.dumps(output, ensure_ascii=False, indent=1, default=str)
+        )
+        handle = self.spill.put(payload)
+
+        # Potong kasar dulu supaya tokenisasi preview tidak memproses payload utuh
+        limit = config.TOOL_OUTPUT_PREVIEW_TOKENS
+        preview = truncate_to_tokens(payload[: limit * 8], limit)
+        total_bytes = len(payload.encode("utf-8"))
+        return json.dumps(
+            {
+                "status": output.get("status", "success")
+                if isinstance(output, dict)
+                else "success",
+                "message": (
+                    f"Output of '{tool_name}' is too large ({total_bytes} bytes) and was truncated. "
+                    f"Call read_spill with handle='{handle}' and offset to page through the full output."
+                ),
+                "truncated": True,
+                "spill_handle": handle,
+                "total_bytes": total_bytes,
+                "next_offset": len(preview.encode("utf-8")),
+                "preview": preview,
+            },
+            ensure_ascii=False,
+        )
 
     # =====================================
     # TOOL HANDLERS (Modular)
@@ -56,7 +119,13 @@ class ToolsCalling:
         )
 
     def _handle_read_file(self, arg):
-        return self.fm.read_file(arg.get("filepath"))
+        return self.fm.read_file(
+            arg.get("filepath"),
+            offset=arg.get("offset"),
+            limit=arg.get("limit"),
+            start_line=arg.get("start_line"),
+            end_line=arg.get("end_line"),
+        )
 
     def _handle_write_file(self, arg):
         return self.fm.write_file(
@@ -75,6 +144,10 @@ class ToolsCalling:
             arg.get("only_files", False),
             arg.get("filter_ext"),
             arg.get("recursive", False),
+            max_entries=arg.get("max_entries"),
+            cursor=arg.get("cursor"),
+            max_depth=arg.get("max_depth"),
+            respect_ignore=arg.get("respect_ignore", True),
         )
 
     def _handle_move_file(self, arg):
@@ -82,6 +155,25 @@ class ToolsCalling:
             arg.get("src"), arg.get("dst"), arg.get("overwrite", False)
         )
 
+    def _handle_search_files(self, arg):
+        return self.fm.search_files(
+            arg.get("query"),
+            dirpath=arg.get("dirpath"),
+            regex=arg.get("regex", False),
+            case_sensitive=arg.get("case_sensitive", False),
+            file_glob=arg.get("file_glob"),
+            context=arg.get("context", 2),
+            max_results=arg.get("max_results"),
+        )
+
+    def _handle_read_spill(self, arg):
+        path = self.spill.path_for(arg.get("handle"))
+        if path is None:
+            return {"status": "error", "message": "Invalid spill handle."}
+        return self.fm.read_file(
+            path, offset=arg.get("offset") or 0, limit=arg.get("limit")
+        )
+
     def format_tools_response(self, response):
         if isinstance(response, dict):
             return response
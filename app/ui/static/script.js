@@ -5,6 +5,9 @@ let currentUserId = "default"; // Tetapkan ID Sesi Default
 let isFetching = false;
 const apiUrl = "/api/chat"; // Endpoint FastAPI Anda
 const historyApiUrl = "/api/history"; // Endpoint baru untuk memuat riwayat
+const historyPageLimit = 20; // Jumlah record per halaman riwayat
+let historyNextBefore = null; // Cursor halaman riwayat berikutnya (lebih lama)
+let isLoadingOlderHistory = false;
 // Catatan: chatHistory lokal dihapus karena status history sekarang dikelola oleh backend (Orchestrator/Memory)
 
 // jQuery Element Selectors (Tidak Berubah)
@@ -176,20 +179,70 @@ async function makeApiCall(userText, sessionId = "default") {
 }
 
 /**
- * Mengambil riwayat chat dari FastAPI dan menampilkannya.
- * @returns {Promise<boolean>} True jika riwayat dimuat, False jika kosong atau gagal.
+ * Mengambil satu halaman riwayat (terbaru dulu) dari FastAPI.
+ * `cache: "no-cache"` membuat browser mengirim ETag sehingga halaman
+ * yang tidak berubah dijawab 304 dan diambil dari cache.
+ * @param {number|null} before Cursor dari halaman sebelumnya
+ * @returns {Promise<{history: Array, next_before: number|null}>}
  */
-async function loadPreviousChat() {
+async function fetchHistoryPage(before = null) {
+  const params = new URLSearchParams({ limit: historyPageLimit });
+  if (before !== null) {
+    params.set("before", before);
+  }
+
+  const response = await fetch(`${historyApiUrl}?${params}`, {
+    cache: "no-cache",
+  });
+
+  if (!response.ok) {
+    throw new Error(`Failed to load history: ${response.statusText}`);
+  }
+  return response.json();
+}
+
+/**
+ * Memuat halaman riwayat yang lebih lama saat user scroll ke atas.
+ * Posisi scroll dipertahankan setelah pesan lama ditambahkan di atas.
+ */
+async function loadOlderHistory() {
+  if (isLoadingOlderHistory || historyNextBefore === null) return;
+  isLoadingOlderHistory = true;
+
   try {
-    const response = await fetch(historyApiUrl);
+    const data = await fetchHistoryPage(historyNextBefore);
+    const history = data.history || [];
+    historyNextBefore = data.next_before ?? null;
 
-    if (!response.ok) {
-      // Throw error tapi tetap biarkan logic catch-nya mengembalikan false
-      throw new Error(`Failed to load history: ${response.statusText}`);
-    }
+    const container = $conversationContainer[0];
+    const previousHeight = container.scrollHeight;
 
-    const data = await response.json();
+    const $older = $("<div></div>");
+    history.forEach((msg) => {
+      $older.append($(createMessageHtml(msg.role, msg.content)));
+    });
+    $chatHistoryContainer.prepend($older.children());
+    lucide.createIcons();
+
+    container.scrollTop += container.scrollHeight - previousHeight;
+  } catch (error) {
+    console.error("Error loading older history:", error);
+  } finally {
+    isLoadingOlderHistory = false;
+  }
+}
+
+/**
+ * Mengambil riwayat chat terbaru dari FastAPI dan menampilkannya.
+ * Halaman yang lebih lama dimuat bertahap lewat loadOlderHistory().
+ * @returns {Promise<boolean>} True jika riwayat dimuat, False jika kosong atau gagal.
+ */
+async function loadPreviousChat() {
+  try {
+    // Throw error tapi tetap biarkan logic catch-nya mengembalikan false
+    const data = await fetchHistoryPage();
     const history = data.history || [];
+    historyNextBefore = data.next_before ?? null;
 
     if (history.length > 0) {
       $chatHistoryContainer.empty();
@@ -280,6 +333,7 @@ async function sendMessage() {
 function startNewChat() {
   // Hapus: chatHistory.length = 0;
   $chatHistoryContainer.empty();
+  historyNextBefore = null;
 
   $chatTitle.text("Obrolan AI Baru");
 
@@ -450,6 +504,13 @@ $(document).ready(function () {
     }
   });
 
+  // Muat riwayat lebih lama saat scroll mendekati atas
+  $conversationContainer.on("scroll", () => {
+    if ($conversationContainer.scrollTop() < 80) {
+      loadOlderHistory();
+    }
+  });
+
   // Ensure sidebar state is handled on resize
   $(window).on("resize", setInitialSidebarState);
 
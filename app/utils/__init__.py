@@ -4,8 +4,11 @@ from app.utils.time_utils import get_current_time, get_timestamp
 from .id_generator import generate_id, generate_short_id
 from .logger import log
 from .files_manager.files_manager import FileManager
+from .files_manager.file_lock import FileLock
 from .cleaner import clean_openai_output
 from .token_count import token_count
+from .metrics import metrics
+from .tracing import tracer
 
 
 __all__ = [
@@ -15,6 +18,9 @@ __all__ = [
     "generate_short_id",
     "log",
     "FileManager",
+    "FileLock",
     "clean_openai_output",
     "token_count",
+    "metrics",
+    "tracer",
 ]
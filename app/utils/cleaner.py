@@ -1,7 +1,5 @@
 # app/utils/cleaner.py
 
-from openai.types.responses import ResponseOutputText
-
 
 def clean_openai_output(items: list):
     """
@@ -28,8 +26,11 @@ def clean_openai_output(items: list):
 
         # Jika model mengirim pesan biasa
         elif item.type == "message":
+            # Cek via atribut `type` supaya tidak perlu import SDK openai
             text_chunks = [
-                c.text for c in item.content if isinstance(c, ResponseOutputText)
+                c.text
+                for c in item.content
+                if getattr(c, "type", None) == "output_text"
             ]
             clean.append(
                 {
@@ -13,6 +13,10 @@ class BaseFileManager:
     Berisi common utilities dan safety patterns.
     """
 
+    # Cache hasil deteksi encoding: abspath -> (mtime_ns, size, encoding).
+    # Dibagi semua instance supaya chardet tidak dijalankan ulang per panggilan.
+    _encoding_cache: dict = {}
+
     def __init__(self):
         self.supported_text_encodings = ["utf-8", "latin-1", "cp1252"]
 
@@ -78,7 +82,7 @@ class BaseFileManager:
 
             # Atomic replace
             os.replace(temp_path, path)
-            log.debug(f"Atomic write successful for '{path}'")
+            log.debug("Atomic write successful for '{}'", path)
             return True
 
         except Exception as e:
@@ -119,7 +123,7 @@ class BaseFileManager:
 
             # Atomic replace
             os.replace(temp_path, path)
-            log.debug(f"Atomic JSON write successful for '{path}'")
+            log.debug("Atomic JSON write successful for '{}'", path)
             return True
 
         except Exception as e:
@@ -230,6 +234,7 @@ class BaseFileManager:
     def _detect_encoding(self, path: Path) -> str:
         """
         Detect file encoding (simple implementation).
+        Hasil di-cache per file dan divalidasi ulang lewat mtime + size.
 
         Args:
             path: File path
@@ -237,6 +242,17 @@ class BaseFileManager:
         Returns:
             Detected encoding string
         """
+        key = os.path.abspath(path)
+        try:
+            st = os.stat(key)
+            stamp = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            stamp = None
+
+        cached = self._encoding_cache.get(key)
+        if cached and stamp and cached[:2] == stamp:
+            return cached[2]
+
         import chardet
 
         try:
@@ -244,8 +260,14 @@ class BaseFileManager:
                 raw_data = f.read(8192)  # Read first 8KB for detection
                 result = chardet.detect(raw_data)
                 encoding = result["encoding"] or "utf-8"
-                log.debug(f"Detected encoding for '{path}': {encoding}")
-                return encoding
+                # 8KB pertama ASCII belum tentu seluruh file ASCII → utf-8 (superset)
+                if encoding.lower() == "ascii":
+                    encoding = "utf-8"
+                log.debug("Detected encoding for '{}': {}", path, encoding)
         except Exception as e:
             log.warning(f"Encoding detection failed for '{path}', using utf-8: {e}")
             return "utf-8"
+
+        if stamp:
+            self._encoding_cache[key] = (*stamp, encoding)
+        return encoding
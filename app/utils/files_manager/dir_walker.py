@@ -0,0 +1,226 @@
+# app/utils/files_manager/dir_walker.py
+
+import os
+import re
+from app.utils.logger import log
+
+# Direktori / file yang hampir tidak pernah berguna untuk di-listing
+DEFAULT_IGNORES = (
+    ".git/",
+    "node_modules/",
+    "__pycache__/",
+    ".venv/",
+    "venv/",
+    ".mypy_cache/",
+    ".pytest_cache/",
+    ".ruff_cache/",
+    ".tox/",
+    ".nox/",
+    ".idea/",
+    ".DS_Store",
+    "*.pyc",
+)
+
+
+def _translate(pattern: str) -> str:
+    """Glob gaya .gitignore → regex (dicocokkan ke path relatif POSIX)."""
+    i, n, out = 0, len(pattern), []
+    while i < n:
+        c = pattern[i]
+        if pattern.startswith("**/", i):
+            out.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("/**", i) and i + 3 == n:
+            out.append("/.*")
+            i += 3
+        elif pattern.startswith("**", i):
+            out.append(".*")
+            i += 2
+        elif c == "*":
+            out.append("[^/]*")
+            i += 1
+        elif c == "?":
+            out.append("[^/]")
+            i += 1
+        elif c == "[":
+            j = pattern.find("]", i + 1)
+            if j == -1:
+                out.append(re.escape(c))
+                i += 1
+            else:
+                body = pattern[i + 1 : j].replace("\\", "\\\\")
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                out.append(f"[{body}]")
+                i = j + 1
+        else:
+            out.append(re.escape(c))
+            i += 1
+    return "".join(out)
+
+
+class _Rule:
+    __slots__ = ("regex", "negate", "dir_only")
+
+    def __init__(self, pattern: str):
+        self.negate = pattern.startswith("!")
+        if self.negate:
+            pattern = pattern[1:]
+        self.dir_only = pattern.endswith("/")
+        pattern = pattern.rstrip("/")
+
+        # Pattern tanpa "/" di tengah berlaku di kedalaman mana pun
+        anchored = "/" in pattern
+        pattern = pattern.lstrip("/")
+        prefix = "" if anchored else "(?:.*/)?"
+        self.regex = re.compile(f"^{prefix}{_translate(pattern)}$")
+
+
+class IgnoreSpec:
+    """Sekumpulan rule .gitignore yang relatif terhadap satu direktori `base`."""
+
+    def __init__(self, base: str, patterns):
+        self.base = base
+        self.rules = []
+        for line in patterns:
+            line = line.rstrip("\n").rstrip()
+            if not line or line.startswith("#"):
+                continue
+            if line.startswith("\\"):
+                line = line[1:]
+            self.rules.append(_Rule(line))
+
+    @classmethod
+    def from_file(cls, path: str) -> "IgnoreSpec | None":
+        try:
+            with open(path, "r", encoding="utf-8", errors="replace") as f:
+                return cls(os.path.dirname(path), f.readlines())
+        except OSError:
+            return None
+
+    def match(self, abs_path: str, is_dir: bool) -> bool | None:
+        """True = diabaikan, False = di-whitelist (!), None = tidak ada rule cocok."""
+        rel = os.path.relpath(abs_path, self.base).replace(os.sep, "/")
+        if rel.startswith(".."):
+            return None
+        result = None
+        for rule in self.rules:
+            if rule.dir_only and not is_dir:
+                continue
+            if rule.regex.match(rel):
+                result = not rule.negate
+        return result
+
+
+class IgnoreRules:
+    """
+    Gabungan rule default + .gitignore dari root walk ke atas (sampai
+    direktori yang berisi .git) + .gitignore di setiap subdirektori.
+    Rule yang lebih dalam / lebih akhir menang, seperti git.
+    """
+
+    def __init__(self, root: str, use_defaults: bool = True, use_gitignore: bool = True):
+        self.use_gitignore = use_gitignore
+        self.specs = []
+        if use_defaults:
+            self.specs.append(IgnoreSpec(root, DEFAULT_IGNORES))
+        if use_gitignore:
+            self.specs.extend(self._ancestor_specs(root))
+
+    @staticmethod
+    def _ancestor_specs(root: str) -> list:
+        specs = []
+        current = os.path.abspath(root)
+        while True:
+            spec = IgnoreSpec.from_file(os.path.join(current, ".gitignore"))
+            if spec:
+                specs.append(spec)
+            parent = os.path.dirname(current)
+            if os.path.isdir(os.path.join(current, ".git")) or parent == current:
+                break
+            current = parent
+        specs.reverse()  # terluar dulu
+        return specs
+
+    def for_directory(self, dirpath: str, is_root: bool = False) -> "IgnoreRules":
+        """Rule untuk isi `dirpath`: tambah .gitignore milik direktori itu bila ada."""
+        if not self.use_gitignore or is_root:
+            return self
+        spec = IgnoreSpec.from_file(os.path.join(dirpath, ".gitignore"))
+        if spec is None:
+            return self
+        child = IgnoreRules.__new__(IgnoreRules)
+        child.use_gitignore = True
+        child.specs = self.specs + [spec]
+        return child
+
+    def ignored(self, abs_path: str, is_dir: bool) -> bool:
+        result = False
+        for spec in self.specs:
+            matched = spec.match(abs_path, is_dir)
+            if matched is not None:
+                result = matched
+        return result
+
+
+def walk_entries(
+    root: str,
+    max_depth: int | None = None,
+    ignore: IgnoreRules | None = None,
+    after: str | None = None,
+):
+    """
+    Walk pre-order berbasis os.scandir dengan urutan nama yang stabil.
+
+    Menghasilkan (relpath POSIX, DirEntry, is_dir, depth) satu per satu.
+    - `max_depth`: 1 = hanya isi langsung `root`; None = tanpa batas
+    - `ignore`: IgnoreRules; direktori yang diabaikan tidak dimasuki
+    - `after`: relpath terakhir yang sudah dikirim (cursor); walk
+      dilanjutkan tepat setelahnya tanpa memindai ulang subtree sebelumnya
+    Symlink ke direktori tidak diikuti. Tipe entry diambil dari DirEntry
+    (d_type), tanpa stat tambahan.
+    """
+    resume = after.strip("/").split("/") if after else None
+    root = os.path.abspath(root)
+    yield from _walk_dir(root, "", 1, max_depth, ignore, resume, is_root=True)
+
+
+def _walk_dir(dirpath, rel_prefix, depth, max_depth, ignore, resume, is_root=False):
+    try:
+        with os.scandir(dirpath) as it:
+            entries = sorted(it, key=lambda e: e.name)
+    except OSError as e:
+        log.warning(f"Cannot scan directory '{dirpath}': {e}")
+        return
+
+    rules = ignore.for_directory(dirpath, is_root) if ignore else None
+    head = resume[0] if resume else None
+
+    for entry in entries:
+        if head is not None and entry.name < head:
+            continue
+
+        try:
+            is_dir = entry.is_dir(follow_symlinks=False)
+        except OSError:
+            is_dir = False
+
+        if rules and rules.ignored(entry.path, is_dir):
+            continue
+
+        rel = f"{rel_prefix}{entry.name}"
+        child_resume = None
+        if head is not None and entry.name == head:
+            head = None
+            if len(resume) > 1:
+                child_resume = resume[1:]
+            # entry ini sudah dikirim sebelumnya; lanjut ke isinya (pre-order)
+        else:
+            head = None
+            yield rel, entry, is_dir, depth
+
+        if is_dir and (max_depth is None or depth < max_depth):
+            # rules (bukan ignore) supaya .gitignore direktori ini berlaku di seluruh subtree
+            yield from _walk_dir(
+                entry.path, f"{rel}/", depth + 1, max_depth, rules, child_resume
+            )
@@ -1,6 +1,9 @@
 import shutil
 from pathlib import Path
+from app.config import config
 from .base_file_manager import BaseFileManager
+from .dir_walker import IgnoreRules, walk_entries
+from .size_index import size_index
 
 
 class DirectoryManager(BaseFileManager):
@@ -12,10 +15,20 @@ class DirectoryManager(BaseFileManager):
         only_files: bool = False,
         filter_ext: list[str] | None = None,
         recursive: bool = False,
+        max_entries: int | None = None,
+        cursor: str | None = None,
+        max_depth: int | None = None,
+        respect_ignore: bool = True,
     ) -> dict:
         """
         List directory contents.
         Returns structured dict (success / error).
+
+        Hasil di-stream dari walker scandir dan dipotong di `max_entries`
+        (default LIST_MAX_ENTRIES); `next_cursor` dipakai sebagai `cursor`
+        untuk halaman berikutnya. `max_depth` membatasi kedalaman saat
+        recursive. Rule default (.git, node_modules, ...) dan .gitignore
+        dihormati kecuali `respect_ignore=False`.
         """
         try:
             path = self._validate_path(dirpath)
@@ -25,32 +38,46 @@ class DirectoryManager(BaseFileManager):
                     f"Directory '{path}' was not found or is not a folder."
                 )
 
-            # Collect items
-            items = list(path.rglob("*")) if recursive else list(path.iterdir())
-
-            # Filter: only files
-            if only_files:
-                items = [item for item in items if item.is_file()]
+            limit = min(max_entries or config.LIST_MAX_ENTRIES, config.LIST_MAX_ENTRIES)
+            depth = (max_depth or None) if recursive else 1
 
-            # Filter: extensions
+            normalized_exts = None
             if filter_ext:
-                normalized_exts = [
+                normalized_exts = tuple(
                     ext.lower() if ext.startswith(".") else f".{ext.lower()}"
                     for ext in filter_ext
-                ]
-                items = [
-                    item for item in items if item.suffix.lower() in normalized_exts
-                ]
+                )
+
+            ignore = IgnoreRules(str(path)) if respect_ignore else None
+
+            item_paths = []
+            next_cursor = None
+            for rel, entry, is_dir, _ in walk_entries(
+                str(path), max_depth=depth, ignore=ignore, after=cursor
+            ):
+                # Filter: only files / extensions (tipe dari DirEntry, tanpa stat ulang)
+                if only_files and (is_dir or not entry.is_file()):
+                    continue
+                if normalized_exts and not entry.name.lower().endswith(normalized_exts):
+                    continue
+
+                if len(item_paths) == limit:
+                    next_cursor = item_paths[-1]
+                    break
+                item_paths.append(rel)
 
-            # Convert to relative paths
-            item_paths = [str(item.relative_to(path)) for item in items]
+            message = f"Listed {len(item_paths)} item(s) in directory '{path}'."
+            if next_cursor:
+                message += " More items available; call again with cursor=next_cursor."
 
             return self._standard_success_response(
-                f"Listed {len(items)} item(s) in directory '{path}'.",
+                message,
                 data={
-                    "count": len(items),
+                    "count": len(item_paths),
                     "items": item_paths,
                     "absolute_path": str(path),
+                    "next_cursor": next_cursor,
+                    "truncated": next_cursor is not None,
                 },
             )
 
@@ -162,13 +189,8 @@ class DirectoryManager(BaseFileManager):
                     f"Directory '{path}' was not found."
                 )
 
-            total_size = 0
-            for file_path in path.rglob("*"):
-                if file_path.is_file():
-                    try:
-                        total_size += file_path.stat().st_size
-                    except OSError:
-                        pass
+            # Index incremental: hanya direktori yang berubah dipindai ulang
+            total_size = size_index.size(str(path))
 
             size_mb = total_size / (1024 * 1024)
 
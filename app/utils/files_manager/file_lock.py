@@ -0,0 +1,100 @@
+# app/utils/files_manager/file_lock.py
+
+import os
+import threading
+import time
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+class _LockState:
+    def __init__(self):
+        self.rlock = threading.RLock()
+        self.depth = 0
+        self.handle = None
+
+
+_states: dict[str, _LockState] = {}
+_states_lock = threading.Lock()
+
+
+class FileLock:
+    """
+    Exclusive lock lintas proses berbasis file (flock / msvcrt).
+
+    - Reentrant di dalam satu thread (nested `with` tidak deadlock).
+    - Antar thread dalam satu proses diserialisasi lewat RLock.
+    - Antar proses (worker gunicorn/uvicorn) diserialisasi oleh OS lock.
+
+    Contoh:
+        with FileLock("app/data/memory/default/.write.lock"):
+            ...
+    """
+
+    def __init__(self, lock_path: str | Path):
+        self.lock_path = str(Path(lock_path).resolve())
+        with _states_lock:
+            self._state = _states.setdefault(self.lock_path, _LockState())
+
+    def acquire(self):
+        state = self._state
+        state.rlock.acquire()
+        try:
+            if state.depth == 0:
+                os.makedirs(os.path.dirname(self.lock_path), exist_ok=True)
+                handle = open(self.lock_path, "a+b")
+                try:
+                    self._os_lock(handle)
+                except Exception:
+                    handle.close()
+                    raise
+                state.handle = handle
+            state.depth += 1
+        except Exception:
+            state.rlock.release()
+            raise
+
+    def release(self):
+        state = self._state
+        state.depth -= 1
+        if state.depth == 0:
+            try:
+                self._os_unlock(state.handle)
+            finally:
+                state.handle.close()
+                state.handle = None
+        state.rlock.release()
+
+    def _os_lock(self, handle):
+        if fcntl:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+            return
+
+        # msvcrt.LK_LOCK menyerah setelah ~10 detik, jadi ulangi sampai dapat
+        handle.seek(0)
+        while True:
+            try:
+                msvcrt.locking(handle.fileno(), msvcrt.LK_LOCK, 1)
+                return
+            except OSError:
+                time.sleep(0.05)
+
+    def _os_unlock(self, handle):
+        if fcntl:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+        else:
+            handle.seek(0)
+            msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+        return False
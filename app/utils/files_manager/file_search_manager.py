@@ -0,0 +1,143 @@
+import fnmatch
+import os
+import re
+from pathlib import Path
+from app.config import config
+from .base_file_manager import BaseFileManager
+from .search_index import get_search_index, literal_segments
+
+
+class SearchManager(BaseFileManager):
+    """Manager for searching file contents through the trigram index"""
+
+    def search_files(
+        self,
+        query: str,
+        dirpath: str | Path | None = None,
+        regex: bool = False,
+        case_sensitive: bool = False,
+        file_glob: str | None = None,
+        context: int = 2,
+        max_results: int | None = None,
+    ) -> dict:
+        """
+        Search file contents (literal or regex) under a directory.
+
+        Args:
+            query: Text or regular expression to search for
+            dirpath: Directory to search (default: SEARCH_ROOT)
+            regex: Treat query as a regular expression
+            case_sensitive: Case-sensitive matching
+            file_glob: Only search files matching this glob (e.g. "*.py")
+            context: Lines of context before/after each hit
+            max_results: Maximum number of hits (capped by SEARCH_MAX_RESULTS)
+
+        Returns:
+            dict: {status, message, data: {hits, files_matched, candidates, truncated, skipped}}
+        """
+        try:
+            if not query:
+                return self._standard_error_response("Query must not be empty.")
+
+            path = self._validate_path(dirpath or config.SEARCH_ROOT)
+            if not path.exists() or not path.is_dir():
+                return self._standard_error_response(
+                    f"Directory '{path}' was not found or is not a folder."
+                )
+
+            flags = 0 if case_sensitive else re.IGNORECASE
+            try:
+                pattern = re.compile(query if regex else re.escape(query), flags)
+            except re.error as e:
+                return self._standard_error_response(f"Invalid regex '{query}': {e}")
+
+            limit = min(max_results or config.SEARCH_MAX_RESULTS, config.SEARCH_MAX_RESULTS)
+            context = max(0, min(int(context), 10))
+
+            # Index di-refresh incremental: hanya file yang mtime/size-nya berubah
+            index, prefix = get_search_index(str(path))
+            index.refresh()
+            # Trigram hanya menyaring kandidat; match final tetap lewat regex
+            segments = literal_segments(query) if regex else [query]
+            segments = [s for s in segments or [] if len(s) >= 3] or None
+            candidates = index.candidates(segments, prefix)
+            # File di atas SEARCH_MAX_FILE_BYTES tidak diindeks maupun dipindai;
+            # dilaporkan supaya "0 hit" tidak disangka hasil lengkap
+            skipped = index.oversized(prefix)
+            if file_glob:
+                candidates = self._filter_glob(candidates, file_glob)
+                skipped = self._filter_glob(skipped, file_glob)
+
+            hits = []
+            files_matched = 0
+            truncated = False
+            for rel in candidates:
+                file_hits = self._search_file(
+                    os.path.join(index.root, rel), pattern, context
+                )
+                if not file_hits:
+                    continue
+                files_matched += 1
+                for line_no, snippet in file_hits:
+                    if len(hits) == limit:
+                        truncated = True
+                        break
+                    hits.append(
+                        {"path": rel[len(prefix):], "line": line_no, "snippet": snippet}
+                    )
+                if truncated:
+                    break
+
+            message = f"Found {len(hits)} hit(s) in {files_matched} file(s) under '{path}'."
+            if truncated:
+                message += " Results truncated; narrow the query or use file_glob."
+            if skipped:
+                message += (
+                    f" {len(skipped)} file(s) larger than {config.SEARCH_MAX_FILE_BYTES} bytes"
+                    " were not searched (see skipped; use read_file to inspect them)."
+                )
+
+            return self._standard_success_response(
+                message,
+                data={
+                    "hits": hits,
+                    "files_matched": files_matched,
+                    "candidates": len(candidates),
+                    "truncated": truncated,
+                    "skipped": [rel[len(prefix):] for rel in skipped[:20]],
+                },
+            )
+
+        except Exception as e:
+            return self._standard_error_response(
+                f"Error searching files in '{dirpath}': {str(e)}"
+            )
+
+    @staticmethod
+    def _filter_glob(paths: list[str], file_glob: str) -> list[str]:
+        return [
+            rel
+            for rel in paths
+            if fnmatch.fnmatch(os.path.basename(rel), file_glob)
+            or fnmatch.fnmatch(rel, file_glob)
+        ]
+
+    def _search_file(self, filepath: str, pattern: re.Pattern, context: int) -> list:
+        """Hit per baris dalam format grep -n -C: 'N:baris hit', 'N-konteks'."""
+        try:
+            with open(filepath, "r", encoding="utf-8", errors="replace") as f:
+                lines = f.read().splitlines()
+        except OSError:
+            return []
+
+        results = []
+        for i, line in enumerate(lines):
+            if not pattern.search(line):
+                continue
+            start, end = max(0, i - context), min(len(lines), i + context + 1)
+            snippet = "\n".join(
+                f"{n + 1}{':' if n == i else '-'}{lines[n][:config.SEARCH_MAX_LINE_CHARS]}"
+                for n in range(start, end)
+            )
+            results.append((i + 1, snippet))
+        return results
@@ -1,6 +1,44 @@
+import codecs
+import itertools
+import mmap
 from pathlib import Path
+from app.config import config
+from app.utils.token_count import token_count, truncate_to_tokens
 from .base_file_manager import BaseFileManager
 
+# Blok pemindaian saat mencari offset baris
+_LINE_SCAN_BLOCK = 1024 * 1024
+
+
+def _is_utf8(encoding: str) -> bool:
+    return codecs.lookup(encoding).name in ("utf-8", "utf-8-sig")
+
+
+def _ascii_compatible(encoding: str) -> bool:
+    try:
+        return "\n".encode(encoding) == b"\n"
+    except LookupError:
+        return False
+
+
+def _line_offset(buf, size: int, line: int, pos: int = 0, current: int = 1) -> int:
+    """
+    Byte offset awal baris ke-`line` (1-based), dihitung dari `pos` yang
+    merupakan awal baris ke-`current`. Newline dihitung per blok supaya
+    file besar tidak dipindai baris per baris di Python.
+    """
+    while current < line and pos < size:
+        block = buf[pos : pos + _LINE_SCAN_BLOCK]
+        newlines = block.count(b"\n")
+        if current + newlines < line:
+            current += newlines
+            pos += len(block)
+            continue
+        for _ in range(line - current):
+            pos = buf.find(b"\n", pos) + 1
+        return pos
+    return min(pos, size)
+
 
 class TextFileManager(BaseFileManager):
     """Manager for standard text file operations"""
@@ -44,16 +82,31 @@ class TextFileManager(BaseFileManager):
                 f"Error creating file '{filepath}': {str(e)}"
             )
 
-    def read_file(self, filepath: str | Path) -> str | dict:
+    def read_file(
+        self,
+        filepath: str | Path,
+        offset: int | None = None,
+        limit: int | None = None,
+        start_line: int | None = None,
+        end_line: int | None = None,
+    ) -> str | dict:
         """
         Reads the content of a text file.
 
+        File kecil tanpa parameter range dikembalikan utuh sebagai string.
+        File besar (di atas READ_MAX_BYTES / READ_MAX_TOKENS) atau permintaan
+        range dibaca per potongan dan dikembalikan bersama cursor lanjutan.
+
         Args:
             filepath: File path
+            offset: Byte offset awal (mode byte)
+            limit: Maksimal byte yang dibaca (dibatasi READ_MAX_BYTES)
+            start_line: Baris awal, mulai dari 1 (mode baris)
+            end_line: Baris akhir, inklusif (mode baris)
 
         Returns:
-            str: The content of the file on success.
-            dict: {status, message} on error.
+            str: The content of the file on success (small file, no range).
+            dict: {status, message, data} for ranged reads, or {status, message} on error.
         """
         try:
             path = self._validate_path(filepath)
@@ -62,20 +115,200 @@ class TextFileManager(BaseFileManager):
             if not self._check_file_exists(path):
                 return self._standard_error_response(f"File '{path}' not found.")
 
-            # Detect encoding and read file
-            encoding = self._detect_encoding(path)
+            size = path.stat().st_size
+            ranged = any(v is not None for v in (offset, limit, start_line, end_line))
+
+            if not ranged and size <= config.READ_MAX_BYTES:
+                # Detect encoding and read file
+                encoding = self._detect_encoding(path)
 
-            with open(path, "r", encoding=encoding) as f:
-                content = f.read()
+                with open(path, "r", encoding=encoding) as f:
+                    content = f.read()
 
-            # Return content directly on success
-            return content
+                # Return content directly on success
+                if token_count(content) <= config.READ_MAX_TOKENS:
+                    return content
+
+            return self._read_chunk(path, size, offset, limit, start_line, end_line)
 
         except Exception as e:
             return self._standard_error_response(
                 f"Error reading file '{filepath}': {str(e)}"
             )
 
+    def _read_chunk(
+        self,
+        path: Path,
+        size: int,
+        offset: int | None,
+        limit: int | None,
+        start_line: int | None,
+        end_line: int | None,
+    ) -> dict:
+        """
+        Baca satu potongan file dengan batas byte + token.
+        File di atas READ_MMAP_THRESHOLD di-mmap sehingga hanya halaman
+        yang disentuh yang masuk RAM.
+        """
+        encoding = self._detect_encoding(path)
+        max_bytes = min(limit or config.READ_MAX_BYTES, config.READ_MAX_BYTES)
+        if max_bytes <= 0:
+            return self._standard_error_response("limit must be a positive integer.")
+
+        line_mode = start_line is not None or end_line is not None
+        start_line = max(int(start_line or 1), 1)
+        if end_line is not None and int(end_line) < start_line:
+            return self._standard_error_response(
+                "end_line must be greater than or equal to start_line."
+            )
+
+        # Encoding yang tidak kompatibel ASCII (mis. utf-16) tidak bisa
+        # dipotong per byte / dicari "\n"-nya di level byte
+        if not _ascii_compatible(encoding):
+            if line_mode:
+                return self._read_lines_text(
+                    path, encoding, size, start_line, end_line, max_bytes
+                )
+            if offset:
+                return self._standard_error_response(
+                    f"Byte offsets are not supported for '{encoding}' files; use start_line/end_line."
+                )
+
+        with open(path, "rb") as f:
+            if size == 0:
+                buf = b""
+            elif size >= config.READ_MMAP_THRESHOLD:
+                buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                buf = f.read()
+
+            try:
+                if line_mode:
+                    begin = _line_offset(buf, size, start_line)
+                    natural_end = (
+                        _line_offset(buf, size, int(end_line) + 1, begin, start_line)
+                        if end_line is not None
+                        else size
+                    )
+                else:
+                    begin = min(max(int(offset or 0), 0), size)
+                    if _is_utf8(encoding):
+                        # Jangan mulai di tengah karakter multibyte
+                        while begin < size and buf[begin] & 0xC0 == 0x80:
+                            begin += 1
+                    natural_end = size
+
+                stop = min(natural_end, begin + max_bytes)
+                if stop < natural_end and _ascii_compatible(encoding):
+                    # Potong di akhir baris terakhir yang utuh bila ada
+                    newline = buf.rfind(b"\n", begin, stop)
+                    if newline > begin:
+                        stop = newline + 1
+
+                raw = buf[begin:stop]
+            finally:
+                if isinstance(buf, mmap.mmap):
+                    buf.close()
+
+        if _is_utf8(encoding) and begin > 0:
+            encoding = "utf-8"  # BOM hanya ada di awal file
+        decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+        content = decoder.decode(raw, final=stop >= size)
+        # Byte sisa karakter yang terpotong tidak dihitung terbaca
+        stop -= len(decoder.getstate()[0])
+
+        if token_count(content) > config.READ_MAX_TOKENS:
+            content = truncate_to_tokens(content, config.READ_MAX_TOKENS)
+            stop = begin + len(content.encode(encoding, errors="replace"))
+
+        eof = stop >= size
+        done = eof or (line_mode and end_line is not None and stop >= natural_end)
+        data = {
+            "content": content,
+            "encoding": encoding,
+            "size": size,
+            "offset": begin,
+            "next_offset": None if done else stop,
+            "eof": eof,
+            "truncated": not done,
+        }
+
+        if line_mode:
+            lines_read = content.count("\n") + (0 if content.endswith("\n") else 1)
+            data["start_line"] = start_line
+            data["end_line"] = start_line + max(lines_read, 1) - 1 if content else None
+            data["next_line"] = None if done else start_line + content.count("\n")
+
+        message = f"Read bytes {begin}-{stop} of {size} from '{path}'."
+        if not done:
+            cursor = None
+            if not _ascii_compatible(encoding):
+                # Offset byte ditolak untuk encoding ini; lanjut per baris.
+                # Di sini selalu mode offset dari awal file (begin == 0), baris
+                # yang terpotong dibaca ulang utuh dari awal barisnya.
+                data["next_offset"] = None
+                newlines = content.count("\n")
+                if newlines:
+                    data["next_line"] = 1 + newlines
+                    cursor = f"start_line={data['next_line']}"
+            elif line_mode and data["next_line"] > start_line:
+                cursor = f"start_line={data['next_line']}"
+            else:
+                # Satu baris lebih panjang dari batas: start_line yang sama akan
+                # membaca potongan yang sama lagi, jadi lanjut lewat offset byte
+                if line_mode:
+                    data["next_line"] = None
+                cursor = f"offset={data['next_offset']}"
+            if cursor:
+                message += f" Content truncated; call read_file again with {cursor} to continue."
+            else:
+                message += " Content truncated; the first line exceeds the read limit."
+        return self._standard_success_response(message, data)
+
+    def _read_lines_text(
+        self,
+        path: Path,
+        encoding: str,
+        size: int,
+        start_line: int,
+        end_line: int | None,
+        max_bytes: int,
+    ) -> dict:
+        """Fallback mode baris untuk encoding non-ASCII (dibaca sebagai teks)."""
+        lines = []
+        used = 0
+        next_line = None
+        with open(path, "r", encoding=encoding, errors="replace") as f:
+            for number, line in enumerate(
+                itertools.islice(f, start_line - 1, end_line), start=start_line
+            ):
+                used += len(line.encode("utf-8"))
+                if lines and used > max_bytes:
+                    next_line = number
+                    break
+                lines.append(line)
+
+        content = "".join(lines)
+        if token_count(content) > config.READ_MAX_TOKENS:
+            content = truncate_to_tokens(content, config.READ_MAX_TOKENS)
+            # Minimal maju satu baris: baris yang melebihi batas token dipotong,
+            # start_line yang sama hanya akan mengulang potongan yang sama
+            next_line = start_line + max(content.count("\n"), 1)
+
+        data = {
+            "content": content,
+            "encoding": encoding,
+            "size": size,
+            "start_line": start_line,
+            "end_line": start_line + len(lines) - 1 if lines else None,
+            "next_line": next_line,
+            "truncated": next_line is not None,
+        }
+        message = f"Read lines {start_line}-{data['end_line']} from '{path}'."
+        if next_line is not None:
+            message += f" Content truncated; call read_file again with start_line={next_line} to continue."
+        return self._standard_success_response(message, data)
+
     def write_file(
         self, filepath: str | Path, content: str, safe_write: bool = True
     ) -> dict:
@@ -1,9 +1,13 @@
 # app/tools/file_managers/file_manager.py
 
+import functools
+import inspect
 from .file_text_manager import TextFileManager
 from .file_json_manager import JSONFileManager
 from .file_operations_manager import FileOperationsManager
 from .directory_manager import DirectoryManager
+from .file_search_manager import SearchManager
+from .size_index import size_index
 
 
 class FileManager:
@@ -16,6 +20,7 @@ class FileManager:
         self.json = JSONFileManager()
         self.ops = FileOperationsManager()
         self.dir = DirectoryManager()
+        self.search = SearchManager()
 
         # Backward compatibility - direct access to common methods
         self._setup_direct_methods()
@@ -23,32 +28,58 @@ class FileManager:
     def _setup_direct_methods(self):
         """Setup direct methods untuk backward compatibility"""
         # Text operations
-        self.create_file = self.text.create_file
+        self.create_file = self._tracked(self.text.create_file, "filepath")
         self.read_file = self.text.read_file
-        self.write_file = self.text.write_file
-        self.append_file = self.text.append_file
+        self.write_file = self._tracked(self.text.write_file, "filepath")
+        self.append_file = self._tracked(self.text.append_file, "filepath")
 
         # JSON operations
-        self.create_json = self.json.create_json
-        self.write_json = self.json.write_json
+        self.create_json = self._tracked(self.json.create_json, "filepath")
+        self.write_json = self._tracked(self.json.write_json, "filepath")
         self.read_json = self.json.read_json
-        self.append_json = self.json.append_json
+        self.append_json = self._tracked(self.json.append_json, "filepath")
 
         # File operations
-        self.delete_file = self.ops.delete_file
-        self.copy_file = self.ops.copy_file
-        self.rename_file = self.ops.rename_file
-        self.move_file = self.ops.move_file
-        self.restore_file = self.ops.restore_file
+        self.delete_file = self._tracked(self.ops.delete_file, "filepath")
+        self.copy_file = self._tracked(self.ops.copy_file, "src", "dst")
+        self.rename_file = self._tracked(self.ops.rename_file, "src")
+        self.move_file = self._tracked(self.ops.move_file, "src", "dst")
+        self.restore_file = self._tracked(
+            self.ops.restore_file, "trash_path", "restore_dir"
+        )
         self.get_file_info = self.ops.get_file_info
 
         # Directory operations
         self.list_directory = self.dir.list_directory
-        self.create_directory = self.dir.create_directory
-        self.delete_directory = self.dir.delete_directory
-        self.copy_directory = self.dir.copy_directory
+        self.create_directory = self._tracked(self.dir.create_directory, "dirpath")
+        self.delete_directory = self._tracked(self.dir.delete_directory, "dirpath")
+        self.copy_directory = self._tracked(self.dir.copy_directory, "src", "dst")
         self.get_directory_size = self.dir.get_directory_size
 
+        # Search operations
+        self.search_files = self.search.search_files
+
+    @staticmethod
+    def _tracked(method, *path_params):
+        """
+        Bungkus operasi tulis supaya size index langsung diperbarui untuk
+        direktori yang disentuh (termasuk tulis di tempat yang tidak
+        mengubah mtime direktori).
+        """
+        signature = inspect.signature(method)
+
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            result = method(*args, **kwargs)
+            try:
+                bound = signature.bind(*args, **kwargs).arguments
+            except TypeError:
+                return result
+            size_index.touch([bound.get(name) for name in path_params])
+            return result
+
+        return wrapper
+
     def get_stats(self) -> dict:
         """
         Dapatkan statistics tentang file manager.
@@ -62,11 +93,13 @@ class FileManager:
                 "json": "JSONFileManager",
                 "ops": "FileOperationsManager",
                 "dir": "DirectoryManager",
+                "search": "SearchManager",
             },
             "features": {
                 "text_operations": 4,
                 "json_operations": 4,
                 "file_operations": 6,
                 "directory_operations": 5,
+                "search_operations": 1,
             },
         }
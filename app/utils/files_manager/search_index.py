@@ -0,0 +1,213 @@
+# app/utils/files_manager/search_index.py
+
+import os
+import threading
+from app.config import config
+from app.utils.logger import log
+from .dir_walker import IgnoreRules, walk_entries
+
+_REGEX_META = set(".^$*+?{}[]()|\\")
+_QUANTIFIERS = set("*?{")
+# Panjang payload escape numerik: \xhh, \uhhhh, \Uhhhhhhhh
+_ESCAPE_PAYLOAD = {"x": 2, "u": 4, "U": 8}
+
+
+def _escape_end(pattern: str, i: int) -> int:
+    """Indeks setelah escape yang dimulai di pattern[i] == '\\'."""
+    kind = pattern[i + 1]
+    if kind in _ESCAPE_PAYLOAD:
+        return i + 2 + _ESCAPE_PAYLOAD[kind]
+    if kind == "N" and i + 2 < len(pattern) and pattern[i + 2] == "{":
+        end = pattern.find("}", i + 3)
+        return end + 1 if end != -1 else len(pattern)
+    if kind.isdigit():
+        # Octal (\0, \012) / backreference (\1, \12)
+        end = i + 2
+        while end < len(pattern) and end < i + 4 and pattern[end].isdigit():
+            end += 1
+        return end
+    return i + 2
+
+
+def trigrams(text: str) -> set[str]:
+    text = text.lower()
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+def literal_segments(pattern: str) -> list[str] | None:
+    """
+    Potongan literal yang pasti muncul di setiap match regex `pattern`.
+    None jika tidak bisa dijamin (mis. alternation), sehingga semua file
+    menjadi kandidat.
+    """
+    segments, current = [], []
+    depth = 0
+    i = 0
+    while i < len(pattern):
+        c = pattern[i]
+        nxt = pattern[i + 1] if i + 1 < len(pattern) else ""
+        if c == "|" and depth == 0:
+            return None
+        if c == "\\" and nxt:
+            end = _escape_end(pattern, i)
+            if depth:
+                i = end
+                continue
+            if nxt.isalnum():
+                # \d, \w, \b, \x41, \n, ... bukan literal apa adanya;
+                # payload-nya (mis. "41") juga bukan teks yang dicari
+                segments.append("".join(current))
+                current = []
+            else:
+                current.append(nxt)
+            i = end
+            continue
+        if c in _REGEX_META:
+            if c == "(":
+                depth += 1
+            elif c == ")":
+                depth = max(depth - 1, 0)
+            elif c in _QUANTIFIERS and current:
+                # Karakter sebelum *, ?, {m,n} boleh tidak muncul
+                current.pop()
+            if c in "[{":
+                # Lewati isi character class / batas quantifier
+                end = pattern.find("]" if c == "[" else "}", i + 1)
+                i = end if end != -1 else i
+            segments.append("".join(current))
+            current = []
+            i += 1
+            continue
+        if depth:
+            # Isi grup bisa opsional / berulang → lewati
+            i += 1
+            continue
+        current.append(c)
+        i += 1
+    segments.append("".join(current))
+    return [s for s in segments if len(s) >= 3]
+
+
+class TrigramIndex:
+    """
+    Inverted index trigram (lowercase) untuk semua file teks di bawah `root`.
+
+    `refresh()` memindai pohon lewat walker (rule ignore berlaku) dan hanya
+    mengindeks ulang file yang mtime / size-nya berubah; file yang hilang
+    dikeluarkan dari index. Query memakai trigram sebagai filter kandidat,
+    lalu setiap kandidat diverifikasi dengan regex sungguhan.
+    """
+
+    def __init__(self, root: str):
+        self.root = os.path.abspath(root)
+        self._docs: dict[str, tuple] = {}  # relpath -> (mtime_ns, size, trigrams)
+        self._postings: dict[str, set] = {}  # trigram -> {relpath}
+        self._oversized: set[str] = set()  # file teks > SEARCH_MAX_FILE_BYTES (tidak diindeks)
+        self._lock = threading.Lock()
+
+    def _read_text(self, path: str, size: int) -> str | None:
+        if size > config.SEARCH_MAX_FILE_BYTES:
+            return None
+        try:
+            with open(path, "rb") as f:
+                raw = f.read()
+        except OSError:
+            return None
+        if b"\0" in raw[:8192]:
+            return None  # binary
+        return raw.decode("utf-8", errors="replace")
+
+    def _remove(self, rel: str):
+        self._oversized.discard(rel)
+        doc = self._docs.pop(rel, None)
+        if not doc:
+            return
+        for gram in doc[2]:
+            posting = self._postings.get(gram)
+            if posting is not None:
+                posting.discard(rel)
+                if not posting:
+                    del self._postings[gram]
+
+    def _add(self, rel: str, stamp: tuple, grams: frozenset):
+        self._docs[rel] = (*stamp, grams)
+        for gram in grams:
+            self._postings.setdefault(gram, set()).add(rel)
+
+    def refresh(self) -> int:
+        """Sinkronkan index dengan disk; kembalikan jumlah file yang diindeks ulang."""
+        with self._lock:
+            seen = set()
+            changed = 0
+            for rel, entry, is_dir, _ in walk_entries(
+                self.root, ignore=IgnoreRules(self.root)
+            ):
+                if is_dir:
+                    continue
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue
+                seen.add(rel)
+                stamp = (st.st_mtime_ns, st.st_size)
+                doc = self._docs.get(rel)
+                if doc and doc[:2] == stamp:
+                    continue
+
+                self._remove(rel)
+                if st.st_size > config.SEARCH_MAX_FILE_BYTES:
+                    self._oversized.add(rel)
+                text = self._read_text(entry.path, st.st_size)
+                # File biner / terlalu besar tetap dicatat (tanpa trigram)
+                # supaya tidak dibaca ulang selama tidak berubah
+                self._add(rel, stamp, frozenset(trigrams(text)) if text else frozenset())
+                changed += 1
+
+            for rel in [r for r in self._docs if r not in seen]:
+                self._remove(rel)
+
+            if changed:
+                log.debug("Search index '{}': {} file diindeks ulang", self.root, changed)
+            return changed
+
+    def candidates(self, segments: list[str] | None, prefix: str = "") -> list[str]:
+        """File yang memuat semua trigram dari `segments` (urut path)."""
+        with self._lock:
+            if segments:
+                grams = set()
+                for segment in segments:
+                    grams |= trigrams(segment)
+                postings = sorted(
+                    (self._postings.get(g, set()) for g in grams), key=len
+                )
+                result = set(postings[0]).intersection(*postings[1:])
+            else:
+                result = {rel for rel, doc in self._docs.items() if doc[2]}
+        return sorted(rel for rel in result if rel.startswith(prefix))
+
+
+    def oversized(self, prefix: str = "") -> list[str]:
+        """File di bawah `prefix` yang terlalu besar untuk diindeks / dicari."""
+        with self._lock:
+            return sorted(rel for rel in self._oversized if rel.startswith(prefix))
+
+
+_indexes: dict[str, TrigramIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_search_index(root: str) -> tuple[TrigramIndex, str]:
+    """
+    Index untuk `root`. Jika root berada di dalam index yang sudah ada,
+    index itu dipakai ulang dengan prefix relpath sebagai filter.
+    """
+    root = os.path.abspath(root)
+    with _indexes_lock:
+        for base, index in _indexes.items():
+            if root == base:
+                return index, ""
+            if root.startswith(base + os.sep):
+                rel = os.path.relpath(root, base).replace(os.sep, "/")
+                return index, f"{rel}/"
+        index = _indexes[root] = TrigramIndex(root)
+        return index, ""
@@ -0,0 +1,158 @@
+# app/utils/files_manager/size_index.py
+
+import os
+import threading
+import time
+from app.config import config
+
+
+class _Node:
+    __slots__ = ("mtime_ns", "files", "children", "total", "checked")
+
+    def __init__(self, mtime_ns: int, files: dict, children: tuple):
+        self.mtime_ns = mtime_ns
+        self.files = files
+        self.children = children
+        self.total = None
+        self.checked = 0.0
+
+
+class DirSizeIndex:
+    """
+    Cache ukuran direktori per node: (mtime dir, ukuran tiap file langsung,
+    daftar subdirektori, total subtree).
+
+    - Total subtree di-cache selama SIZE_INDEX_TTL detik: query berulang
+      tidak melakukan stat sama sekali.
+    - Setelah TTL lewat, hanya direktori yang di-stat: direktori yang
+      mtime-nya berubah (entry ditambah / dihapus / di-rename) dipindai ulang
+      secara dangkal, subtree lain memakai angka cache.
+    - Tulis di tempat tidak mengubah mtime direktori. Penulis di dalam app
+      (FileManager, index FAISS / BM25 / .idx, blob, spill, arsip summary)
+      memanggil `touch()`, yang langsung memperbarui ukuran file dan total
+      leluhurnya. Untuk tulis dari luar proses, SIZE_INDEX_RESTAT_FILES=1
+      membuat revalidasi juga men-stat ulang file di direktori yang tidak
+      berubah (O(file), opt-in).
+    """
+
+    def __init__(self):
+        self._nodes: dict[str, _Node] = {}
+        self._lock = threading.Lock()
+
+    def _scan(self, dirpath: str, mtime_ns: int) -> _Node:
+        files = {}
+        children = []
+        try:
+            with os.scandir(dirpath) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            children.append(entry.path)
+                        elif entry.is_file():
+                            files[entry.name] = entry.stat().st_size
+                    except OSError:
+                        pass
+        except OSError:
+            pass
+        node = _Node(mtime_ns, files, tuple(children))
+        self._nodes[dirpath] = node
+        return node
+
+    def _refresh(self, dirpath: str, node: _Node | None) -> _Node | None:
+        """Validasi node terhadap mtime direktori; None jika sudah hilang."""
+        try:
+            mtime_ns = os.stat(dirpath).st_mtime_ns
+        except OSError:
+            self._nodes.pop(dirpath, None)
+            return None
+
+        if node is None or node.mtime_ns != mtime_ns:
+            return self._scan(dirpath, mtime_ns)
+
+        if config.SIZE_INDEX_RESTAT_FILES:
+            for name in node.files:
+                try:
+                    node.files[name] = os.stat(os.path.join(dirpath, name)).st_size
+                except OSError:
+                    return self._scan(dirpath, mtime_ns)
+        return node
+
+    def _total(self, dirpath: str, now: float) -> int:
+        node = self._nodes.get(dirpath)
+        if node is not None and node.total is not None:
+            if now - node.checked < config.SIZE_INDEX_TTL:
+                return node.total
+
+        node = self._refresh(dirpath, node)
+        if node is None:
+            return 0
+
+        total = sum(node.files.values())
+        for child in node.children:
+            total += self._total(child, now)
+        node.total = total
+        node.checked = now
+        return total
+
+    def size(self, dirpath: str) -> int:
+        """Total byte semua file di bawah `dirpath` (symlink dir tidak diikuti)."""
+        with self._lock:
+            return self._total(os.path.abspath(dirpath), time.monotonic())
+
+    def _ancestors(self, dirpath: str):
+        while True:
+            node = self._nodes.get(dirpath)
+            if node is not None:
+                yield node
+            parent = os.path.dirname(dirpath)
+            if parent == dirpath:
+                return
+            dirpath = parent
+
+    def _invalidate(self, dirpath: str):
+        for node in self._ancestors(dirpath):
+            node.total = None
+
+    def touch(self, paths):
+        """
+        Perbarui index setelah operasi tulis pada `paths`.
+
+        File yang sudah ter-index: ukurannya di-stat ulang dan selisihnya
+        langsung ditambahkan ke total direktori induk & semua leluhur.
+        Perubahan struktur (file / direktori baru atau hilang) menandai
+        rantai leluhur untuk dihitung ulang; query berikutnya hanya
+        memindai direktori yang mtime-nya berubah.
+        """
+        with self._lock:
+            for path in paths:
+                if not path:
+                    continue
+                path = os.path.abspath(path)
+                parent = os.path.dirname(path)
+                node = self._nodes.get(parent)
+                name = os.path.basename(path)
+
+                if path in self._nodes or node is None or name not in node.files:
+                    if path in self._nodes:
+                        self._nodes[path].total = None
+                    self._invalidate(parent)
+                    continue
+
+                try:
+                    size = os.stat(path).st_size
+                except OSError:
+                    self._invalidate(parent)
+                    continue
+                delta = size - node.files[name]
+                node.files[name] = size
+                if delta:
+                    for ancestor in self._ancestors(parent):
+                        if ancestor.total is not None:
+                            ancestor.total += delta
+
+    def clear(self):
+        with self._lock:
+            self._nodes.clear()
+
+
+size_index = DirSizeIndex()
@@ -1,11 +1,23 @@
 # app/utils/logger.py
 
+import random
+import sys
 from loguru import logger
 from datetime import datetime
 import os
 from app.config import config
 
 
+def _sampling_filter(record) -> bool:
+    """
+    Sampling hanya untuk level DEBUG; INFO ke atas selalu lolos.
+    Dijalankan di thread pemanggil, jadi harus murah.
+    """
+    if record["level"].no > 10:
+        return True
+    return random.random() < config.LOG_DEBUG_SAMPLE_RATE
+
+
 def setup_logger():
     logger.remove()
 
@@ -19,19 +31,29 @@ def setup_logger():
         current_date = datetime.now().strftime("%d_%m_%Y")
         log_file = f"{log_dir}/system_log-{current_date}.log"
 
+        log_filter = _sampling_filter if config.LOG_DEBUG_SAMPLE_RATE < 1 else None
+
+        # enqueue=True → pesan dimasukkan ke queue dan ditulis oleh
+        # background thread, jadi I/O sink tidak memblokir request
         logger.add(
-            lambda msg: print(msg, end=""),
-            level="DEBUG",
+            sys.stdout,
+            level=config.LOG_LEVEL_CONSOLE,
             format="<green>{time:HH:mm:ss}</green> | <level>{level: <8}</level> | <level>{message}</level>",
             colorize=True,
+            enqueue=True,
+            filter=log_filter,
         )
 
         # Handler untuk file
         logger.add(
             log_file,
-            level="DEBUG",
+            level=config.LOG_LEVEL_FILE,
             format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {message}",
             rotation="00:00",
+            retention=config.LOG_RETENTION,
+            compression=config.LOG_COMPRESSION,
+            enqueue=True,
+            filter=log_filter,
         )
 
     return logger
@@ -0,0 +1,211 @@
+# app/utils/metrics.py
+
+import contextlib
+import functools
+import threading
+import time
+from app.config import config
+
+DEFAULT_BUCKETS = (
+    0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+
+STAGE_METRIC = "nano_stage_duration_seconds"
+STAGE_ERRORS = "nano_stage_errors_total"
+
+_NULL_TIMER = contextlib.nullcontext()
+
+
+class _Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+        self.sum += value
+        self.count += 1
+
+
+class _Timer:
+    __slots__ = ("registry", "stage", "labels", "start")
+
+    def __init__(self, registry, stage, labels):
+        self.registry = registry
+        self.stage = stage
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self.start
+        registry = self.registry
+        for hook in tuple(registry._stage_hooks):
+            hook(self.stage, elapsed, self.labels)
+        if not registry.enabled:
+            return False
+
+        labels = {"stage": self.stage, **self.labels}
+        registry.observe(STAGE_METRIC, elapsed, **labels)
+        if exc_type is not None:
+            registry.inc(STAGE_ERRORS, **labels)
+        return False
+
+
+class Metrics:
+    """
+    Registry histogram & counter sederhana dengan output format Prometheus.
+
+    Jika disabled, `timer()` mengembalikan nullcontext bersama dan
+    `observe()` / `inc()` langsung return, jadi overhead di hot path
+    hanya satu pengecekan atribut.
+
+    Contoh:
+        with metrics.timer("faiss_search"):
+            ...
+        metrics.inc("nano_tool_calls_total", tool="read_file")
+        metrics.set_gauge("nano_embed_queue_depth", 3)
+    """
+
+    def __init__(self, enabled: bool = True, buckets=DEFAULT_BUCKETS):
+        self.enabled = enabled
+        self.buckets = tuple(buckets)
+        self._histograms: dict[tuple, _Histogram] = {}
+        self._counters: dict[tuple, float] = {}
+        self._gauges: dict[tuple, float] = {}
+        self._listeners = []
+        self._stage_hooks = []
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(name: str, labels: dict) -> tuple:
+        return (name, tuple(sorted(labels.items())))
+
+    def timer(self, stage: str, **labels):
+        if not self.enabled and not self._stage_hooks:
+            return _NULL_TIMER
+        return _Timer(self, stage, labels)
+
+    def timed(self, stage: str, **labels):
+        """Decorator versi `timer()` untuk mengukur satu fungsi penuh."""
+
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled and not self._stage_hooks:
+                    return func(*args, **kwargs)
+                with _Timer(self, stage, labels):
+                    return func(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def observe(self, name: str, value: float, **labels):
+        if not self.enabled:
+            return
+        key = self._key(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = _Histogram(self.buckets)
+            histogram.observe(value)
+        for listener in self._listeners:
+            listener(name, value, labels)
+
+    def inc(self, name: str, value: float = 1, **labels):
+        if not self.enabled:
+            return
+        key = self._key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def set_gauge(self, name: str, value: float, **labels):
+        if not self.enabled:
+            return
+        key = self._key(name, labels)
+        with self._lock:
+            self._gauges[key] = value
+
+    def add_listener(self, listener):
+        """
+        Daftarkan callback `listener(name, value, labels)` untuk setiap
+        observasi histogram (dipakai benchmark / profiler).
+        """
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def add_stage_hook(self, hook):
+        """
+        Daftarkan callback `hook(stage, seconds, labels)` untuk setiap
+        timer()/timed() yang selesai, juga saat metrics dimatikan
+        (dipakai profiler per request).
+        """
+        self._stage_hooks.append(hook)
+
+    def remove_stage_hook(self, hook):
+        if hook in self._stage_hooks:
+            self._stage_hooks.remove(hook)
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+            self._gauges.clear()
+
+    def render_prometheus(self) -> str:
+        """Render seluruh metrik dalam Prometheus text exposition format."""
+        with self._lock:
+            histograms = sorted(self._histograms.items())
+            counters = sorted(self._counters.items())
+            gauges = sorted(self._gauges.items())
+
+        lines = []
+        seen = set()
+        for (name, labels), histogram in histograms:
+            if name not in seen:
+                lines.append(f"# TYPE {name} histogram")
+                seen.add(name)
+            for bound, count in zip(histogram.buckets, histogram.counts):
+                bucket_labels = labels + (("le", repr(bound)),)
+                lines.append(f"{name}_bucket{_format_labels(bucket_labels)} {count}")
+            inf_labels = labels + (("le", "+Inf"),)
+            lines.append(f"{name}_bucket{_format_labels(inf_labels)} {histogram.count}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {histogram.sum}")
+            lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+
+        for (name, labels), value in counters:
+            if name not in seen:
+                lines.append(f"# TYPE {name} counter")
+                seen.add(name)
+            lines.append(f"{name}{_format_labels(labels)} {value}")
+
+        for (name, labels), value in gauges:
+            if name not in seen:
+                lines.append(f"# TYPE {name} gauge")
+                seen.add(name)
+            lines.append(f"{name}{_format_labels(labels)} {value}")
+
+        return "\n".join(lines) + "\n"
+
+
+def _format_labels(labels: tuple) -> str:
+    if not labels:
+        return ""
+    parts = []
+    for key, value in labels:
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        parts.append(f'{key}="{value}"')
+    return "{" + ",".join(parts) + "}"
+
+
+metrics = Metrics(enabled=config.METRICS_ENABLED)
@@ -0,0 +1,180 @@
+# app/utils/profiler.py
+
+import contextlib
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from app.config import config
+from .logger import log
+from .metrics import metrics
+
+
+class SamplingProfiler:
+    """
+    Sampling profiler sederhana untuk satu thread.
+
+    Background thread mengambil stack thread target lewat
+    `sys._current_frames()` setiap `interval` detik, jadi kode yang
+    diprofil (termasuk tool handler dan file I/O) tidak perlu diubah.
+    """
+
+    def __init__(self, thread_id: int | None = None, interval: float | None = None):
+        self.thread_id = thread_id or threading.get_ident()
+        self.interval = interval or config.PROFILE_INTERVAL_MS / 1000
+        self.stacks = Counter()
+        self.samples = 0
+        self.wall_time = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+        self._start = None
+
+    @staticmethod
+    def _frame_label(frame) -> str:
+        code = frame.f_code
+        filename = os.path.relpath(code.co_filename) if os.path.isabs(code.co_filename) else code.co_filename
+        return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+    def _sample(self):
+        frame = sys._current_frames().get(self.thread_id)
+        if frame is None:
+            return
+        stack = []
+        while frame is not None:
+            stack.append(self._frame_label(frame))
+            frame = frame.f_back
+        stack.reverse()
+        self.stacks[tuple(stack)] += 1
+        self.samples += 1
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def start(self):
+        self._start = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="nano-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        self.wall_time = time.perf_counter() - self._start
+
+    def collapsed(self) -> str:
+        """Format folded stacks (flamegraph.pl / speedscope / inferno)."""
+        lines = [f"{';'.join(stack)} {count}" for stack, count in self.stacks.most_common()]
+        return "\n".join(lines) + "\n"
+
+    def speedscope(self, name: str) -> dict:
+        frames, frame_index, samples, weights = [], {}, [], []
+        for stack, count in self.stacks.items():
+            indices = []
+            for label in stack:
+                if label not in frame_index:
+                    frame_index[label] = len(frames)
+                    frames.append({"name": label})
+                indices.append(frame_index[label])
+            samples.append(indices)
+            weights.append(count * self.interval)
+
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": "nano-sampling-profiler",
+            "activeProfileIndex": 0,
+            "shared": {"frames": frames},
+            "profiles": [
+                {
+                    "type": "sampled",
+                    "name": name,
+                    "unit": "seconds",
+                    "startValue": 0,
+                    "endValue": sum(weights),
+                    "samples": samples,
+                    "weights": weights,
+                }
+            ],
+        }
+
+
+class ProfileResult:
+    def __init__(self, request_id: str):
+        self.request_id = request_id
+        self.path = None
+        self.stages = []
+
+
+def should_profile(force: bool = False) -> bool:
+    return force or (
+        config.PROFILE_SAMPLE_RATE > 0 and random.random() < config.PROFILE_SAMPLE_RATE
+    )
+
+
+@contextlib.contextmanager
+def profile_request(request_id: str, force: bool = False):
+    """
+    Profil satu request jika dipaksa (header / flag CLI) atau terpilih
+    oleh PROFILE_SAMPLE_RATE. Yield ProfileResult (atau None jika tidak
+    diprofil); `result.path` berisi file speedscope setelah blok selesai.
+
+    Hasil ditulis ke PROFILE_DIR:
+        <timestamp>_<request_id>.speedscope.json
+        <timestamp>_<request_id>.collapsed
+        <timestamp>_<request_id>.meta.json   (request id + stage timings)
+    """
+    if not should_profile(force):
+        yield None
+        return
+
+    result = ProfileResult(request_id)
+    thread_id = threading.get_ident()
+
+    # Stage timings lewat hook timer sendiri (tetap jalan walau METRICS
+    # dimatikan), hanya untuk thread yang diprofil
+    def on_stage(stage, seconds, labels):
+        if threading.get_ident() == thread_id:
+            result.stages.append({"stage": stage, "seconds": seconds, **labels})
+
+    metrics.add_stage_hook(on_stage)
+    profiler = SamplingProfiler(thread_id=thread_id)
+    profiler.start()
+    try:
+        yield result
+    finally:
+        profiler.stop()
+        metrics.remove_stage_hook(on_stage)
+        try:
+            result.path = _write_profile(profiler, result)
+            log.info("Profile request {} disimpan di {}", request_id, result.path)
+        except OSError as e:
+            log.error(f"Gagal menyimpan profile '{request_id}': {e}")
+
+
+def _write_profile(profiler: SamplingProfiler, result: ProfileResult) -> str:
+    os.makedirs(config.PROFILE_DIR, exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    base = os.path.join(config.PROFILE_DIR, f"{stamp}_{result.request_id}")
+
+    with open(f"{base}.speedscope.json", "w", encoding="utf-8") as f:
+        json.dump(profiler.speedscope(f"process_message {result.request_id}"), f)
+
+    with open(f"{base}.collapsed", "w", encoding="utf-8") as f:
+        f.write(profiler.collapsed())
+
+    meta = {
+        "request_id": result.request_id,
+        "wall_time_s": profiler.wall_time,
+        "samples": profiler.samples,
+        "interval_s": profiler.interval,
+        "stages": result.stages,
+    }
+    with open(f"{base}.meta.json", "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+
+    return f"{base}.speedscope.json"
@@ -1,19 +1,45 @@
 # app/utils/token_count.py
 
-import tiktoken
+from functools import lru_cache
 
 ENCODING_FALLBACK = "o200k_base"
 
 
+@lru_cache(maxsize=None)
+def _get_encoding(encoding_name: str):
+    """
+    Import tiktoken dan muat encoding saat pertama kali dibutuhkan.
+    Hasilnya di-cache supaya tabel BPE tidak dibangun ulang setiap panggilan.
+    """
+    import tiktoken
+
+    try:
+        return tiktoken.get_encoding(encoding_name)
+    except Exception:
+        return tiktoken.get_encoding(ENCODING_FALLBACK)
+
+
+@lru_cache(maxsize=None)
 def safe_encoding_for_model(model_name: str):
     """
     Gunakan encoding_for_model() bawaan tiktoken.
     Jika model belum didukung → fallback.
     """
+    import tiktoken
+
     try:
         return tiktoken.encoding_for_model(model_name)
     except Exception:
-        return tiktoken.get_encoding(ENCODING_FALLBACK)
+        return _get_encoding(ENCODING_FALLBACK)
+
+
+def truncate_to_tokens(text: str, max_tokens: int, encoding_name: str = None) -> str:
+    """Potong teks menjadi paling banyak `max_tokens` token pertama."""
+    enc = _get_encoding(encoding_name or ENCODING_FALLBACK)
+    tokens = enc.encode(text)
+    if len(tokens) <= max_tokens:
+        return text
+    return enc.decode(tokens[:max_tokens])
 
 
 def token_count(text: str, model_name: str = None, encoding_name: str = None) -> int:
@@ -27,12 +53,9 @@ def token_count(text: str, model_name: str = None, encoding_name: str = None) ->
 
     # Jika pakai nama encoding langsung
     if encoding_name:
-        try:
-            enc = tiktoken.get_encoding(encoding_name)
-        except Exception:
-            enc = tiktoken.get_encoding(ENCODING_FALLBACK)
+        enc = _get_encoding(encoding_name)
         return len(enc.encode(text))
 
     # Default fallback
-    enc = tiktoken.get_encoding(ENCODING_FALLBACK)
+    enc = _get_encoding(ENCODING_FALLBACK)
     return len(enc.encode(text))
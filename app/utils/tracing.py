@@ -0,0 +1,257 @@
+# app/utils/tracing.py
+
+import atexit
+import contextlib
+import contextvars
+import json
+import os
+import queue
+import secrets
+import threading
+import time
+from app.config import config
+from .files_manager.file_lock import FileLock
+
+_current_span = contextvars.ContextVar("nano_current_span", default=None)
+
+# OTLP/JSON menulis enum sebagai integer
+_SPAN_KIND_INTERNAL = 1
+_STATUS_CODES = {"STATUS_CODE_UNSET": 0, "STATUS_CODE_OK": 1, "STATUS_CODE_ERROR": 2}
+
+
+def _otlp_value(value) -> dict:
+    """Konversi nilai Python ke AnyValue OTLP/JSON."""
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class Span:
+    __slots__ = (
+        "name", "trace_id", "span_id", "parent_id",
+        "start_ns", "end_ns", "attributes", "status", "status_message",
+    )
+
+    is_recording = True
+
+    def __init__(self, name: str, parent: "Span | None", attributes: dict):
+        self.name = name
+        self.trace_id = parent.trace_id if parent else secrets.token_hex(16)
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent.span_id if parent else ""
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.attributes = {}
+        self.status = "STATUS_CODE_UNSET"
+        self.status_message = ""
+        self.set_attributes(attributes)
+
+    def set_attribute(self, key: str, value):
+        if value is not None:
+            self.attributes[key] = value
+
+    def set_attributes(self, attributes: dict):
+        for key, value in attributes.items():
+            self.set_attribute(key, value)
+
+    def record_error(self, exc: BaseException):
+        self.status = "STATUS_CODE_ERROR"
+        self.status_message = f"{type(exc).__name__}: {exc}"
+
+    def to_otlp(self) -> dict:
+        """Satu Span OTLP/JSON (field camelCase); dibungkus otlp_envelope()."""
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_id,
+            "name": self.name,
+            "kind": _SPAN_KIND_INTERNAL,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [
+                {"key": key, "value": _otlp_value(value)}
+                for key, value in self.attributes.items()
+            ],
+            "status": {
+                "code": _STATUS_CODES[self.status],
+                "message": self.status_message,
+            },
+        }
+
+
+def otlp_envelope(spans: list) -> dict:
+    """
+    Bungkus span ke ExportTraceServiceRequest OTLP/JSON (resourceSpans →
+    scopeSpans → spans), format yang dibaca file receiver OpenTelemetry.
+    """
+    return {
+        "resourceSpans": [
+            {
+                "resource": {
+                    "attributes": [
+                        {
+                            "key": "service.name",
+                            "value": _otlp_value(config.TRACE_SERVICE_NAME),
+                        }
+                    ]
+                },
+                "scopeSpans": [
+                    {
+                        "scope": {"name": "nano"},
+                        "spans": [span.to_otlp() for span in spans],
+                    }
+                ],
+            }
+        ]
+    }
+
+
+class _NullSpan:
+    """Span pengganti saat tracing mati: semua method no-op."""
+
+    is_recording = False
+
+    def set_attribute(self, key, value):
+        pass
+
+    def set_attributes(self, attributes):
+        pass
+
+    def record_error(self, exc):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+_NULL_SPAN_CONTEXT = contextlib.nullcontext(_NULL_SPAN)
+
+
+class JsonlSpanExporter:
+    """
+    Exporter lokal: satu ExportTraceServiceRequest OTLP/JSON per baris
+    (satu batch span) di file JSONL yang dirotasi berdasarkan ukuran.
+    Cek ukuran, rotasi, dan append dilakukan di bawah `<path>.lock`
+    (FileLock lintas worker) sehingga baris tidak terpotong / tersisip
+    saat worker lain merotasi file; flush atexit dan background thread
+    diserialisasi lewat lock yang sama. Penulisan dilakukan background thread
+    supaya request tidak menunggu disk.
+    """
+
+    def __init__(self, path: str, max_bytes: int, backups: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._queue = queue.SimpleQueue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._file_lock = FileLock(path + ".lock")
+
+    def export(self, span: Span):
+        self._ensure_thread()
+        self._queue.put(span)
+
+    def _ensure_thread(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(
+                        target=self._run, name="nano-trace-exporter", daemon=True
+                    )
+                    self._thread.start()
+                    atexit.register(self.flush)
+
+    def _rotate(self):
+        for i in range(self.backups - 1, 0, -1):
+            src = f"{self.path}.{i}"
+            if os.path.exists(src):
+                os.replace(src, f"{self.path}.{i + 1}")
+        if self.backups > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+
+    def _write(self, spans: list):
+        if not spans:
+            return
+        line = json.dumps(otlp_envelope(spans), ensure_ascii=False) + "\n"
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with self._file_lock:
+            if os.path.exists(self.path) and os.path.getsize(self.path) >= self.max_bytes:
+                self._rotate()
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+
+    def _drain(self, first=None) -> list:
+        spans = [first] if first is not None else []
+        while True:
+            try:
+                spans.append(self._queue.get_nowait())
+            except queue.Empty:
+                return spans
+
+    def _run(self):
+        while True:
+            spans = self._drain(self._queue.get())
+            try:
+                self._write([s for s in spans if s is not None])
+            except OSError:
+                pass
+
+    def flush(self):
+        spans = self._drain()
+        if spans:
+            try:
+                self._write(spans)
+            except OSError:
+                pass
+
+
+class Tracer:
+    """
+    Tracer ringan yang kompatibel dengan model span OpenTelemetry
+    (trace_id 128-bit, span_id 64-bit, parent lewat contextvar).
+
+    Contoh:
+        with tracer.span("tool.read_file", **{"tool.name": "read_file"}) as span:
+            result = ...
+            span.set_attribute("result.bytes", len(result))
+    """
+
+    def __init__(self, enabled: bool, exporter: JsonlSpanExporter):
+        self.enabled = enabled
+        self.exporter = exporter
+
+    def current_span(self):
+        return _current_span.get() or _NULL_SPAN
+
+    def span(self, name: str, **attributes):
+        if not self.enabled:
+            return _NULL_SPAN_CONTEXT
+        return self._span(name, attributes)
+
+    @contextlib.contextmanager
+    def _span(self, name: str, attributes: dict):
+        span = Span(name, _current_span.get(), attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.record_error(e)
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end_ns = time.time_ns()
+            if span.status == "STATUS_CODE_UNSET":
+                span.status = "STATUS_CODE_OK"
+            self.exporter.export(span)
+
+
+tracer = Tracer(
+    enabled=config.TRACING_ENABLED,
+    exporter=JsonlSpanExporter(
+        config.TRACE_FILE, config.TRACE_MAX_BYTES, config.TRACE_BACKUPS
+    ),
+)
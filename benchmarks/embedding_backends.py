@@ -0,0 +1,185 @@
+# benchmarks/embedding_backends.py
+"""
+Benchmark backend embedding: torch (sentence-transformers) vs ONNX Runtime
+(fp32 dan int8).
+
+Untuk setiap backend (proses terpisah supaya RSS bersih) diukur:
+- waktu load model + encode pertama,
+- latensi encode satu query (p50/p95/p99),
+- throughput encode batch (teks/detik),
+- RSS setelah benchmark.
+
+Vektor kalimat contoh dari setiap backend dibandingkan dengan torch;
+benchmark gagal (exit code 1) jika cosine minimum di bawah toleransi
+di app.rag.export_onnx.MIN_COSINE. Model ONNX harus diekspor dulu:
+    python -m app.rag.export_onnx --quantize
+
+Contoh:
+    python -m benchmarks.embedding_backends
+    python -m benchmarks.embedding_backends --backends torch,onnx-int8 --queries 500 --save
+"""
+
+import argparse
+import json
+import math
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.stats import compare_stages, env_info, rss_mb, save_json, summarize
+
+BENCH_DIR = Path(__file__).resolve().parent
+ROOT = BENCH_DIR.parent
+BASELINE_DIR = BENCH_DIR / "baselines"
+
+BACKENDS = {
+    "torch": {"backend": "torch", "quantized": False, "tolerance": None},
+    "onnx": {"backend": "onnx", "quantized": False, "tolerance": "fp32"},
+    "onnx-int8": {"backend": "onnx", "quantized": True, "tolerance": "int8"},
+}
+
+QUERIES = [
+    "Nano, cek lagi bug di orchestrator kemarin",
+    "apa isi file config.py sekarang?",
+    "ringkas pembahasan index FAISS kita",
+    "ada error baru di log FastAPI?",
+]
+
+
+def corpus(n: int) -> list[str]:
+    """Teks deterministik dengan panjang bervariasi (mirip chunk dokumen/memori)."""
+    words = "nano memori index vektor ringkasan file config agent tool query cache".split()
+    return [
+        " ".join(words[(i * 7 + j) % len(words)] for j in range(8 + (i * 13) % 120))
+        for i in range(n)
+    ]
+
+
+def run_single(args) -> dict:
+    from app.config import config
+
+    spec = BACKENDS[args.backend]
+    config.EMBED_BACKEND = spec["backend"]
+    config.EMBED_ONNX_QUANTIZED = spec["quantized"]
+    config.EMBED_BATCHING = False  # ukur encode langsung, tanpa jendela dispatcher
+
+    from app.rag.embedder import Embedder
+    from app.rag.export_onnx import SAMPLE_SENTENCES
+
+    rss_before = rss_mb()
+    embedder = Embedder()
+
+    start = time.perf_counter()
+    embedder.encode_text(QUERIES[0])
+    load_seconds = time.perf_counter() - start
+    if embedder.backend != spec["backend"]:
+        raise RuntimeError(f"backend '{args.backend}' tidak tersedia (fallback ke {embedder.backend})")
+
+    latencies = []
+    for i in range(args.queries):
+        start = time.perf_counter()
+        embedder.encode_text(QUERIES[i % len(QUERIES)])
+        latencies.append(time.perf_counter() - start)
+
+    texts = corpus(args.batch_texts)
+    start = time.perf_counter()
+    embedder.encode_text(texts, batch_size=args.batch_size)
+    batch_seconds = time.perf_counter() - start
+
+    return {
+        "backend": args.backend,
+        "env": env_info(),
+        "load_seconds": load_seconds,
+        "stages": {"encode.single": summarize(latencies)},
+        "throughput_texts_per_s": len(texts) / batch_seconds if batch_seconds else 0.0,
+        "rss_mb": {"before": rss_before, "after": rss_mb()},
+        "sample_vectors": embedder.encode_text(SAMPLE_SENTENCES).tolist(),
+    }
+
+
+def min_cosine(reference: list[list[float]], candidate: list[list[float]]) -> float:
+    def cosine(a, b):
+        dot = sum(x * y for x, y in zip(a, b))
+        return dot / (math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b)))
+
+    return min(cosine(a, b) for a, b in zip(reference, candidate))
+
+
+def print_report(report: dict):
+    single = report["stages"]["encode.single"]
+    rss = report["rss_mb"]["after"]
+    print(
+        f"{report['backend']:<10}"
+        f"{report['load_seconds']:>9.2f}s"
+        f"{single['p50'] * 1000:>10.2f}{single['p95'] * 1000:>10.2f}"
+        f"{report['throughput_texts_per_s']:>12.1f}"
+        f"{rss['current'] or 0:>10.1f}{rss['peak']:>10.1f}"
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Nano embedding backend benchmark")
+    parser.add_argument("--backends", default="torch,onnx,onnx-int8")
+    parser.add_argument("--backend", help=argparse.SUPPRESS)
+    parser.add_argument("--report-file", help=argparse.SUPPRESS)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--batch-texts", type=int, default=512)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--save", action="store_true", help="Overwrite baselines")
+    args = parser.parse_args(argv)
+
+    # Mode anak: satu backend, laporan ditulis ke file
+    if args.backend:
+        save_json(args.report_file, run_single(args))
+        return 0
+
+    from app.rag.export_onnx import MIN_COSINE
+
+    reports = {}
+    for name in args.backends.split(","):
+        if name not in BACKENDS:
+            parser.error(f"unknown backend: {name}")
+        with tempfile.TemporaryDirectory() as tmp:
+            report_file = Path(tmp) / "report.json"
+            cmd = [sys.executable, "-m", "benchmarks.embedding_backends", "--backend", name]
+            cmd += ["--report-file", str(report_file)]
+            cmd += [a for a in (argv or sys.argv[1:]) if not a.startswith("--save")]
+            proc = subprocess.run(cmd, cwd=ROOT, capture_output=True, text=True)
+            if proc.returncode != 0:
+                print(proc.stdout[-4000:], proc.stderr, file=sys.stderr)
+                return proc.returncode
+            with open(report_file, encoding="utf-8") as f:
+                reports[name] = json.load(f)
+
+    print(f"{'backend':<10}{'load':>10}{'p50 ms':>10}{'p95 ms':>10}{'texts/s':>12}{'rss MB':>10}{'peak MB':>10}")
+    for report in reports.values():
+        print_report(report)
+
+    status = 0
+    reference = reports.get("torch")
+    for name, report in reports.items():
+        tolerance = BACKENDS[name]["tolerance"]
+        if reference and tolerance:
+            cosine = min_cosine(reference["sample_vectors"], report["sample_vectors"])
+            passed = cosine >= MIN_COSINE[tolerance]
+            status |= 0 if passed else 1
+            print(f"{name}: min cosine vs torch = {cosine:.6f} (min {MIN_COSINE[tolerance]}) {'OK' if passed else 'FAIL'}")
+
+        report.pop("sample_vectors")
+        path = BASELINE_DIR / f"embedding-{name}.json"
+        if path.exists():
+            with open(path, encoding="utf-8") as f:
+                baseline = json.load(f)
+            print(f"{name} vs baseline:")
+            print("\n".join(compare_stages(report["stages"], baseline["stages"])))
+        if args.save:
+            save_json(path, report)
+            print(f"baseline saved: {path.relative_to(ROOT)}")
+
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,244 @@
+# benchmarks/fake_openai.py
+"""
+Stand-in lokal untuk OpenAI Responses API (POST /v1/responses).
+
+Mendukung respons biasa dan streaming (SSE), dengan profil latency
+(time-to-first-token) dan kecepatan token yang bisa diatur. Opsional
+memancing tool call sebelum menjawab, supaya loop tool di Agent ikut
+terukur.
+
+Contoh:
+    python -m benchmarks.fake_openai --profile realistic --port 8099
+    OPENAI_BASE_URL=http://127.0.0.1:8099/v1 OPENAI_API_KEY=x python cli.py --local
+"""
+
+import argparse
+import itertools
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PROFILES = {
+    # ttft: detik sampai token pertama, tokens_per_s: kecepatan output
+    "instant": {"ttft": 0.0, "tokens_per_s": 0},
+    "fast": {"ttft": 0.05, "tokens_per_s": 500},
+    "realistic": {"ttft": 0.8, "tokens_per_s": 80},
+    "slow": {"ttft": 2.5, "tokens_per_s": 30},
+}
+
+ANSWER_WORDS = (
+    "Baik Mas Arip, ini ringkasan hasilnya. Semua komponen berjalan normal "
+    "dan tidak ada error baru di log. Kalau mau, saya bisa cek file lain."
+).split()
+
+_ids = itertools.count(1)
+
+
+def _new_id(prefix: str) -> str:
+    return f"{prefix}_bench{next(_ids):08d}"
+
+
+class FakeResponsesServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address=("127.0.0.1", 0),
+        profile: str = "fast",
+        answer_tokens: int = 60,
+        tool_calls: int = 0,
+        tool_name: str = "list_directory",
+        tool_arguments: dict | None = None,
+    ):
+        super().__init__(address, _Handler)
+        self.profile = PROFILES[profile] if isinstance(profile, str) else profile
+        self.answer_tokens = answer_tokens
+        self.tool_calls = tool_calls
+        self.tool_name = tool_name
+        self.tool_arguments = tool_arguments or {"dirpath": "."}
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "FakeResponsesServer":
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+def _pending_tool_calls(server: FakeResponsesServer, items: list) -> bool:
+    """Hitung tool output sejak pesan user terakhir."""
+    outputs = 0
+    for item in reversed(items):
+        if isinstance(item, dict) and item.get("role") == "user":
+            break
+        if isinstance(item, dict) and item.get("type") == "function_call_output":
+            outputs += 1
+    return outputs < server.tool_calls
+
+
+def _usage(items: list, output_tokens: int) -> dict:
+    input_tokens = max(len(json.dumps(items, ensure_ascii=False)) // 4, 1)
+    return {
+        "input_tokens": input_tokens,
+        "input_tokens_details": {"cached_tokens": 0},
+        "output_tokens": output_tokens,
+        "output_tokens_details": {"reasoning_tokens": 0},
+        "total_tokens": input_tokens + output_tokens,
+    }
+
+
+def _response(model: str, output: list, usage: dict) -> dict:
+    return {
+        "id": _new_id("resp"),
+        "object": "response",
+        "created_at": int(time.time()),
+        "status": "completed",
+        "model": model,
+        "output": output,
+        "parallel_tool_calls": True,
+        "tool_choice": "auto",
+        "tools": [],
+        "usage": usage,
+    }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: FakeResponsesServer
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/responses"):
+            self.send_error(404)
+            return
+
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+        items = body.get("input") or []
+        if isinstance(items, str):
+            items = [{"role": "user", "content": items}]
+        model = body.get("model", "fake-model")
+
+        stream = bool(body.get("stream"))
+        if _pending_tool_calls(self.server, items):
+            self._tool_call(model, items, stream)
+        elif stream:
+            self._stream_answer(model, items)
+        else:
+            self._answer(model, items)
+
+    # --- respons ---
+
+    def _delay_first_token(self):
+        if self.server.profile["ttft"]:
+            time.sleep(self.server.profile["ttft"])
+
+    def _token_delay(self) -> float:
+        rate = self.server.profile["tokens_per_s"]
+        return 1.0 / rate if rate else 0.0
+
+    def _answer_words(self) -> list[str]:
+        words = itertools.islice(itertools.cycle(ANSWER_WORDS), self.server.answer_tokens)
+        return list(words)
+
+    def _message_item(self, text: str) -> dict:
+        return {
+            "type": "message",
+            "id": _new_id("msg"),
+            "status": "completed",
+            "role": "assistant",
+            "content": [{"type": "output_text", "text": text, "annotations": []}],
+        }
+
+    def _send_json(self, payload: dict):
+        data = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _tool_call(self, model: str, items: list, stream: bool):
+        self._delay_first_token()
+        item = {
+            "type": "function_call",
+            "id": _new_id("fc"),
+            "call_id": _new_id("call"),
+            "name": self.server.tool_name,
+            "arguments": json.dumps(self.server.tool_arguments),
+            "status": "completed",
+        }
+        response = _response(model, [item], _usage(items, 20))
+        if stream:
+            self._start_events()
+            self._event("response.completed", {"response": response})
+        else:
+            self._send_json(response)
+
+    def _answer(self, model: str, items: list):
+        self._delay_first_token()
+        words = self._answer_words()
+        time.sleep(self._token_delay() * len(words))
+        text = " ".join(words)
+        self._send_json(_response(model, [self._message_item(text)], _usage(items, len(words))))
+
+    def _stream_answer(self, model: str, items: list):
+        self._start_events()
+        self._delay_first_token()
+
+        words = self._answer_words()
+        item = self._message_item(" ".join(words))
+        delay = self._token_delay()
+        for i, word in enumerate(words):
+            delta = word if i == 0 else " " + word
+            self._event(
+                "response.output_text.delta",
+                {"item_id": item["id"], "output_index": 0, "content_index": 0, "delta": delta},
+            )
+            if delay:
+                time.sleep(delay)
+
+        response = _response(model, [item], _usage(items, len(words)))
+        self._event("response.completed", {"response": response})
+        self.wfile.flush()
+
+    # --- SSE ---
+
+    def _start_events(self):
+        self._sequence = itertools.count()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+
+    def _event(self, event_type: str, payload: dict):
+        payload = {"type": event_type, "sequence_number": next(self._sequence), **payload}
+        self.wfile.write(f"event: {event_type}\ndata: {json.dumps(payload)}\n\n".encode())
+        self.wfile.flush()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fake OpenAI Responses API server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="fast")
+    parser.add_argument("--answer-tokens", type=int, default=60)
+    parser.add_argument("--tool-calls", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    server = FakeResponsesServer(
+        (args.host, args.port),
+        profile=args.profile,
+        answer_tokens=args.answer_tokens,
+        tool_calls=args.tool_calls,
+    )
+    print(f"Fake Responses API on {server.base_url} (profile: {args.profile})")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
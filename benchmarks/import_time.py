@@ -0,0 +1,94 @@
+# benchmarks/import_time.py
+"""
+Import-time budget untuk cold start.
+
+Menjalankan import modul entry point di interpreter baru, lalu gagal
+(exit code 1) jika:
+- waktu import melebihi budget, atau
+- salah satu dependency berat ikut ter-import saat startup.
+
+Contoh:
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --budget 1.5 --module main
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Modul yang hanya boleh dimuat saat benar-benar dipakai
+HEAVY_MODULES = [
+    "sentence_transformers",
+    "torch",
+    "faiss",
+    "onnxruntime",
+    "openai",
+    "tiktoken",
+    "chardet",
+]
+
+# cli.py menjalankan loop input saat di-import, jadi yang diukur adalah
+# modul-modul yang di-import olehnya (dan main.py untuk uvicorn).
+DEFAULT_MODULES = ["app.core.orchestrator", "main"]
+DEFAULT_BUDGET_SECONDS = 2.0
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+heavy = [m for m in {heavy!r} if m in sys.modules]
+print(json.dumps({{"seconds": elapsed, "heavy": heavy}}))
+"""
+
+
+def measure(module: str, runs: int = 3) -> dict:
+    """Import `module` di proses baru sebanyak `runs` kali, ambil yang tercepat."""
+    best = None
+    for _ in range(runs):
+        code = PROBE.format(module=module, heavy=HEAVY_MODULES)
+        proc = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+        )
+        if proc.returncode != 0:
+            raise RuntimeError(f"Import '{module}' gagal:\n{proc.stderr}")
+
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+        if best is None or result["seconds"] < best["seconds"]:
+            best = result
+    return best
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--budget", type=float, default=DEFAULT_BUDGET_SECONDS)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--module", action="append", dest="modules")
+    args = parser.parse_args(argv)
+
+    modules = args.modules or DEFAULT_MODULES
+
+    failed = False
+    for module in modules:
+        result = measure(module, runs=args.runs)
+        status = "OK"
+        if result["seconds"] > args.budget:
+            status = "OVER BUDGET"
+            failed = True
+        if result["heavy"]:
+            status = f"HEAVY IMPORT {result['heavy']}"
+            failed = True
+        print(f"{module:<28} {result['seconds']:.3f}s  {status}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
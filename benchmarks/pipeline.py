@@ -0,0 +1,266 @@
+# benchmarks/pipeline.py
+"""
+Benchmark end-to-end turn pipeline.
+
+Untuk setiap ukuran riwayat (mis. 1k, 10k turn), benchmark ini:
+1. membuat riwayat sintetis (di-cache di benchmarks/.data/),
+2. menyalinnya ke direktori kerja sementara,
+3. menjalankan Orchestrator.process_message dan/atau endpoint FastAPI
+   terhadap fake Responses API lokal,
+4. melaporkan p50/p95/p99 per stage, throughput, dan RSS,
+5. menyimpan / membandingkan baseline JSON di benchmarks/baselines/.
+
+Setiap ukuran dijalankan di proses terpisah supaya RSS dan cache bersih.
+
+Contoh:
+    python -m benchmarks.pipeline --sizes 1k,10k --turns 20 --profile fast
+    python -m benchmarks.pipeline --sizes 10k --turns 64 --concurrency 8
+    python -m benchmarks.pipeline --sizes 10k --mode api --tool-calls 1 --save
+
+Ukuran di atas batas memory.json (±14k turn, lihat synthetic_history) ditolak.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from benchmarks.stats import StageRecorder, compare_stages, env_info, rss_mb, save_json, summarize
+from benchmarks.synthetic_history import ensure_history, parse_size
+
+BENCH_DIR = Path(__file__).resolve().parent
+ROOT = BENCH_DIR.parent
+DATA_CACHE = BENCH_DIR / ".data"
+BASELINE_DIR = BENCH_DIR / "baselines"
+
+PROMPTS = [
+    "Nano, cek lagi bug di orchestrator kemarin",
+    "apa isi file config.py sekarang?",
+    "ringkas pembahasan index FAISS kita",
+    "ada error baru di log FastAPI?",
+]
+
+
+def configure_app(data_root: Path, work_dir: Path, base_url: str):
+    """Arahkan semua path data app ke direktori kerja benchmark."""
+    os.environ["OPENAI_BASE_URL"] = base_url
+    os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+    from app.config import config
+
+    config.MEMORY_ROOT = str(data_root / "memory")
+    config.VECTOR_ROOT = str(data_root / "vector_store")
+    config.BLOB_ROOT = str(data_root / "blobs")
+    config.SPILL_ROOT = str(data_root / "spill")
+    config.FILES_ROOT = str(data_root / "files")
+    config.USAGE_LEDGER_FILE = str(work_dir / "usage.jsonl")
+
+    from app.services.usage_ledger import usage_ledger
+    from app.utils.metrics import metrics
+
+    usage_ledger.ledger_file = config.USAGE_LEDGER_FILE
+    metrics.enabled = True
+    metrics.reset()
+    return metrics
+
+
+def run_turns(turns: int, concurrency: int, turn) -> tuple[list[float], float]:
+    """
+    Jalankan `turn(i)` untuk setiap turn dengan `concurrency` thread.
+    Kembalikan (latensi per turn, wall-clock seluruh turn).
+    """
+
+    def timed(i: int) -> float:
+        t0 = time.perf_counter()
+        turn(i)
+        return time.perf_counter() - t0
+
+    start = time.perf_counter()
+    if concurrency <= 1:
+        durations = [timed(i) for i in range(turns)]
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            durations = list(pool.map(timed, range(turns)))
+    return durations, time.perf_counter() - start
+
+
+def run_orchestrator(turns: int, stream: bool, concurrency: int) -> dict:
+    from app.core.orchestrator import Orchestrator
+
+    start = time.perf_counter()
+    orchestrator = Orchestrator()
+    orchestrator.warmup()
+    warmup = time.perf_counter() - start
+
+    on_delta = (lambda text: None) if stream else None
+
+    def turn(i: int):
+        orchestrator.process_message(PROMPTS[i % len(PROMPTS)], "benchmark", on_delta)
+
+    durations, wall = run_turns(turns, concurrency, turn)
+    return {"warmup_s": warmup, "turn": summarize(durations), "wall_s": wall}
+
+
+def run_api(turns: int, concurrency: int) -> dict:
+    from fastapi.testclient import TestClient
+
+    start = time.perf_counter()
+    import main
+
+    client = TestClient(main.app)
+    if main.orchestrator:
+        main.orchestrator.warmup()
+    warmup = time.perf_counter() - start
+
+    chat, history = [], []
+
+    def turn(i: int):
+        t0 = time.perf_counter()
+        client.post(
+            "/api/chat",
+            json={"message": PROMPTS[i % len(PROMPTS)], "session_id": "benchmark"},
+        ).raise_for_status()
+        chat.append(time.perf_counter() - t0)
+
+        t0 = time.perf_counter()
+        client.get("/api/history").raise_for_status()
+        history.append(time.perf_counter() - t0)
+
+    _, wall = run_turns(turns, concurrency, turn)
+    return {
+        "warmup_s": warmup,
+        "chat": summarize(chat),
+        "history": summarize(history),
+        "wall_s": wall,
+    }
+
+
+def run_single(args) -> dict:
+    """Satu ukuran riwayat, dijalankan di dalam proses anak."""
+    from benchmarks.fake_openai import FakeResponsesServer
+
+    size = parse_size(args.size)
+    cached = ensure_history(DATA_CACHE, size)
+
+    work_dir = Path(tempfile.mkdtemp(prefix="nano-bench-"))
+    try:
+        data_root = work_dir / "data"
+        shutil.copytree(cached, data_root)
+
+        server = FakeResponsesServer(
+            profile=args.profile,
+            answer_tokens=args.answer_tokens,
+            tool_calls=args.tool_calls,
+        ).start()
+        metrics = configure_app(data_root, work_dir, server.base_url)
+
+        recorder = StageRecorder()
+        metrics.add_listener(recorder)
+        rss_before = rss_mb()
+
+        start = time.perf_counter()
+        if args.mode == "api":
+            result = run_api(args.turns, args.concurrency)
+        else:
+            result = run_orchestrator(args.turns, args.stream, args.concurrency)
+        elapsed = time.perf_counter() - start
+
+        return {
+            "size": size,
+            "mode": args.mode,
+            "profile": args.profile,
+            "turns": args.turns,
+            "tool_calls": args.tool_calls,
+            "stream": args.stream,
+            "concurrency": args.concurrency,
+            # Turn selesai per detik wall-clock (tanpa warmup), bukan 1 / rata-rata latensi
+            "throughput_turns_per_s": args.turns / result["wall_s"] if result["wall_s"] else 0,
+            "elapsed_s": elapsed,
+            "result": result,
+            "stages": recorder.report(),
+            "rss_mb": {"before": rss_before, "after": rss_mb()},
+            "env": env_info(),
+        }
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def baseline_path(mode: str, profile: str, size: int) -> Path:
+    return BASELINE_DIR / f"pipeline-{mode}-{profile}-{size}.json"
+
+
+def print_report(report: dict):
+    print(f"\n== size={report['size']} mode={report['mode']} profile={report['profile']} ==")
+    print(
+        f"throughput: {report['throughput_turns_per_s']:.2f} turns/s"
+        f" (concurrency={report['concurrency']})"
+    )
+    rss = report["rss_mb"]["after"]
+    print(f"rss: current={rss['current'] or 0:.1f}MB peak={rss['peak']:.1f}MB")
+    print(f"{'stage':<44}{'n':>6}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for stage, stats in report["stages"].items():
+        print(
+            f"{stage:<44}{stats['count']:>6}"
+            f"{stats['p50'] * 1000:>10.2f}{stats['p95'] * 1000:>10.2f}{stats['p99'] * 1000:>10.2f}"
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Nano turn pipeline benchmark")
+    parser.add_argument("--sizes", default="1k,10k")
+    parser.add_argument("--size", help=argparse.SUPPRESS)
+    parser.add_argument("--report-file", help=argparse.SUPPRESS)
+    parser.add_argument("--turns", type=int, default=20)
+    parser.add_argument("--mode", choices=["orchestrator", "api"], default="orchestrator")
+    parser.add_argument("--profile", default="fast")
+    parser.add_argument("--answer-tokens", type=int, default=60)
+    parser.add_argument("--tool-calls", type=int, default=0)
+    parser.add_argument("--stream", action="store_true")
+    parser.add_argument(
+        "--concurrency", type=int, default=1, help="Turn paralel (thread) selama pengukuran"
+    )
+    parser.add_argument("--save", action="store_true", help="Overwrite baselines")
+    args = parser.parse_args(argv)
+
+    # Mode anak: jalankan satu ukuran, tulis laporan ke file
+    # (stdout dipakai log & print reasoning dari Agent)
+    if args.size:
+        save_json(args.report_file, run_single(args))
+        return 0
+
+    for size_text in args.sizes.split(","):
+        with tempfile.TemporaryDirectory() as tmp:
+            report_file = Path(tmp) / "report.json"
+            cmd = [sys.executable, "-m", "benchmarks.pipeline", "--size", size_text]
+            cmd += ["--report-file", str(report_file)]
+            cmd += [a for a in (argv or sys.argv[1:]) if not a.startswith("--save")]
+            proc = subprocess.run(cmd, cwd=ROOT, capture_output=True, text=True)
+            if proc.returncode != 0:
+                print(proc.stdout[-4000:], proc.stderr, file=sys.stderr)
+                return proc.returncode
+
+            with open(report_file, encoding="utf-8") as f:
+                report = json.load(f)
+        print_report(report)
+
+        path = baseline_path(args.mode, args.profile, report["size"])
+        if path.exists():
+            with open(path, encoding="utf-8") as f:
+                baseline = json.load(f)
+            print("vs baseline:")
+            print("\n".join(compare_stages(report["stages"], baseline["stages"])))
+        if args.save:
+            save_json(path, report)
+            print(f"baseline saved: {path.relative_to(ROOT)}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,389 @@
+# benchmarks/replay.py
+"""
+Offline replay percakapan tersimpan lewat pipeline Orchestrator/Agent.
+
+Setiap record di memory.json (user, actions, assistant) diputar ulang
+secara berurutan ke data root sementara yang kosong, sehingga retrieval
+di turn ke-i hanya melihat turn sebelumnya — sama seperti aslinya.
+Model diganti ReplayModel deterministik yang mengulang tool call dan
+jawaban yang tercatat; tool dijalankan sebagai stub (output tercatat)
+atau sungguhan di dalam direktori sandbox.
+
+Laporan berisi latency per stage, token usage, dan hasil retrieval per
+turn, sehingga dua versi kode bisa dibandingkan pada traffic asli tanpa
+menyentuh API OpenAI.
+
+Contoh:
+    python -m benchmarks.replay --out benchmarks/baselines/replay-main.json
+    python -m benchmarks.replay --tools sandbox --sandbox-seed . --limit 50
+    python -m benchmarks.replay --compare old.json new.json
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+from benchmarks.fake_openai import PROFILES
+from benchmarks.stats import StageRecorder, env_info, rss_mb, save_json, summarize
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_SOURCE = ROOT / "app" / "data" / "memory" / "default" / "memory.json"
+PATH_ARGS = ("filepath", "dirpath", "src", "dst")
+# Source di context assembler (urutan section di prompt)
+CONTEXT_SOURCES = ("summary", "relevant", "documents", "recent")
+
+
+class ReplayModel:
+    """
+    Pengganti ModelOpenAI yang memutar ulang satu record memory.
+    Iterasi pertama mengembalikan semua tool call yang tercatat, iterasi
+    berikutnya mengembalikan jawaban asisten yang tercatat.
+    """
+
+    def __init__(self, model: str = "replay", profile: str = "instant"):
+        self.model = model
+        self.profile = PROFILES[profile]
+        self.record = None
+        self.step = 0
+
+    def begin_turn(self, record: dict):
+        self.record = record
+        self.step = 0
+
+    def _sleep(self, output_tokens: int):
+        delay = self.profile["ttft"]
+        if self.profile["tokens_per_s"]:
+            delay += output_tokens / self.profile["tokens_per_s"]
+        if delay:
+            time.sleep(delay)
+
+    def _function_calls(self) -> list:
+        return [
+            SimpleNamespace(
+                type="function_call",
+                call_id=action.get("call_id"),
+                name=action.get("name"),
+                arguments=action.get("arguments") or "{}",
+            )
+            for action in (self.record or {}).get("actions") or []
+        ]
+
+    def _answer(self, stage: str) -> str:
+        # Semua stage summarizer (summary, summary_rollup, ...) → ringkasan
+        # sintetis, bukan jawaban asisten yang tercatat
+        if stage.startswith("summary"):
+            return f"Ringkasan replay [{stage}]: {(self.record or {}).get('user', '')}"
+        return (self.record or {}).get("assistant") or ""
+
+    def _message(self, text: str):
+        content = [SimpleNamespace(type="output_text", text=text)]
+        return SimpleNamespace(type="message", role="assistant", content=content)
+
+    def call(
+        self,
+        messages: list[dict],
+        tools: list[dict] = None,
+        on_delta=None,
+        session_id: str = "default",
+        stage: str = "agent",
+        iteration: int | None = None,
+    ):
+        from app.services.usage_ledger import usage_ledger
+        from app.utils import metrics, token_count
+
+        with metrics.timer("llm_call", model=self.model):
+            calls = self._function_calls() if self.step == 0 else []
+            self.step += 1
+
+            if calls:
+                output, text = calls, ""
+            else:
+                text = self._answer(stage)
+                output = [self._message(text)]
+
+            output_tokens = token_count(text) + sum(token_count(c.arguments) for c in calls)
+            self._sleep(output_tokens)
+            if on_delta and text:
+                on_delta(text)
+
+        usage = {
+            "input_tokens": token_count(json.dumps(messages, ensure_ascii=False, default=str)),
+            "output_tokens": output_tokens,
+        }
+        usage_ledger.record(self.model, usage, session_id=session_id, stage=stage, iteration=iteration)
+        return SimpleNamespace(output=output, output_text=text, usage=usage)
+
+
+class StubSummaryModel(ReplayModel):
+    """
+    Summarizer replay: selalu langsung menjawab dengan ringkasan sintetis,
+    tanpa tool call, untuk stage apa pun (summary maupun roll-up).
+    """
+
+    def _function_calls(self) -> list:
+        return []
+
+    def _answer(self, stage: str) -> str:
+        return f"Ringkasan replay [{stage}]: {(self.record or {}).get('user', '')}"
+
+
+def make_stub_tools():
+    from app.tools.tools_calling import ToolsCalling
+
+    class StubTools(ToolsCalling):
+        """Tool yang mengembalikan output tercatat, tanpa menyentuh disk."""
+
+        def begin_turn(self, record: dict):
+            self._outputs = [a.get("output") for a in record.get("actions") or []]
+
+        def tools_calling(self, tool_name, arg):
+            output = self._outputs.pop(0) if self._outputs else None
+            if output is None:
+                return {"status": "error", "message": "No recorded output."}
+            try:
+                # Agent akan json.dumps ulang → string identik dengan aslinya
+                return json.loads(output)
+            except (TypeError, json.JSONDecodeError):
+                return output
+
+    return StubTools()
+
+
+def make_sandbox_tools(sandbox: Path):
+    from app.tools.tools_calling import ToolsCalling
+
+    class SandboxTools(ToolsCalling):
+        """Tool sungguhan, tapi semua path dipaksa berada di dalam sandbox."""
+
+        def begin_turn(self, record: dict):
+            pass
+
+        def _sandboxed(self, value: str) -> str:
+            parts = [p for p in Path(str(value)).parts if p not in ("..", "/", "\\")]
+            parts = [p for p in parts if not p.endswith(":\\") and not p.endswith(":")]
+            return str(sandbox.joinpath(*parts)) if parts else str(sandbox)
+
+        def tools_calling(self, tool_name, arg):
+            arg = dict(arg or {})
+            for key in PATH_ARGS:
+                if arg.get(key) is not None:
+                    arg[key] = self._sandboxed(arg[key])
+            return super().tools_calling(tool_name, arg)
+
+    return SandboxTools()
+
+
+def _preview(text: str) -> str:
+    """Baris pertama yang stabil antar run (tanpa baris "Time: ...")."""
+    for line in text.splitlines():
+        if line.strip() and not line.startswith("Time:"):
+            return line[:80]
+    return ""
+
+
+class ContextProbe:
+    """
+    Bungkus ContextAssembler.assemble untuk mencatat, per source, item yang
+    benar-benar masuk ke prompt (dense, BM25, dokumen, recent, summary)
+    setelah fusi, dedup, dan budget token.
+    """
+
+    def __init__(self, assembler):
+        from app.core.context_assembler import SECTIONS
+
+        titles = dict(SECTIONS)
+        self.hits: dict[str, list[str]] = {}
+        original = assembler.assemble
+
+        def assemble(items):
+            result = original(items)
+            sections = {
+                m["content"].split(":\n", 1)[0]: m["content"] for m in result["messages"]
+            }
+            for item in items:
+                content = sections.get(titles.get(item["source"]), "")
+                if item["text"] and item["text"] in content:
+                    self.hits.setdefault(item["source"], []).append(_preview(item["text"]))
+            return result
+
+        assembler.assemble = assemble
+
+    def take(self) -> dict[str, list[str]]:
+        hits, self.hits = self.hits, {}
+        return hits
+
+
+def load_records(source: Path, start: int, limit: int | None) -> list[dict]:
+    with open(source, encoding="utf-8") as f:
+        records = json.load(f)
+    records = [r for r in records if r.get("user")]
+    return records[start : start + limit if limit else None]
+
+
+def replay(args) -> dict:
+    records = load_records(Path(args.source), args.start, args.limit)
+
+    work_dir = Path(tempfile.mkdtemp(prefix="nano-replay-"))
+    try:
+        os.environ.setdefault("OPENAI_API_KEY", "replay")
+        from app.config import config
+        from app.memory.blob_store import get_blob_store
+
+        # Ref blob di record sumber dibaca dari blob root asli sebelum di-redirect
+        blobs = get_blob_store()
+        for record in records:
+            for action in record.get("actions") or []:
+                for field in ("arguments", "output"):
+                    if field in action:
+                        action[field] = blobs.hydrate(action[field])
+
+        config.MEMORY_ROOT = str(work_dir / "data" / "memory")
+        config.VECTOR_ROOT = str(work_dir / "data" / "vector_store")
+        config.BLOB_ROOT = str(work_dir / "data" / "blobs")
+        config.SPILL_ROOT = str(work_dir / "data" / "spill")
+        config.FILES_ROOT = str(work_dir / "data" / "files")
+
+        from app.services.usage_ledger import usage_ledger
+        from app.utils.metrics import metrics
+
+        usage_ledger.ledger_file = str(work_dir / "usage.jsonl")
+        metrics.enabled = True
+        metrics.reset()
+        recorder = StageRecorder()
+        metrics.add_listener(recorder)
+
+        if args.tools == "sandbox":
+            sandbox = work_dir / "sandbox"
+            if args.sandbox_seed:
+                shutil.copytree(
+                    args.sandbox_seed,
+                    sandbox,
+                    ignore=shutil.ignore_patterns(".git", "__pycache__", ".venv", "node_modules"),
+                )
+            sandbox.mkdir(parents=True, exist_ok=True)
+            tools = make_sandbox_tools(sandbox)
+        else:
+            tools = make_stub_tools()
+
+        from app.core.orchestrator import Orchestrator
+
+        model = ReplayModel(profile=args.profile)
+        summary_model = StubSummaryModel(model="replay-summary", profile=args.profile)
+        orchestrator = Orchestrator(model=model, tools_mgr=tools, summary_model=summary_model)
+        orchestrator.warmup()
+
+        probe = ContextProbe(orchestrator.assembler)
+
+        turns = []
+        for i, record in enumerate(records):
+            model.begin_turn(record)
+            summary_model.begin_turn(record)
+            tools.begin_turn(record)
+
+            t0 = time.perf_counter()
+            answer = orchestrator.process_message(record["user"], session_id="replay")
+            elapsed = time.perf_counter() - t0
+
+            turns.append(
+                {
+                    "index": args.start + i,
+                    "chat_id": record.get("chat_id"),
+                    "latency_s": elapsed,
+                    "actions": len(record.get("actions") or []),
+                    "answer_matches": answer == record.get("assistant"),
+                    "context_hits": probe.take(),
+                }
+            )
+
+        return {
+            "source": str(args.source),
+            "tools": args.tools,
+            "profile": args.profile,
+            "turns": len(turns),
+            "latency": summarize([t["latency_s"] for t in turns]),
+            "stages": recorder.report(),
+            "usage": usage_ledger.rollup("stage"),
+            "retrieval": {
+                f"{source}_hits_mean": _mean(
+                    len(t["context_hits"].get(source, [])) for t in turns
+                )
+                for source in CONTEXT_SOURCES
+            },
+            "per_turn": turns,
+            "rss_mb": rss_mb(),
+            "env": env_info(),
+        }
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def _mean(values) -> float:
+    values = list(values)
+    return sum(values) / len(values) if values else 0.0
+
+
+def _overlap(a: list, b: list) -> float:
+    a, b = set(a), set(b)
+    return len(a & b) / len(a | b) if a | b else 1.0
+
+
+def compare(old: dict, new: dict) -> list[str]:
+    lines = [
+        f"turns: {old['turns']} → {new['turns']}",
+        f"latency p50: {old['latency']['p50'] * 1000:.1f} → {new['latency']['p50'] * 1000:.1f} ms",
+        f"latency p95: {old['latency']['p95'] * 1000:.1f} → {new['latency']['p95'] * 1000:.1f} ms",
+    ]
+    for stage in sorted(set(old["usage"]) | set(new["usage"])):
+        before = old["usage"].get(stage, {}).get("input_tokens", 0)
+        after = new["usage"].get(stage, {}).get("input_tokens", 0)
+        lines.append(f"input tokens [{stage}]: {before} → {after}")
+
+    for source in CONTEXT_SOURCES:
+        pairs = zip(old["per_turn"], new["per_turn"])
+        overlap = _mean(
+            _overlap(a["context_hits"].get(source, []), b["context_hits"].get(source, []))
+            for a, b in pairs
+        )
+        lines.append(f"{source} context overlap per turn: {overlap:.2%}")
+    return lines
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay stored conversations offline")
+    parser.add_argument("--source", default=str(DEFAULT_SOURCE))
+    parser.add_argument("--start", type=int, default=0)
+    parser.add_argument("--limit", type=int)
+    parser.add_argument("--tools", choices=["stub", "sandbox"], default="stub")
+    parser.add_argument("--sandbox-seed", help="Directory copied into the sandbox")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="instant")
+    parser.add_argument("--out", help="Write the JSON report here")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"))
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        reports = []
+        for path in args.compare:
+            with open(path, encoding="utf-8") as f:
+                reports.append(json.load(f))
+        print("\n".join(compare(*reports)))
+        return 0
+
+    report = replay(args)
+    print(
+        f"replayed {report['turns']} turns: "
+        f"p50 {report['latency']['p50'] * 1000:.1f}ms, p95 {report['latency']['p95'] * 1000:.1f}ms"
+    )
+    if args.out:
+        save_json(args.out, report)
+        print(f"report saved: {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+# benchmarks/stats.py
+"""Helper statistik & pengukuran proses untuk semua benchmark."""
+
+import json
+import math
+import os
+import resource
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+from app.utils.metrics import STAGE_METRIC
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Nearest-rank percentile (pct dalam 0-100)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(math.ceil(pct / 100 * len(ordered)) - 1, 0)
+    return ordered[rank]
+
+
+def summarize(values: list[float]) -> dict:
+    return {
+        "count": len(values),
+        "mean": sum(values) / len(values) if values else 0.0,
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "p99": percentile(values, 99),
+        "max": max(values) if values else 0.0,
+    }
+
+
+def rss_mb() -> dict:
+    """RSS saat ini (Linux /proc) dan peak RSS proses, dalam MB."""
+    current = None
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    current = int(line.split()[1]) / 1024
+                    break
+    except OSError:
+        pass
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS melaporkan byte, Linux kilobyte
+    peak = peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    return {"current": current, "peak": peak}
+
+
+class StageRecorder:
+    """
+    Listener untuk `app.utils.metrics` yang menyimpan semua sampel mentah
+    per stage, supaya p50/p95/p99 bisa dihitung tanpa bucket histogram.
+    """
+
+    def __init__(self):
+        self.samples = defaultdict(list)
+
+    def __call__(self, name: str, value: float, labels: dict):
+        if name == STAGE_METRIC:
+            key = labels.get("stage", "unknown")
+            extra = [f"{k}={v}" for k, v in sorted(labels.items()) if k != "stage"]
+        else:
+            key = name
+            extra = [f"{k}={v}" for k, v in sorted(labels.items())]
+        if extra:
+            key = f"{key}[{','.join(extra)}]"
+        self.samples[key].append(value)
+
+    def report(self) -> dict:
+        return {key: summarize(values) for key, values in sorted(self.samples.items())}
+
+
+def save_json(path: str | Path, data: dict):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def compare_stages(current: dict, baseline: dict, fields=("p50", "p95")) -> list[str]:
+    """Baris perbandingan stage terhadap baseline (delta persen)."""
+    lines = []
+    for stage, stats in current.items():
+        base = baseline.get(stage)
+        if not base:
+            lines.append(f"  {stage:<40} (baru)")
+            continue
+        parts = []
+        for field in fields:
+            old, new = base.get(field, 0), stats.get(field, 0)
+            delta = ((new - old) / old * 100) if old else 0.0
+            parts.append(f"{field} {old * 1000:8.2f}→{new * 1000:8.2f}ms ({delta:+.0f}%)")
+        lines.append(f"  {stage:<40} " + "  ".join(parts))
+    return lines
+
+
+def env_info() -> dict:
+    return {
+        "python": sys.version.split()[0],
+        "platform": sys.platform,
+        "cpu_count": os.cpu_count(),
+    }
@@ -0,0 +1,191 @@
+# benchmarks/synthetic_history.py
+"""
+Generator riwayat sintetis dengan layout yang sama seperti app/data/:
+
+    <root>/memory/default/memory.json
+    <root>/memory/default/summary.json
+    <root>/memory/default/count_summary.json
+    <root>/vector_store/memory/default/memory.index(.meta.json)
+    <root>/vector_store/memory/default/summary.index(.meta.json)
+
+Vektor dibuat acak (ternormalisasi, dim 384) tanpa menjalankan model
+embedding; ukuran & bentuk index tetap identik.
+
+Batas ukuran: memory.json ditulis lewat FileManager.append_json, yang
+menolak file di atas MEMORY_MAX_BYTES (default max_size_mb=10). Satu record
+sintetis ±700 B, jadi riwayat di atas ±14k turn tidak bisa di-append lagi:
+setiap save_memory gagal sementara index FAISS terus bertambah. Ukuran
+seperti itu ditolak (ValueError) alih-alih menghasilkan angka dari
+pipeline yang tidak menyimpan apa pun.
+
+Contoh:
+    python -m benchmarks.synthetic_history --turns 10k --out benchmarks/.data/10000
+"""
+
+import argparse
+import json
+import random
+from pathlib import Path
+
+DIM = 384
+CHUNK = 100_000
+
+# Mengikuti default append_json(max_size_mb=10); sisakan ruang untuk turn
+# yang di-append selama benchmark
+MEMORY_MAX_BYTES = 10 * 1024 * 1024
+APPEND_HEADROOM_BYTES = 1024 * 1024
+
+TOPICS = [
+    "bug di orchestrator", "refactor vector store", "log error FastAPI",
+    "konfigurasi gunicorn", "ringkasan memory", "test tiktoken",
+    "schema tools", "tampilan UI chat", "index FAISS", "file config.py",
+]
+FILES = [
+    "app/core/orchestrator.py", "app/rag/vector_store.py", "main.py",
+    "app/utils/logger.py", "app/config/config.py", "app/ui/static/script.js",
+]
+
+
+def parse_size(text: str) -> int:
+    text = str(text).strip().lower()
+    factor = {"k": 1_000, "m": 1_000_000}.get(text[-1], 1)
+    return int(float(text.rstrip("km")) * factor)
+
+
+def _record(i: int, rng: random.Random, action_rate: float) -> dict:
+    topic = rng.choice(TOPICS)
+    path = rng.choice(FILES)
+    actions = []
+    if rng.random() < action_rate:
+        output = json.dumps(
+            {
+                "status": "success",
+                "message": "Tool executed successfully.",
+                "data": f"# {path}\n" + ("x = 1\n" * rng.randint(20, 200)),
+            },
+            ensure_ascii=False,
+        )
+        actions.append(
+            {
+                "type": "function_call",
+                "call_id": f"call_synthetic{i:08d}",
+                "name": "read_file",
+                "arguments": json.dumps({"filepath": path}),
+                "output": output,
+            }
+        )
+
+    return {
+        "chat_id": f"msg_synthetic{i:08d}",
+        "timestamp": "Thursday, 27-11-2025 20:16:22 WITA",
+        "user": f"Nano, tolong cek {topic} di {path} (turn {i})",
+        "actions": actions,
+        "assistant": f"Sudah saya cek {topic} di {path}. " * rng.randint(1, 6),
+    }
+
+
+def _summary(i: int) -> dict:
+    return {
+        "summary_id": f"smr_synthetic{i:08d}",
+        "summary": f"Mas Arip dan Nano membahas {TOPICS[i % len(TOPICS)]} (ringkasan {i}).",
+        "date": "Thursday, 27-11-2025 20:16:22 WITA",
+    }
+
+
+def _write_json_list(path: Path, records, max_bytes: int | None = None):
+    """
+    Tulis list JSON secara streaming, format identik dengan json.dump(indent=4).
+    max_bytes → ValueError begitu file melewati batas (file dihapus).
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("[")
+        first = True
+        for count, record in enumerate(records):
+            f.write("\n" if first else ",\n")
+            first = False
+            block = json.dumps(record, ensure_ascii=False, indent=4)
+            f.write("\n".join("    " + line for line in block.splitlines()))
+            if max_bytes is not None and f.tell() > max_bytes:
+                f.close()
+                path.unlink()
+                raise ValueError(
+                    f"{path.name} melewati {max_bytes} byte setelah {count + 1} record: "
+                    "append_json (max_size_mb=10) akan menolak setiap save_memory."
+                )
+        f.write("\n]" if not first else "]")
+
+
+def _write_index(path: Path, count: int, seed: int):
+    import faiss
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    index = faiss.IndexFlatIP(DIM)
+    for start in range(0, count, CHUNK):
+        n = min(CHUNK, count - start)
+        vectors = rng.standard_normal((n, DIM), dtype=np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        index.add(vectors)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    faiss.write_index(index, str(path))
+
+
+def generate_history(
+    root: str | Path,
+    turns: int,
+    summary_every: int = 2,
+    action_rate: float = 0.2,
+    seed: int = 0,
+) -> Path:
+    root = Path(root)
+    memory_dir = root / "memory" / "default"
+    vector_dir = root / "vector_store" / "memory" / "default"
+
+    def records():
+        rng = random.Random(seed)
+        return (_record(i, rng, action_rate) for i in range(turns))
+
+    summaries = max(turns // max(summary_every, 1), 0)
+
+    _write_json_list(
+        memory_dir / "memory.json",
+        records(),
+        max_bytes=MEMORY_MAX_BYTES - APPEND_HEADROOM_BYTES,
+    )
+    _write_json_list(memory_dir / "summary.json", (_summary(i) for i in range(summaries)))
+    _write_json_list(vector_dir / "memory.index.meta.json", records())
+    _write_json_list(vector_dir / "summary.index.meta.json", (_summary(i) for i in range(summaries)))
+    with open(memory_dir / "count_summary.json", "w", encoding="utf-8") as f:
+        json.dump({"count": 0}, f, indent=4)
+
+    _write_index(vector_dir / "memory.index", turns, seed)
+    _write_index(vector_dir / "summary.index", summaries, seed + 1)
+
+    (root / ".complete").write_text(str(turns))
+    return root
+
+
+def ensure_history(cache_dir: str | Path, turns: int, **kwargs) -> Path:
+    """Generate sekali, lalu pakai ulang dari cache."""
+    root = Path(cache_dir) / str(turns)
+    if not (root / ".complete").exists():
+        generate_history(root, turns, **kwargs)
+    return root
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate synthetic Nano history")
+    parser.add_argument("--turns", default="1k")
+    parser.add_argument("--out", required=True)
+    parser.add_argument("--action-rate", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    turns = parse_size(args.turns)
+    generate_history(args.out, turns, action_rate=args.action_rate, seed=args.seed)
+    print(f"Generated {turns} turns in {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,101 @@
 # cli.py
+#
+# Pemakaian:
+#   python cli.py --daemon   → jalankan daemon (Orchestrator tetap hangat)
+#   python cli.py            → client tipis ke daemon (fallback in-process)
+#   python cli.py --local    → paksa mode in-process
 
-from app.core.orchestrator import Orchestrator
-from app.utils.logger import log
+import argparse
+import sys
+from app.services.daemon_client import DaemonClient
 
-log.info("APP Start...")
-engine = Orchestrator()
+BANNER = "=========================== Nano V1 ==========================="
+USER_LABEL = "Mas Arip: "
 
-while True:
-    print("=========================== Nano V1 ===========================")
 
-    user_input = input("Mas Arip: ")
+def run_daemon():
+    from app.services.daemon import NanoDaemon
 
-    if user_input.lower() in ["exit", "quit"]:
-        log.info("APP Shutdown...")
-        break
+    NanoDaemon().serve_forever()
 
-    response = engine.process(user_input)
-    print(f"\nNano: {response}\n")
+
+def run_client(client: DaemonClient, profile: bool = False):
+    while True:
+        print(BANNER)
+        user_input = input(USER_LABEL)
+
+        if user_input.lower() in ["exit", "quit"]:
+            break
+
+        print("\nNano: ", end="", flush=True)
+        streamed = False
+        for event in client.chat(user_input, profile=profile):
+            if event["type"] == "delta":
+                streamed = True
+                print(event["text"], end="", flush=True)
+            elif event["type"] == "done":
+                if not streamed:
+                    print(event["response"], end="")
+                if event.get("profile"):
+                    print(f"\n[Profile]: {event['profile']}", end="")
+            elif event["type"] == "error":
+                print(f"[Daemon Error]: {event['message']}", end="")
+        print("\n")
+
+
+def run_local(profile: bool = False):
+    import threading
+    from app.core.orchestrator import Orchestrator
+    from app.utils import generate_id, log
+    from app.utils.profiler import profile_request
+
+    log.info("APP Start...")
+    engine = Orchestrator()
+
+    # Prompt langsung tampil; model embedding dimuat selagi user mengetik
+    threading.Thread(target=engine.warmup, daemon=True).start()
+
+    while True:
+        print(BANNER)
+
+        user_input = input(USER_LABEL)
+
+        if user_input.lower() in ["exit", "quit"]:
+            log.info("APP Shutdown...")
+            break
+
+        with profile_request(generate_id("req"), force=profile) as result:
+            response = engine.process_message(user_input)
+        print(f"\nNano: {response}\n")
+        if result and result.path:
+            print(f"[Profile]: {result.path}\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Nano CLI")
+    parser.add_argument("--daemon", action="store_true", help="Run the warm daemon")
+    parser.add_argument("--local", action="store_true", help="Run in-process")
+    parser.add_argument(
+        "--profile", action="store_true", help="Profile every turn (speedscope)"
+    )
+    args = parser.parse_args(argv)
+
+    if args.daemon:
+        run_daemon()
+        return
+
+    client = DaemonClient()
+    if not args.local and client.is_available():
+        run_client(client, profile=args.profile)
+    else:
+        if not args.local:
+            print("Nano daemon tidak berjalan, memakai mode in-process.")
+            print("Jalankan `python cli.py --daemon` untuk start yang instan.\n")
+        run_local(profile=args.profile)
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except (KeyboardInterrupt, EOFError):
+        sys.exit(0)
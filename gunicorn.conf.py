@@ -0,0 +1,42 @@
+# gunicorn.conf.py
+#
+# Mode multi-worker dengan preload-and-fork:
+#   gunicorn -c gunicorn.conf.py main:app
+#
+# Master meng-import main.py (Orchestrator + bobot MiniLM + index FAISS)
+# satu kali, lalu fork worker. Halaman memori model dibagi copy-on-write,
+# penulisan memory diserialisasi lewat FileLock di app/data/memory/.
+#
+# Alternatif tanpa model di worker sama sekali (satu thread pool untuk semua):
+#   python -m app.rag.embed_server &
+#   NANO_EMBED_REMOTE=1 gunicorn -c gunicorn.conf.py main:app
+
+import gc
+import multiprocessing
+import os
+import sys
+
+# Harus diset sebelum main.py di-import oleh master
+os.environ.setdefault("NANO_PRELOAD", "1")
+
+bind = os.getenv("NANO_BIND", "127.0.0.1:8000")
+workers = int(os.getenv("NANO_WORKERS", multiprocessing.cpu_count()))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+timeout = int(os.getenv("NANO_WORKER_TIMEOUT", "300"))
+
+
+def when_ready(server):
+    # Pindahkan objek yang sudah dimuat master ke generasi permanen,
+    # supaya GC di worker tidak menyentuh (dan menyalin) halaman bersama
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    from app.config import config
+
+    # Batasi thread torch per worker supaya N worker tidak berebut core
+    if "torch" in sys.modules:
+        import torch
+
+        torch.set_num_threads(config.WORKER_TORCH_THREADS)
@@ -1,15 +1,27 @@
 # main.py
 
-from fastapi import FastAPI, Request
-from fastapi.responses import HTMLResponse
+import json
+import threading
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import (
+    HTMLResponse,
+    JSONResponse,
+    PlainTextResponse,
+    StreamingResponse,
+)
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from pydantic import BaseModel
+from app.config import config
 from app.memory.base_memory import BaseMemory
 
 # Impor komponen utama Anda
 from app.core.orchestrator import Orchestrator
 from app.utils.logger import logger
+from app.utils.metrics import metrics
+from app.utils.profiler import profile_request
+from app.utils.id_generator import generate_id
+from app.services.usage_ledger import usage_ledger
 
 # Inisialisasi FastAPI
 app = FastAPI(title="Nano AI Agent")
@@ -30,10 +42,31 @@ except Exception as e:
 
 memory_loader = BaseMemory()
 
+# Ukuran halaman /api/history
+HISTORY_PAGE_LIMIT = 20
+HISTORY_PAGE_MAX = 200
+
+# Mode multi-worker (gunicorn --preload): muat model & index di master
+# sebelum fork supaya halamannya dibagi copy-on-write antar worker.
+if orchestrator and config.PRELOAD_MODELS:
+    orchestrator.warmup()
+
+
+@app.on_event("startup")
+def warmup_orchestrator():
+    """Muat model di background supaya startup (dan --reload) tetap cepat."""
+    if orchestrator and not config.PRELOAD_MODELS:
+        threading.Thread(target=orchestrator.warmup, daemon=True).start()
+    if orchestrator:
+        # Per worker (setelah fork): sync index dokumen di background
+        orchestrator.start_background_tasks()
+
 
 # Pydantic model untuk respon riwayat chat
 class ChatHistoryResponse(BaseModel):
     history: list[dict]
+    next_before: int | None = None
+    total: int = 0
 
 
 # --- Skema Data untuk Input Chat ---
@@ -42,39 +75,99 @@ class ChatRequest(BaseModel):
     session_id: str = "default"  # Menggunakan ID default untuk memuat memori default
 
 
+def format_history_record(record: dict) -> list[dict]:
+    """
+    Konversi satu record memory ke format front-end.
+    Format memory: dict(user, assistant, actions)
+    Format front-end: list[dict(role, content)]
+    """
+    messages = []
+    # 1. Pesan Pengguna
+    if record.get("user"):
+        messages.append({"role": "user", "content": record["user"]})
+
+    # 2. Pesan Asisten
+    # TODO: Jika Anda ingin menampilkan tool/action output di UI,
+    # Anda harus memformatnya di sini sebelum pesan asisten.
+    if record.get("assistant"):
+        messages.append({"role": "model", "content": record["assistant"]})
+    return messages
+
+
 # --- ENDPOINTS UI (HTML) ---
 
 
 @app.get("/api/history")
-def get_chat_history():
-    """Mengambil seluruh riwayat chat yang tersimpan."""
+def get_chat_history(
+    request: Request, before: int | None = None, limit: int = HISTORY_PAGE_LIMIT
+):
+    """
+    Riwayat chat per halaman, terbaru dulu (cursor-based).
+
+    - `before`: cursor dari `next_before` halaman sebelumnya (kosong = terbaru)
+    - `limit`: jumlah record per halaman
+    `history` berisi pesan urut kronologis di dalam halaman tersebut.
+    """
     try:
-        raw_history = memory_loader.load_all_memory()
+        store = memory_loader.store
+        limit = max(1, min(limit, HISTORY_PAGE_MAX))
+        total = store.count()
+        end = total if before is None else max(min(before, total), 0)
+        start = max(end - limit, 0)
 
-        # Konversi format memory ke format yang dapat digunakan di front-end
-        # Format memory: list[dict(user, assistant, actions)]
-        # Format front-end: list[dict(role, content)]
+        # Record bersifat append-only: rentang byte yang sama = isi yang sama
+        span = store.span(start, end) if start < end else (0, 0)
+        etag = f'W/"{start}-{end}-{span[0]}-{span[1]}"'
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers={"ETag": etag})
 
+        page = store.page(before=end, limit=limit)
         formatted_history = []
-        for record in raw_history:
-            # 1. Pesan Pengguna
-            if record.get("user"):
-                formatted_history.append({"role": "user", "content": record["user"]})
-
-            # 2. Pesan Asisten (termasuk output tool/actions jika ada)
-            assistant_response = record.get("assistant")
-            if assistant_response:
-                # TODO: Jika Anda ingin menampilkan tool/action output di UI,
-                # Anda harus memformatnya di sini sebelum pesan asisten.
-                formatted_history.append(
-                    {"role": "model", "content": assistant_response}
-                )
-
-        return {"history": formatted_history}
+        for record in reversed(page["records"]):
+            formatted_history.extend(format_history_record(record))
+
+        response = ChatHistoryResponse(
+            history=formatted_history,
+            next_before=page["next_before"],
+            total=page["total"],
+        )
+        return JSONResponse(response.model_dump(), headers={"ETag": etag})
 
     except Exception as e:
         logger.error(f"Error loading history: {e}")
-        return {"history": []}
+        return {"history": [], "next_before": None, "total": 0}
+
+
+@app.get("/api/history/export")
+def export_chat_history():
+    """Export seluruh riwayat sebagai NDJSON (satu record per baris, streaming)."""
+
+    def generate():
+        blobs = memory_loader.blobs
+        for record in memory_loader.store.iter_records():
+            # Ref blob → isi aslinya, supaya hasil export berdiri sendiri
+            if record.get("actions"):
+                record = {
+                    **record,
+                    "actions": [
+                        {
+                            **action,
+                            **{
+                                field: blobs.hydrate(action[field])
+                                for field in ("arguments", "output")
+                                if field in action
+                            },
+                        }
+                        for action in record["actions"]
+                    ],
+                }
+            yield json.dumps(record, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(
+        generate(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="history.ndjson"'},
+    )
 
 
 @app.get("/", response_class=HTMLResponse)
@@ -86,21 +179,73 @@ async def serve_chat_interface(request: Request):
     )
 
 
+# --- ENDPOINTS USAGE ---
+
+
+@app.get("/api/usage")
+def get_usage(
+    group_by: str = "day",
+    session_id: str | None = None,
+    day: str | None = None,
+    model: str | None = None,
+    stage: str | None = None,
+):
+    """Rollup pemakaian token & estimasi biaya dari usage ledger."""
+    try:
+        rollup = usage_ledger.rollup(
+            group_by=group_by, session_id=session_id, day=day, model=model, stage=stage
+        )
+    except ValueError as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+    return {"group_by": group_by, "usage": rollup}
+
+
+# --- ENDPOINTS METRICS ---
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    """Latency per stage dalam Prometheus text format."""
+    if not metrics.enabled:
+        return PlainTextResponse("# metrics disabled\n", status_code=404)
+    return PlainTextResponse(
+        metrics.render_prometheus(),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
+
 # --- ENDPOINTS API (Chat) ---
 
 
 @app.post("/api/chat")
-async def handle_chat_message(chat_request: ChatRequest):
-    """Menerima pesan chat dan mengembalikan respons AI."""
+def handle_chat_message(
+    chat_request: ChatRequest, request: Request, response: Response
+):
+    """
+    Menerima pesan chat dan mengembalikan respons AI.
+    Header `X-Nano-Profile: 1` memaksa request ini diprofil.
+
+    Sengaja `def` biasa: FastAPI menjalankannya di threadpool, jadi
+    process_message yang blocking tidak menahan event loop dan beberapa
+    turn bisa berjalan bersamaan (encode query ikut di-batch dispatcher).
+    """
     if not orchestrator:
         return {"error": "Layanan AI tidak tersedia."}, 503
 
     try:
-        # Panggil Orchestrator DENGAN FUNGSI YANG BENAR
-        ai_response_text = orchestrator.process_message(
-            prompt=chat_request.message,  # Ganti 'user_input' menjadi 'prompt' (sesuai definisi di orchestrator.py)
-            session_id=chat_request.session_id,
-        )
+        request_id = generate_id("req")
+        force_profile = request.headers.get("x-nano-profile") == "1"
+
+        with profile_request(request_id, force=force_profile) as profile:
+            # Panggil Orchestrator DENGAN FUNGSI YANG BENAR
+            ai_response_text = orchestrator.process_message(
+                prompt=chat_request.message,  # Ganti 'user_input' menjadi 'prompt' (sesuai definisi di orchestrator.py)
+                session_id=chat_request.session_id,
+            )
+
+        response.headers["X-Request-Id"] = request_id
+        if profile and profile.path:
+            response.headers["X-Nano-Profile-File"] = profile.path
 
         # PASTIKAN PENGEMBALIAN MEMILIKI KUNCI "response"
         return {"response": ai_response_text, "session_id": chat_request.session_id}